@@ -2,14 +2,23 @@
 from logging.config import fileConfig
 from sqlalchemy import engine_from_config, pool
 from alembic import context
+from src.config import DATABASE_URL
 from src.database.models.base import Base
 from src.database.models.weather import WeatherDataModel
+from src.database.models.weather_hours import WeatherHourModel
 from src.database.models.cities import CityModel
+from src.database.models.geocoding import GeocodingCacheModel
+from src.database.models.lease import LeaseModel
+from src.database.models.cities_version import CitiesVersionModel
 
 config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
+# Миграции применяются к той же БД, что и у приложения, но через синхронный драйвер;
+# % экранируется для configparser
+config.set_main_option("sqlalchemy.url", DATABASE_URL.replace("+aiosqlite", "").replace("%", "%%"))
+
 target_metadata = Base.metadata
 
 # ✅ СИНХРОННЫЙ движок для Alembic!
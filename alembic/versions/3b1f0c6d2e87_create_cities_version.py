@@ -0,0 +1,43 @@
+"""create cities version
+
+Revision ID: 3b1f0c6d2e87
+Revises: a05be819cb4e
+Create Date: 2026-10-18 14:12:31.508214
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3b1f0c6d2e87'
+down_revision: Union[str, Sequence[str], None] = 'a05be819cb4e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Копия триггеров из src.database.models.cities_version: миграция не зависит от кода приложения
+OPERATIONS: tuple[str, ...] = ("INSERT", "UPDATE", "DELETE")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cities_version',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.execute("INSERT INTO cities_version (id, version) VALUES (1, 0)")
+    for operation in OPERATIONS:
+        op.execute(
+            f"CREATE TRIGGER cities_version_{operation.lower()} AFTER {operation} ON cities "
+            "BEGIN UPDATE cities_version SET version = version + 1; END"
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for operation in OPERATIONS:
+        op.execute(f"DROP TRIGGER cities_version_{operation.lower()}")
+    op.drop_table('cities_version')
@@ -0,0 +1,119 @@
+"""packed hourly forecast
+
+Revision ID: 43cf6cf49123
+Revises: f5dde57c3753
+Create Date: 2026-10-18 02:01:11.529770
+
+"""
+import json
+import math
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import Any, Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '43cf6cf49123'
+down_revision: Union[str, Sequence[str], None] = 'f5dde57c3753'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Формат хранения на момент этой ревизии. Код приложения (src.forecast_codec) не используется:
+# его изменения не должны менять то, что записывает старая миграция
+VALUE_DECIMALS = 2
+VALUE_SIZE: int = struct.calcsize("<f")
+
+
+def pack(payload: dict[str, Any]) -> dict[str, Any]:
+    """Колонки weather_data из ответа API: значения переменных подряд во float32"""
+    hourly: dict[str, list[Any]] = payload["hourly"]
+    times: list[str] = hourly["time"]
+    variables: tuple[str, ...] = tuple(name for name in hourly if name != "time")
+    flat: list[float] = [
+        math.nan if value is None else value for name in variables for value in hourly[name]
+    ]
+    offset: int = payload.get("utc_offset_seconds", 0)
+    start_time: int = (
+        int(datetime.fromisoformat(times[0]).replace(tzinfo=timezone.utc).timestamp()) - offset
+        if times
+        else 0
+    )
+    return {
+        "variables": ",".join(variables),
+        "hourly": struct.pack(f"<{len(flat)}f", *flat),
+        "start_time": start_time,
+        "meta": {key: value for key, value in payload.items() if key != "hourly"},
+    }
+
+
+def unpack(variables: str, values: bytes, start_time: int, meta: dict[str, Any]) -> dict[str, Any]:
+    """Ответ API в исходном формате из колонок weather_data"""
+    names: list[str] = variables.split(",")
+    hours: int = len(values) // VALUE_SIZE // len(names)
+    local_start: datetime = datetime.fromtimestamp(
+        start_time + meta.get("utc_offset_seconds", 0), timezone.utc
+    ).replace(tzinfo=None)
+    flat: tuple[float, ...] = struct.unpack(f"<{len(values) // VALUE_SIZE}f", values)
+
+    hourly: dict[str, list[Any]] = {
+        "time": [(local_start + timedelta(hours=hour)).isoformat(timespec="minutes") for hour in range(hours)]
+    }
+    for i, name in enumerate(names):
+        hourly[name] = [
+            None if math.isnan(value) else round(value, VALUE_DECIMALS)
+            for value in flat[i * hours : (i + 1) * hours]
+        ]
+    return {**meta, "hourly": hourly}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('weather_data', sa.Column('variables', sa.String(length=255), nullable=True))
+    op.add_column('weather_data', sa.Column('hourly', sa.LargeBinary(), nullable=True))
+    op.add_column('weather_data', sa.Column('start_time', sa.Integer(), nullable=True))
+    op.add_column('weather_data', sa.Column('meta', sa.JSON(), nullable=True))
+
+    # Перекодирование сохранённых ответов API в упакованный формат
+    connection = op.get_bind()
+    rows = connection.execute(sa.text("SELECT id, data FROM weather_data")).fetchall()
+    for row_id, data in rows:
+        columns = pack(json.loads(data))
+        connection.execute(
+            sa.text(
+                "UPDATE weather_data SET variables = :variables, hourly = :hourly, "
+                "start_time = :start_time, meta = :meta WHERE id = :id"
+            ),
+            {**columns, "meta": json.dumps(columns["meta"]), "id": row_id},
+        )
+
+    with op.batch_alter_table('weather_data') as batch_op:
+        batch_op.alter_column('variables', existing_type=sa.String(length=255), nullable=False)
+        batch_op.alter_column('hourly', existing_type=sa.LargeBinary(), nullable=False)
+        batch_op.alter_column('start_time', existing_type=sa.Integer(), nullable=False)
+        batch_op.alter_column('meta', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('data')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('weather_data', sa.Column('data', sa.JSON(), nullable=True))
+
+    connection = op.get_bind()
+    rows = connection.execute(
+        sa.text("SELECT id, variables, hourly, start_time, meta FROM weather_data")
+    ).fetchall()
+    for row_id, variables, hourly, start_time, meta in rows:
+        connection.execute(
+            sa.text("UPDATE weather_data SET data = :data WHERE id = :id"),
+            {"data": json.dumps(unpack(variables, hourly, start_time, json.loads(meta))), "id": row_id},
+        )
+
+    with op.batch_alter_table('weather_data') as batch_op:
+        batch_op.alter_column('data', existing_type=sa.JSON(), nullable=False)
+        batch_op.drop_column('meta')
+        batch_op.drop_column('start_time')
+        batch_op.drop_column('hourly')
+        batch_op.drop_column('variables')
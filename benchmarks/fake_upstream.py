@@ -0,0 +1,213 @@
+"""Локальная имитация API Open-Meteo: прогноз (/v1/forecast) и геокодирование (/v1/search).
+
+Ответы по формату совпадают с настоящим API: прогноз на сутки с правдоподобными значениями
+(для нескольких точек через запятую - список прогнозов), геокодирование находит любой город,
+кроме названий с префиксом NOT_FOUND_PREFIX. Имитируются задержка, ошибки 500, зависшие
+запросы (дольше таймаута клиента) и ограничение частоты с ответом 429.
+
+Сервис направляется на имитацию переменными окружения:
+    OPEN_METEO_FORECAST_URL=http://127.0.0.1:8765/v1/forecast
+    OPEN_METEO_GEOCODING_URL=http://127.0.0.1:8765/v1/search
+
+Запуск из корня проекта:
+    python -m benchmarks.fake_upstream --latency 0.08 --error-rate 0.02 --rate-limit 50
+
+Счётчики запросов по эндпоинтам и исходам - GET /stats.
+"""
+import argparse
+import asyncio
+import random
+import time
+import zlib
+from collections import Counter
+from typing import Any
+
+from aiohttp import web
+
+from benchmarks.payloads import make_payload
+
+NOT_FOUND_PREFIX = "Несуществующий"
+
+
+class FakeOpenMeteo:
+    def __init__(
+        self,
+        latency: float = 0.05,
+        jitter: float = 0.02,
+        error_rate: float = 0.0,
+        timeout_rate: float = 0.0,
+        hang: float = 30.0,
+        rate_limit: float = 0.0,
+        seed: int = 42,
+    ) -> None:
+        self.latency: float = latency
+        self.jitter: float = jitter
+        self.error_rate: float = error_rate
+        self.timeout_rate: float = timeout_rate
+        self.hang: float = hang
+        # Запросов в секунду на оба эндпоинта вместе, 0 - без ограничения
+        self.rate_limit: float = rate_limit
+
+        self.calls: Counter[tuple[str, str]] = Counter()
+        self._rng = random.Random(seed)
+        self._tokens: float = rate_limit
+        self._refilled_at: float = time.monotonic()
+        self._runner: web.AppRunner | None = None
+
+    def app(self) -> web.Application:
+        app = web.Application()
+        app.router.add_get("/v1/forecast", self.forecast)
+        app.router.add_get("/v1/search", self.search)
+        app.router.add_get("/stats", self.stats)
+        return app
+
+    async def start(self, host: str = "127.0.0.1", port: int = 8765) -> None:
+        self._runner = web.AppRunner(self.app(), access_log=None)
+        await self._runner.setup()
+        await web.TCPSite(self._runner, host, port).start()
+
+    async def stop(self) -> None:
+        if self._runner is not None:
+            await self._runner.cleanup()
+
+    def counts(self) -> dict[str, dict[str, int]]:
+        result: dict[str, dict[str, int]] = {}
+        for (endpoint, outcome), count in sorted(self.calls.items()):
+            result.setdefault(endpoint, {})[outcome] = count
+        return result
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response(self.counts())
+
+    async def forecast(self, request: web.Request) -> web.Response:
+        failure: web.Response | None = await self._fault("forecast")
+        if failure is not None:
+            return failure
+
+        try:
+            latitudes: list[float] = [float(value) for value in request.query["latitude"].split(",")]
+            longitudes: list[float] = [float(value) for value in request.query["longitude"].split(",")]
+        except (KeyError, ValueError):
+            return self._error("forecast", 400, "Parameter 'latitude' and 'longitude' must be floats")
+        if len(latitudes) != len(longitudes):
+            return self._error("forecast", 400, "Parameter 'latitude' and 'longitude' must have the same number of elements")
+        for latitude in latitudes:
+            if not -90 <= latitude <= 90:
+                return self._error("forecast", 400, f"Latitude must be in range of -90 to 90°. Given: {latitude}.")
+
+        # Прогноз для одних координат одинаков между запросами, как у настоящего API
+        payloads: list[dict[str, Any]] = [
+            make_payload(latitude, longitude, random.Random(f"{latitude:.2f},{longitude:.2f}"))
+            for latitude, longitude in zip(latitudes, longitudes)
+        ]
+        self.calls["forecast", "ok"] += 1
+        return web.json_response(payloads if len(payloads) > 1 else payloads[0])
+
+    async def search(self, request: web.Request) -> web.Response:
+        failure: web.Response | None = await self._fault("geocoding")
+        if failure is not None:
+            return failure
+
+        name: str = request.query.get("name", "")
+        if not name or name.startswith(NOT_FOUND_PREFIX):
+            self.calls["geocoding", "not_found"] += 1
+            return web.json_response({"generationtime_ms": 0.3})
+
+        # Координаты - функция названия: повторный поиск города даёт те же координаты
+        digest: int = zlib.crc32(name.encode())
+        self.calls["geocoding", "ok"] += 1
+        return web.json_response(
+            {
+                "results": [
+                    {
+                        "id": digest,
+                        "name": name,
+                        "latitude": round(digest % 12_000 / 100 - 60, 5),
+                        "longitude": round(digest // 12_000 % 36_000 / 100 - 180, 5),
+                        "country_code": "RU",
+                        "timezone": "Asia/Tomsk",
+                    }
+                ],
+                "generationtime_ms": 0.7,
+            }
+        )
+
+    async def _fault(self, endpoint: str) -> web.Response | None:
+        if self.rate_limit > 0 and not self._take_token():
+            return self._error(
+                endpoint, 429, "Minutely API request limit exceeded. Please try again in one minute."
+            )
+
+        await asyncio.sleep(max(0.0, self.latency + self._rng.uniform(-self.jitter, self.jitter)))
+
+        if self._rng.random() < self.timeout_rate:
+            # Клиент не дождётся ответа и прервёт запрос по таймауту
+            self.calls[endpoint, "timeout"] += 1
+            await asyncio.sleep(self.hang)
+            return web.json_response({"error": True, "reason": "Timeout"}, status=504)
+
+        if self._rng.random() < self.error_rate:
+            return self._error(endpoint, 500, "Internal server error")
+
+        return None
+
+    def _take_token(self) -> bool:
+        now: float = time.monotonic()
+        self._tokens = min(self.rate_limit, self._tokens + (now - self._refilled_at) * self.rate_limit)
+        self._refilled_at = now
+        if self._tokens < 1:
+            return False
+        self._tokens -= 1
+        return True
+
+    def _error(self, endpoint: str, status: int, reason: str) -> web.Response:
+        self.calls[endpoint, str(status)] += 1
+        return web.json_response({"error": True, "reason": reason}, status=status)
+
+
+def add_arguments(parser: argparse.ArgumentParser) -> None:
+    """Параметры имитации, общие для запуска отдельно и из нагрузочного теста"""
+    parser.add_argument("--latency", type=float, default=0.05, help="Средняя задержка ответа, с")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Разброс задержки, с")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Доля ответов 500")
+    parser.add_argument("--timeout-rate", type=float, default=0.0, help="Доля зависших запросов")
+    parser.add_argument("--hang", type=float, default=30.0, help="Время зависания запроса, с")
+    parser.add_argument("--rate-limit", type=float, default=0.0, help="Лимит запросов в секунду, 0 - без лимита")
+
+
+def from_arguments(args: argparse.Namespace) -> FakeOpenMeteo:
+    return FakeOpenMeteo(
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        timeout_rate=args.timeout_rate,
+        hang=args.hang,
+        rate_limit=args.rate_limit,
+    )
+
+
+async def serve(fake: FakeOpenMeteo, host: str, port: int) -> None:
+    await fake.start(host, port)
+    print(f"Имитация Open-Meteo: http://{host}:{port}/v1/forecast, http://{host}:{port}/v1/search")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await fake.stop()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    fake: FakeOpenMeteo = from_arguments(args)
+    try:
+        asyncio.run(serve(fake, args.host, args.port))
+    except KeyboardInterrupt:
+        print(f"Запросы: {fake.counts()}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,278 @@
+"""Микробенчмарки горячих путей: репозитории, мапперы и CityService.
+
+Для каждого размера создаётся временная SQLite с городами и прогнозами в формате
+PackedForecast, затем измеряются операции на настоящих классах проекта: число
+операций в секунду и пиковый объём памяти, выделяемой за одну операцию.
+Результаты сравниваются с базовой линией, регрессия - падение ops/s или рост памяти
+больше порога; при регрессиях код завершения 1.
+
+Запуск из корня проекта:
+    python -m benchmarks.hot_paths                       # сравнение с baseline.json
+    python -m benchmarks.hot_paths --save                # записать новую базовую линию
+    python -m benchmarks.hot_paths --sizes 1000 --threshold 0.3
+
+Базовая линия зависит от машины: её нужно записывать на той же машине, где идёт сравнение.
+На общих виртуальных машинах ops/s колеблются сильнее порога, там надёжнее сравнивать
+память на операцию или поднимать --threshold.
+"""
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Any, Awaitable, Callable
+
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from benchmarks.payloads import make_payloads
+from src.cache.city_directory import CityDirectory
+from src.cache.weather_snapshot import WeatherSnapshotStore
+from src.database.models.base import Base
+from src.database.repositories.cities import CityRepository
+from src.database.repositories.weather_data import WeatherRepository
+from src.database.sqlite import apply_profile, get_profile
+from src.enums import WeatherFilters
+from src.forecast_codec import PackedForecast
+from src.mappers.city import CityMapper
+from src.mappers.weather import WeatherMapper
+from src.serialization import dumps
+from src.use_cases.city_service import CityService
+
+BASELINE_PATH: str = os.path.join(os.path.dirname(__file__), "baseline.json")
+DISTINCT_PAYLOADS = 500
+FILTERS: list[WeatherFilters] = [WeatherFilters.TEMPERATURE, WeatherFilters.HUMIDITY, WeatherFilters.PRECIPITATION]
+
+Operation = Callable[[], Awaitable[Any] | Any]
+
+
+def seed(
+    path: str, cities: int, forecasts: list[PackedForecast], updated_at: datetime | None = None
+) -> None:
+    """Схема из моделей проекта, города и их прогнозы (прогнозы повторяются по кругу)"""
+    engine = create_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(engine)
+    engine.dispose()
+
+    rng = random.Random(42)
+    updated: str = (updated_at or datetime.now()).isoformat(sep=" ")
+    connection = sqlite3.connect(path)
+    connection.executemany(
+        "INSERT INTO cities (id, name, latitude, longitude) VALUES (?, ?, ?, ?)",
+        (
+            (city_id, f"Город {city_id}", rng.uniform(-60, 70), rng.uniform(-180, 180))
+            for city_id in range(1, cities + 1)
+        ),
+    )
+    rows: list[tuple[str, bytes, int, str]] = []
+    for forecast in forecasts:
+        columns: dict[str, Any] = forecast.columns()
+        rows.append(
+            (columns["variables"], columns["hourly"], columns["start_time"], json.dumps(columns["meta"]))
+        )
+    connection.executemany(
+        "INSERT INTO weather_data (city_id, variables, hourly, start_time, meta, updated_at) "
+        "VALUES (?, ?, ?, ?, ?, ?)",
+        ((city_id, *rows[city_id % len(rows)], updated) for city_id in range(1, cities + 1)),
+    )
+    connection.commit()
+    connection.close()
+
+
+async def measure(operation: Operation, min_time: float, max_ops: int, rounds: int) -> dict[str, float]:
+    async def run() -> None:
+        result = operation()
+        if asyncio.iscoroutine(result):
+            await result
+
+    # Прогрев: кэши драйвера, компиляция запросов SQLAlchemy
+    for _ in range(3):
+        await run()
+
+    # Лучший из нескольких раундов: помехи от других процессов только замедляют код
+    best: float = 0.0
+    for _ in range(rounds):
+        ops: int = 0
+        started: float = time.perf_counter()
+        while ops < max_ops and (ops < 3 or time.perf_counter() - started < min_time):
+            await run()
+            ops += 1
+        best = max(best, ops / (time.perf_counter() - started))
+
+    # Пиковая память одной операции сверх уже занятой; tracemalloc замедляет код,
+    # поэтому память измеряется отдельно от времени
+    peaks: list[int] = []
+    tracemalloc.start()
+    for _ in range(5):
+        tracemalloc.reset_peak()
+        before, _ = tracemalloc.get_traced_memory()
+        await run()
+        _, peak = tracemalloc.get_traced_memory()
+        peaks.append(peak - before)
+    tracemalloc.stop()
+
+    return {"ops_per_sec": round(best, 1), "alloc_kib": round(statistics.median(peaks) / 1024, 2)}
+
+
+async def bench_size(
+    cities: int, forecasts: list[PackedForecast], min_time: float, rounds: int
+) -> dict[str, dict[str, float]]:
+    results: dict[str, dict[str, float]] = {}
+    rng = random.Random(7)
+    city_mapper = CityMapper()
+    weather_mapper = WeatherMapper()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path: str = os.path.join(directory, "bench.db")
+        seed(path, cities, forecasts)
+
+        engine: AsyncEngine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+        apply_profile(engine, get_profile("balanced"), read_only=True)
+        session_factory = async_sessionmaker(bind=engine, autoflush=False)
+
+        async with session_factory() as session:
+            session: AsyncSession
+            # Справочник без записей: каждый поиск идёт в БД
+            cold_cities = CityRepository(session, city_mapper, CityDirectory(max_entries=0))
+            warm_cities = CityRepository(session, city_mapper, CityDirectory(max_entries=cities))
+            warm_weather = WeatherRepository(session, weather_mapper, WeatherSnapshotStore())
+
+            def name() -> str:
+                return f"город {rng.randint(1, cities)}"
+
+            def city_id() -> int:
+                return rng.randint(1, cities)
+
+            async def warm_up() -> None:
+                for city in await warm_cities.all():
+                    warm_cities.directory.put(city)
+                await warm_weather.get_many(list(range(1, cities + 1)))
+
+            await warm_up()
+            forecast: PackedForecast = (await warm_weather.get(1))["data"]
+            content: dict[str, Any] = weather_mapper.to_response_content(forecast, 12)
+            service = CityService(warm_weather, warm_cities)
+
+            operations: dict[str, tuple[Operation, int]] = {
+                "city_lookup_db": (lambda: cold_cities._get(name()), 100_000),
+                "city_lookup_cached": (lambda: warm_cities._get(name()), 1_000_000),
+                "weather_load_db": (
+                    lambda: WeatherRepository(session, weather_mapper, WeatherSnapshotStore()).get(city_id()),
+                    100_000,
+                ),
+                "weather_load_snapshot": (lambda: warm_weather.get(city_id()), 1_000_000),
+                "hour_extract": (lambda: weather_mapper.to_response_content(forecast, rng.randint(0, 23)), 1_000_000),
+                "hour_extract_filters": (
+                    lambda: weather_mapper.to_optional_response_content(forecast, rng.randint(0, 23), FILTERS),
+                    1_000_000,
+                ),
+                "response_model": (lambda: weather_mapper.to_response_model(forecast, 12), 1_000_000),
+                "response_bytes": (lambda: dumps(content), 1_000_000),
+                "city_service_hit": (lambda: service(name(), None), 1_000_000),
+                # Полный список без кэша справочника (список больше max_entries=0)
+                "all_db": (lambda: cold_cities.all(), 1_000),
+            }
+            for operation, (run, max_ops) in operations.items():
+                results[operation] = await measure(run, min_time, max_ops, rounds)
+
+        await engine.dispose()
+
+    return results
+
+
+def compare(
+    results: dict[str, dict[str, dict[str, float]]],
+    baseline: dict[str, dict[str, dict[str, float]]],
+    threshold: float,
+) -> list[str]:
+    regressions: list[str] = []
+    for size, operations in results.items():
+        for operation, current in operations.items():
+            expected: dict[str, float] | None = baseline.get(size, {}).get(operation)
+            if expected is None:
+                continue
+            if current["ops_per_sec"] < expected["ops_per_sec"] * (1 - threshold):
+                regressions.append(
+                    f"{size}/{operation}: {current['ops_per_sec']} ops/s, "
+                    f"базовая линия {expected['ops_per_sec']}"
+                )
+            # Небольшие абсолютные изменения памяти не считаются регрессией
+            if current["alloc_kib"] > expected["alloc_kib"] * (1 + threshold) + 1:
+                regressions.append(
+                    f"{size}/{operation}: {current['alloc_kib']} КиБ на операцию, "
+                    f"базовая линия {expected['alloc_kib']}"
+                )
+    return regressions
+
+
+async def run(args: argparse.Namespace) -> int:
+    forecasts: list[PackedForecast] = [
+        PackedForecast.from_payload(payload) for payload in make_payloads(DISTINCT_PAYLOADS)
+    ]
+
+    results: dict[str, dict[str, dict[str, float]]] = {}
+    for cities in args.sizes:
+        print(f"\nГородов: {cities}")
+        print(f"{'операция':<24}{'ops/s':>14}{'КиБ/оп':>10}")
+        results[str(cities)] = await bench_size(cities, forecasts, args.min_time, args.rounds)
+        for operation, result in results[str(cities)].items():
+            print(f"{operation:<24}{result['ops_per_sec']:>14.1f}{result['alloc_kib']:>10.2f}")
+
+    if args.save:
+        with open(args.baseline, "w", encoding="utf-8") as file:
+            json.dump(
+                {
+                    "machine": {"python": sys.version.split()[0], "platform": platform.platform()},
+                    "results": results,
+                },
+                file,
+                ensure_ascii=False,
+                indent=2,
+            )
+        print(f"\nБазовая линия записана в {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"\nБазовой линии {args.baseline} нет, запустите с --save")
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as file:
+        baseline: dict[str, Any] = json.load(file)
+
+    regressions: list[str] = compare(results, baseline["results"], args.threshold)
+    if regressions:
+        print(f"\nРегрессии больше {args.threshold:.0%}:")
+        for regression in regressions:
+            print(f"  {regression}")
+        return 1
+
+    print(f"\nРегрессий больше {args.threshold:.0%} относительно базовой линии нет")
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--min-time", type=float, default=0.3, help="Минимальное время раунда измерения, с")
+    parser.add_argument("--rounds", type=int, default=5, help="Число раундов, берётся лучший")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Допустимое ухудшение, доля")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save", action="store_true", help="Записать результаты как базовую линию")
+    args = parser.parse_args()
+
+    # Журнал INFO репозиториев на каждую операцию искажает измерения
+    logging.disable(logging.INFO)
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
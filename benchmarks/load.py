@@ -0,0 +1,308 @@
+"""Сквозной нагрузочный тест сервиса с локальной имитацией Open-Meteo.
+
+Создаётся временная БД с городами, данные о погоде которых уже просрочены, поэтому фоновое
+обновление работает всё время теста. Сервис запускается отдельным процессом uvicorn,
+направленным на имитацию (benchmarks/fake_upstream.py), и получает смесь запросов MIX
+от --concurrency одновременных клиентов: попадания в кэш и повторные запросы с If-None-Match,
+промахи с поиском нового города, /weather/current, добавление городов.
+
+Отчёт: пропускная способность, перцентили задержки и статусы по видам запросов,
+запросы к имитации по исходам и счётчики фонового обновления из /metrics
+(при --workers больше 1 метрики - только одного процесса).
+Остальные настройки сервиса (например, UPSTREAM_RATE_PER_SECOND) передаются через окружение.
+
+Запуск из корня проекта:
+    python -m benchmarks.load --duration 30 --concurrency 20
+    python -m benchmarks.load --latency 0.2 --error-rate 0.05 --timeout-rate 0.01 --hang 15
+    python -m benchmarks.load --rate-limit 5     # ответы 429 от Open-Meteo
+"""
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta
+from typing import Any
+
+import aiohttp
+
+from benchmarks.fake_upstream import NOT_FOUND_PREFIX, FakeOpenMeteo, add_arguments, from_arguments
+from benchmarks.hot_paths import seed
+from benchmarks.payloads import make_payloads
+from src.database.models.geocoding import GeocodingCacheModel  # noqa: F401 - таблицы для create_all
+from src.database.models.cities_version import CitiesVersionModel  # noqa: F401
+from src.database.models.lease import LeaseModel  # noqa: F401
+from src.database.models.weather_hours import WeatherHourModel  # noqa: F401
+from src.forecast_codec import PackedForecast
+
+ROOT: str = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Вид запроса: доля в смеси
+MIX: dict[str, int] = {
+    "weather": 45,
+    "weather_filters": 10,
+    "weather_revalidate": 10,
+    "weather_range": 5,
+    "weather_current": 10,
+    "weather_new_city": 5,
+    "weather_unknown_city": 3,
+    "city_create": 5,
+    "cities": 7,
+}
+FILTERS: list[str] = ["temperature", "precipitation", "pressure_msl", "wind_speed", "humidity"]
+# Метрики сервиса, которые выводятся в отчёте
+REPORTED_METRICS: tuple[str, ...] = (
+    "weather_refresh_cities_total",
+    "upstream_retries_total",
+    "city_service_upstream_total",
+)
+
+
+class LoadDriver:
+    def __init__(self, base_url: str, cities: int, seed: int = 7) -> None:
+        self.base_url: str = base_url
+        self.cities: int = cities
+        self.rng = random.Random(seed)
+        self.sequence = itertools.count(1)
+
+        self.latencies: defaultdict[str, list[float]] = defaultdict(list)
+        self.statuses: defaultdict[str, Counter[int]] = defaultdict(Counter)
+        # ETag последних ответов: повторные запросы клиентов с If-None-Match
+        self.etags: dict[tuple[str, int], str] = {}
+
+    def popular_city(self) -> str:
+        # Популярные города (с малыми ID) запрашиваются намного чаще остальных
+        return f"Город {int(self.cities * self.rng.random() ** 3) + 1}"
+
+    def request(self, operation: str) -> tuple[str, str, dict[str, Any]]:
+        rng: random.Random = self.rng
+        hour: int = rng.randint(0, 23)
+
+        if operation == "weather":
+            return "GET", "/weather/", {"params": {"city_name": self.popular_city(), "hour": hour}}
+        if operation == "weather_filters":
+            filters: list[str] = rng.sample(FILTERS, rng.randint(1, 3))
+            params: list[tuple[str, Any]] = [("city_name", self.popular_city()), ("hour", hour)]
+            return "GET", "/weather/", {"params": params + [("filters", value) for value in filters]}
+        if operation == "weather_revalidate":
+            city: str = self.popular_city()
+            etag: str | None = self.etags.get((city, hour))
+            headers: dict[str, str] = {} if etag is None else {"If-None-Match": etag}
+            return "GET", "/weather/", {"params": {"city_name": city, "hour": hour}, "headers": headers}
+        if operation == "weather_range":
+            start: int = rng.randint(0, 20)
+            return "GET", "/weather/range", {
+                "params": {"city_name": self.popular_city(), "start_hour": start, "end_hour": start + 3}
+            }
+        if operation == "weather_current":
+            return "GET", "/weather/current", {
+                "params": {"latitude": round(rng.uniform(-60, 70), 2), "longitude": round(rng.uniform(-180, 180), 2)}
+            }
+        if operation == "weather_new_city":
+            return "GET", "/weather/", {"params": {"city_name": f"Новый город {next(self.sequence)}", "hour": hour}}
+        if operation == "weather_unknown_city":
+            return "GET", "/weather/", {"params": {"city_name": f"{NOT_FOUND_PREFIX} {next(self.sequence)}", "hour": hour}}
+        if operation == "city_create":
+            return "POST", "/cities/", {
+                "data": {
+                    "name": f"Добавленный город {next(self.sequence)}",
+                    "latitude": round(rng.uniform(-60, 70), 4),
+                    "longitude": round(rng.uniform(-180, 180), 4),
+                }
+            }
+        return "GET", "/cities/", {}
+
+    async def worker(self, session: aiohttp.ClientSession, deadline: float) -> None:
+        operations: list[str] = list(MIX)
+        weights: list[int] = list(MIX.values())
+        while time.perf_counter() < deadline:
+            operation: str = self.rng.choices(operations, weights)[0]
+            method, path, options = self.request(operation)
+
+            started: float = time.perf_counter()
+            try:
+                async with session.request(method, self.base_url + path, **options) as response:
+                    await response.read()
+                    status: int = response.status
+                    etag: str | None = response.headers.get("ETag")
+            except (aiohttp.ClientError, asyncio.TimeoutError):
+                # Статус 0 - соединение с сервисом не удалось или ответ не пришёл вовремя
+                status, etag = 0, None
+            self.latencies[operation].append(time.perf_counter() - started)
+            self.statuses[operation][status] += 1
+
+            params: Any = options.get("params")
+            if etag is not None and path == "/weather/" and isinstance(params, dict):
+                self.etags[params["city_name"], params["hour"]] = etag
+
+    async def run(self, concurrency: int, duration: float) -> float:
+        started: float = time.perf_counter()
+        async with aiohttp.ClientSession(
+            connector=aiohttp.TCPConnector(limit=concurrency),
+            timeout=aiohttp.ClientTimeout(total=60),
+        ) as session:
+            await asyncio.gather(
+                *[self.worker(session, started + duration) for _ in range(concurrency)]
+            )
+        return time.perf_counter() - started
+
+
+def percentile(values: list[float], q: float) -> float:
+    ordered: list[float] = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def prepare_database(path: str, cities: int) -> None:
+    forecasts: list[PackedForecast] = [
+        PackedForecast.from_payload(payload) for payload in make_payloads(min(cities, 500))
+    ]
+    # Данные всех городов просрочены: фоновое обновление начинается сразу и идёт весь тест
+    seed(path, cities, forecasts, updated_at=datetime.now() - timedelta(days=1))
+
+
+def start_server(args: argparse.Namespace, database: str, log_path: str) -> subprocess.Popen:
+    upstream: str = f"http://127.0.0.1:{args.upstream_port}"
+    env: dict[str, str] = {
+        **os.environ,
+        "DATABASE_URL": f"sqlite+aiosqlite:///{database}",
+        "OPEN_METEO_FORECAST_URL": f"{upstream}/v1/forecast",
+        "OPEN_METEO_GEOCODING_URL": f"{upstream}/v1/search",
+        "REFRESH_TICK_SECONDS": str(args.refresh_tick),
+        "REFRESH_MIN_INTERVAL_SECONDS": str(args.refresh_interval),
+    }
+    with open(log_path, "wb") as log:
+        return subprocess.Popen(
+            [
+                sys.executable, "-m", "uvicorn", "main:app",
+                "--host", "127.0.0.1",
+                "--port", str(args.port),
+                "--workers", str(args.workers),
+                "--log-level", "warning",
+                "--no-access-log",
+            ],
+            cwd=ROOT,
+            env=env,
+            stdout=log,
+            stderr=subprocess.STDOUT,
+        )
+
+
+async def wait_ready(base_url: str, server: subprocess.Popen, timeout: float = 30.0) -> bool:
+    deadline: float = time.monotonic() + timeout
+    async with aiohttp.ClientSession() as session:
+        while time.monotonic() < deadline and server.poll() is None:
+            try:
+                async with session.get(f"{base_url}/service/scheduler") as response:
+                    if response.status == 200:
+                        return True
+            except aiohttp.ClientError:
+                pass
+            await asyncio.sleep(0.2)
+    return False
+
+
+async def service_metrics(base_url: str) -> list[str]:
+    async with aiohttp.ClientSession() as session:
+        async with session.get(f"{base_url}/metrics") as response:
+            text: str = await response.text()
+    return [line for line in text.splitlines() if line.startswith(REPORTED_METRICS)]
+
+
+def report(driver: LoadDriver, elapsed: float, fake: FakeOpenMeteo, metrics_lines: list[str]) -> None:
+    total: int = sum(len(values) for values in driver.latencies.values())
+    print(f"\nДлительность: {elapsed:.1f} с, запросов: {total}, пропускная способность: {total / elapsed:.1f} запросов/с")
+    print(f"\n{'запрос':<22}{'число':>8}{'p50, мс':>10}{'p90, мс':>10}{'p99, мс':>10}{'max, мс':>10}  статусы")
+
+    rows: list[tuple[str, list[float], Counter[int]]] = [
+        (operation, driver.latencies[operation], driver.statuses[operation])
+        for operation in MIX
+        if driver.latencies[operation]
+    ]
+    rows.append(
+        (
+            "итого",
+            [value for values in driver.latencies.values() for value in values],
+            sum(driver.statuses.values(), Counter()),
+        )
+    )
+    for operation, values, statuses in rows:
+        if not values:
+            continue
+        print(
+            f"{operation:<22}{len(values):>8}"
+            + "".join(f"{percentile(values, q) * 1000:>10.1f}" for q in (0.5, 0.9, 0.99, 1.0))
+            + "  "
+            + ", ".join(f"{status}: {count}" for status, count in sorted(statuses.items()))
+        )
+
+    print("\nЗапросы к имитации Open-Meteo:")
+    for endpoint, outcomes in fake.counts().items():
+        print(f"  {endpoint}: {sum(outcomes.values())} ({', '.join(f'{outcome}: {count}' for outcome, count in outcomes.items())})")
+
+    if metrics_lines:
+        print("\nМетрики сервиса:")
+        for line in metrics_lines:
+            print(f"  {line}")
+
+
+async def run(args: argparse.Namespace) -> int:
+    base_url: str = f"http://127.0.0.1:{args.port}"
+    fake: FakeOpenMeteo = from_arguments(args)
+
+    with tempfile.TemporaryDirectory() as directory:
+        database: str = os.path.join(directory, "load.db")
+        log_path: str = os.path.join(directory, "server.log")
+        prepare_database(database, args.cities)
+        print(f"БД: {args.cities} городов с просроченными данными о погоде")
+
+        await fake.start("127.0.0.1", args.upstream_port)
+        server: subprocess.Popen = start_server(args, database, log_path)
+        try:
+            if not await wait_ready(base_url, server):
+                print("Сервис не запустился, последние строки журнала:")
+                with open(log_path, encoding="utf-8", errors="replace") as log:
+                    print("".join(log.readlines()[-30:]))
+                return 1
+
+            print(f"Нагрузка: {args.concurrency} клиентов, {args.duration:.0f} с")
+            driver = LoadDriver(base_url, args.cities)
+            elapsed: float = await driver.run(args.concurrency, args.duration)
+            metrics_lines: list[str] = await service_metrics(base_url)
+        finally:
+            server.send_signal(signal.SIGINT)
+            try:
+                server.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                server.kill()
+            await fake.stop()
+
+    report(driver, elapsed, fake, metrics_lines)
+    return 0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--duration", type=float, default=30.0, help="Длительность нагрузки, с")
+    parser.add_argument("--concurrency", type=int, default=20, help="Число одновременных клиентов")
+    parser.add_argument("--cities", type=int, default=1_000, help="Число городов в БД")
+    parser.add_argument("--workers", type=int, default=1, help="Число процессов uvicorn")
+    parser.add_argument("--port", type=int, default=8010)
+    parser.add_argument("--upstream-port", type=int, default=8765)
+    parser.add_argument("--refresh-tick", type=float, default=1.0, help="REFRESH_TICK_SECONDS сервиса")
+    parser.add_argument(
+        "--refresh-interval", type=float, default=60.0, help="REFRESH_MIN_INTERVAL_SECONDS сервиса"
+    )
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    sys.exit(asyncio.run(run(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import random
+from datetime import date, datetime, timedelta
+from typing import Any
+
+HOURLY_VARIABLES: dict[str, tuple[float, float, int]] = {
+    # имя переменной: (минимум, максимум, знаков после запятой) как в ответах Open-Meteo
+    "temperature_2m": (-35.0, 35.0, 1),
+    "pressure_msl": (980.0, 1045.0, 1),
+    "precipitation": (0.0, 5.0, 2),
+    "relative_humidity_2m": (20.0, 100.0, 0),
+    "wind_speed_10m": (0.0, 40.0, 1),
+    "wind_direction_10m": (0.0, 360.0, 0),
+}
+
+
+def make_payload(latitude: float, longitude: float, rng: random.Random) -> dict[str, Any]:
+    """Ответ API прогноза Open-Meteo на одни сутки с правдоподобными значениями"""
+    day: datetime = datetime.combine(date.today(), datetime.min.time())
+    hourly: dict[str, list[Any]] = {
+        "time": [(day + timedelta(hours=hour)).isoformat(timespec="minutes") for hour in range(24)]
+    }
+    for name, (low, high, digits) in HOURLY_VARIABLES.items():
+        base: float = rng.uniform(low, high)
+        hourly[name] = [
+            round(min(max(base + rng.uniform(-2, 2), low), high), digits) for _ in range(24)
+        ]
+
+    return {
+        "latitude": round(latitude, 2),
+        "longitude": round(longitude, 2),
+        "generationtime_ms": round(rng.uniform(0.05, 0.5), 6),
+        "utc_offset_seconds": 25200,
+        "timezone": "Asia/Tomsk",
+        "timezone_abbreviation": "GMT+7",
+        "elevation": round(rng.uniform(0, 500), 1),
+        "current_weather_units": {
+            "time": "iso8601",
+            "interval": "seconds",
+            "temperature": "°C",
+            "windspeed": "km/h",
+            "winddirection": "°",
+            "is_day": "",
+            "weathercode": "wmo code",
+        },
+        "current_weather": {
+            "time": day.isoformat(timespec="minutes"),
+            "interval": 900,
+            "temperature": hourly["temperature_2m"][0],
+            "windspeed": hourly["wind_speed_10m"][0],
+            "winddirection": hourly["wind_direction_10m"][0],
+            "is_day": 1,
+            "weathercode": 1,
+        },
+        "hourly_units": {
+            "time": "iso8601",
+            "temperature_2m": "°C",
+            "pressure_msl": "hPa",
+            "precipitation": "mm",
+            "relative_humidity_2m": "%",
+            "wind_speed_10m": "km/h",
+            "wind_direction_10m": "°",
+        },
+        "hourly": hourly,
+    }
+
+
+def make_payloads(count: int, seed: int = 42) -> list[dict[str, Any]]:
+    rng = random.Random(seed)
+    return [make_payload(rng.uniform(-60, 70), rng.uniform(-180, 180), rng) for _ in range(count)]
@@ -0,0 +1,197 @@
+"""Процессорное время на запрос: ответ через модели pydantic против JSONBytesResponse.
+
+Запросы выполняются напрямую через ASGI-приложение FastAPI, без сети, поэтому
+разница между путями - это проверка моделей ответа, кодировщик FastAPI и json.
+Запуск из корня проекта:
+    python -m benchmarks.serialization --requests 2000 --rate 200
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Any
+
+from fastapi import FastAPI
+
+from benchmarks.payloads import make_payloads
+from src.enums import WeatherFilters
+from src.forecast_codec import PackedForecast
+from src.mappers.city import CityMapper
+from src.mappers.weather import WeatherMapper
+from src.schemas.responses.city import CityDataResponse
+from src.schemas.responses.weather import (
+    CityWeatherBatchItem,
+    WeatherBatchResponse,
+    WeatherDataResponse,
+    WeatherRangeResponse,
+    WeatherWithFiltersResponse,
+)
+from src.serialization import JSONBytesResponse, dumps, orjson
+
+HOUR = 12
+
+
+def create_app(forecasts: list[PackedForecast], cities: list[dict[str, Any]], batch: int) -> FastAPI:
+    """Пары эндпоинтов с одинаковой схемой ответа: /model/* - прежний путь, /fast/* - новый"""
+    app = FastAPI()
+    weather = WeatherMapper()
+    city = CityMapper()
+    filters: list[WeatherFilters] = [WeatherFilters.HUMIDITY, WeatherFilters.PRECIPITATION]
+
+    @app.get("/model/weather")
+    async def model_weather() -> WeatherDataResponse:
+        return WeatherDataResponse(**weather.to_response_content(forecasts[0], HOUR))
+
+    @app.get("/fast/weather")
+    async def fast_weather() -> WeatherDataResponse:
+        return JSONBytesResponse(weather.to_response_content(forecasts[0], HOUR))
+
+    @app.get("/model/filters")
+    async def model_filters() -> WeatherDataResponse | WeatherWithFiltersResponse:
+        return WeatherWithFiltersResponse(
+            **weather.to_optional_response_content(forecasts[0], HOUR, filters)
+        )
+
+    @app.get("/fast/filters")
+    async def fast_filters() -> WeatherDataResponse | WeatherWithFiltersResponse:
+        return JSONBytesResponse(weather.to_optional_response_content(forecasts[0], HOUR, filters))
+
+    @app.get("/model/range")
+    async def model_range() -> WeatherRangeResponse:
+        return WeatherRangeResponse(
+            **weather.to_range_response_content(forecasts[0], 0, 23, list(WeatherFilters))
+        )
+
+    @app.get("/fast/range")
+    async def fast_range() -> WeatherRangeResponse:
+        return JSONBytesResponse(
+            weather.to_range_response_content(forecasts[0], 0, 23, list(WeatherFilters))
+        )
+
+    @app.get("/model/batch")
+    async def model_batch() -> WeatherBatchResponse:
+        return WeatherBatchResponse(
+            hour=HOUR,
+            results={
+                f"city{number}": CityWeatherBatchItem(
+                    weather=WeatherDataResponse(**weather.to_response_content(forecast, HOUR))
+                )
+                for number, forecast in enumerate(forecasts[:batch])
+            },
+        )
+
+    @app.get("/fast/batch")
+    async def fast_batch() -> WeatherBatchResponse:
+        return JSONBytesResponse(
+            {
+                "hour": HOUR,
+                "results": {
+                    f"city{number}": {"weather": weather.to_response_content(forecast, HOUR), "error": None}
+                    for number, forecast in enumerate(forecasts[:batch])
+                },
+            }
+        )
+
+    @app.get("/model/cities")
+    async def model_cities() -> list[CityDataResponse]:
+        return [city.to_response_model(dto) for dto in cities]
+
+    @app.get("/fast/cities")
+    async def fast_cities() -> list[CityDataResponse]:
+        # Без кэша байтов в CityDirectory: список кодируется на каждый запрос
+        return JSONBytesResponse(dumps([city.to_response_content(dto) for dto in cities]))
+
+    return app
+
+
+async def call(app: FastAPI, path: str) -> bytes:
+    scope: dict[str, Any] = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": b"",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 1),
+        "server": ("bench", 80),
+    }
+    body: list[bytes] = []
+
+    async def receive() -> dict[str, Any]:
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message: dict[str, Any]) -> None:
+        if message["type"] == "http.response.body":
+            body.append(message.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(body)
+
+
+async def measure(app: FastAPI, path: str, requests: int) -> float:
+    """Процессорное время на запрос в микросекундах"""
+    for _ in range(min(requests, 100)):
+        await call(app, path)
+
+    started: float = time.process_time()
+    for _ in range(requests):
+        await call(app, path)
+    return (time.process_time() - started) / requests * 1e6
+
+
+async def run(args: argparse.Namespace) -> None:
+    rng = random.Random(42)
+    forecasts: list[PackedForecast] = [
+        PackedForecast.from_payload(payload) for payload in make_payloads(args.batch)
+    ]
+    cities: list[dict[str, Any]] = [
+        {"id": city_id, "name": f"Город {city_id}", "latitude": rng.uniform(-60, 70), "longitude": rng.uniform(-180, 180)}
+        for city_id in range(1, args.cities + 1)
+    ]
+    app = create_app(forecasts, cities, args.batch)
+
+    print(f"Кодировщик JSON: {'orjson' if orjson is not None else 'json'}")
+    print(f"{'эндпоинт':<10}{'модели, мкс':>14}{'байты, мкс':>14}{'экономия':>10}")
+    measured: list[tuple[str, float, float]] = []
+    for name, requests in (
+        ("weather", args.requests),
+        ("filters", args.requests),
+        ("range", args.requests),
+        ("batch", max(args.requests // 10, 10)),
+        ("cities", max(args.requests // 50, 10)),
+    ):
+        model_body: bytes = await call(app, f"/model/{name}")
+        fast_body: bytes = await call(app, f"/fast/{name}")
+        assert model_body == fast_body, f"Ответы /{name} различаются"
+
+        model: float = await measure(app, f"/model/{name}", requests)
+        fast: float = await measure(app, f"/fast/{name}", requests)
+        measured.append((name, model, fast))
+        print(f"{name:<10}{model:>14.1f}{fast:>14.1f}{1 - fast / model:>10.0%}")
+
+    # Смесь запросов: в основном одиночные города, реже пакеты и диапазоны
+    mix: dict[str, float] = {"weather": 0.6, "filters": 0.2, "range": 0.1, "batch": 0.09, "cities": 0.01}
+    saved: float = sum(mix[name] * (model - fast) for name, model, fast in measured)
+    print(
+        f"\nПри {args.rate} запросах/с экономится {saved * args.rate / 1e6:.3f} c "
+        f"процессорного времени в секунду ({saved * args.rate / 1e4:.1f}% ядра)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000, help="Запросов на одиночный эндпоинт")
+    parser.add_argument("--rate", type=int, default=200, help="Запросов в секунду для оценки экономии")
+    parser.add_argument("--batch", type=int, default=100, help="Городов в пакетном ответе")
+    parser.add_argument("--cities", type=int, default=1000, help="Городов в списке")
+    args = parser.parse_args()
+
+    asyncio.run(run(args))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+"""Сравнение хранения прогноза в weather_data: JSON-ответ API против PackedForecast.
+
+Память загруженного набора измеряется двумя способами: размер Python-объектов
+по tracemalloc и прирост RSS процесса (VmRSS из /proc/self/status, вне Linux -
+пиковый ru_maxrss). RSS для каждого формата снимается в отдельном дочернем
+процессе: освобождённая память в том же процессе не возвращается системе
+и исказила бы второе измерение.
+
+Запуск из корня проекта:
+    python -m benchmarks.storage_format --cities 10000
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import resource
+import sqlite3
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Any, Callable
+
+from benchmarks.payloads import make_payloads
+from src.forecast_codec import PackedForecast
+
+VARIABLE = "temperature_2m"
+
+
+def create_json_db(path: str, payloads: list[dict[str, Any]]) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute("CREATE TABLE weather_data (city_id INTEGER PRIMARY KEY, data JSON NOT NULL)")
+    connection.executemany(
+        "INSERT INTO weather_data VALUES (?, ?)",
+        [(city_id, json.dumps(payload)) for city_id, payload in enumerate(payloads, 1)],
+    )
+    connection.commit()
+    connection.execute("VACUUM")
+    connection.close()
+
+
+def create_packed_db(path: str, payloads: list[dict[str, Any]]) -> None:
+    connection = sqlite3.connect(path)
+    connection.execute(
+        "CREATE TABLE weather_data (city_id INTEGER PRIMARY KEY, variables VARCHAR(255) NOT NULL, "
+        "hourly BLOB NOT NULL, start_time INTEGER NOT NULL, meta JSON NOT NULL)"
+    )
+    rows: list[tuple[Any, ...]] = []
+    for city_id, payload in enumerate(payloads, 1):
+        columns: dict[str, Any] = PackedForecast.from_payload(payload).columns()
+        rows.append(
+            (
+                city_id,
+                columns["variables"],
+                columns["hourly"],
+                columns["start_time"],
+                json.dumps(columns["meta"]),
+            )
+        )
+    connection.executemany("INSERT INTO weather_data VALUES (?, ?, ?, ?, ?)", rows)
+    connection.commit()
+    connection.execute("VACUUM")
+    connection.close()
+
+
+def read_json(connection: sqlite3.Connection, city_id: int, hour: int) -> float | None:
+    (data,) = connection.execute(
+        "SELECT data FROM weather_data WHERE city_id = ?", (city_id,)
+    ).fetchone()
+    return json.loads(data)["hourly"][VARIABLE][hour]
+
+
+def read_packed(connection: sqlite3.Connection, city_id: int, hour: int) -> float | None:
+    variables, hourly, start_time, meta = connection.execute(
+        "SELECT variables, hourly, start_time, meta FROM weather_data WHERE city_id = ?",
+        (city_id,),
+    ).fetchone()
+    forecast = PackedForecast(tuple(variables.split(",")), hourly, start_time, json.loads(meta))
+    return forecast.value(VARIABLE, hour)
+
+
+def load_all_json(connection: sqlite3.Connection) -> list[Any]:
+    return [json.loads(data) for (data,) in connection.execute("SELECT data FROM weather_data")]
+
+
+def load_all_packed(connection: sqlite3.Connection) -> list[Any]:
+    return [
+        PackedForecast(tuple(variables.split(",")), hourly, start_time, json.loads(meta))
+        for variables, hourly, start_time, meta in connection.execute(
+            "SELECT variables, hourly, start_time, meta FROM weather_data"
+        )
+    ]
+
+
+def measure_reads(
+    path: str,
+    read: Callable[[sqlite3.Connection, int, int], float | None],
+    cities: int,
+    reads: int,
+) -> float:
+    rng = random.Random(7)
+    connection = sqlite3.connect(path)
+    started: float = time.perf_counter()
+    for _ in range(reads):
+        read(connection, rng.randint(1, cities), rng.randint(0, 23))
+    elapsed: float = time.perf_counter() - started
+    connection.close()
+    return elapsed / reads * 1e6
+
+
+def measure_memory(path: str, load: Callable[[sqlite3.Connection], list[Any]]) -> int:
+    connection = sqlite3.connect(path)
+    tracemalloc.start()
+    loaded: list[Any] = load(connection)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    connection.close()
+    del loaded
+    return current
+
+
+def read_rss() -> int:
+    """Текущий RSS процесса в байтах"""
+    try:
+        with open("/proc/self/status") as status:
+            for line in status:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    # ru_maxrss - пиковое значение, в КиБ на Linux и в байтах на macOS
+    maxrss: int = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss if sys.platform == "darwin" else maxrss * 1024
+
+
+def rss_growth(path: str, load_name: str) -> int:
+    """Прирост RSS от загрузки набора; выполняется в дочернем процессе"""
+    connection = sqlite3.connect(path)
+    before: int = read_rss()
+    loaded: list[Any] = LOADERS[load_name](connection)
+    after: int = read_rss()
+    connection.close()
+    del loaded
+    return after - before
+
+
+def measure_rss(path: str, load_name: str) -> int:
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(rss_growth, (path, load_name))
+
+
+LOADERS: dict[str, Callable[[sqlite3.Connection], list[Any]]] = {
+    "json": load_all_json,
+    "packed": load_all_packed,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--cities", type=int, default=10000)
+    parser.add_argument("--reads", type=int, default=20000)
+    args = parser.parse_args()
+
+    payloads: list[dict[str, Any]] = make_payloads(args.cities)
+
+    with tempfile.TemporaryDirectory() as directory:
+        json_path: str = os.path.join(directory, "json.db")
+        packed_path: str = os.path.join(directory, "packed.db")
+        create_json_db(json_path, payloads)
+        create_packed_db(packed_path, payloads)
+
+        results: dict[str, dict[str, float]] = {
+            "json": {
+                "db_size_kib": os.path.getsize(json_path) / 1024,
+                "read_us": measure_reads(json_path, read_json, args.cities, args.reads),
+                "loaded_mib": measure_memory(json_path, load_all_json) / 2**20,
+                "rss_mib": measure_rss(json_path, "json") / 2**20,
+            },
+            "packed": {
+                "db_size_kib": os.path.getsize(packed_path) / 1024,
+                "read_us": measure_reads(packed_path, read_packed, args.cities, args.reads),
+                "loaded_mib": measure_memory(packed_path, load_all_packed) / 2**20,
+                "rss_mib": measure_rss(packed_path, "packed") / 2**20,
+            },
+        }
+
+    print(f"Городов: {args.cities}, чтений одного значения: {args.reads}")
+    print(
+        f"{'формат':<8}{'размер БД, КиБ':>16}{'чтение, мкс':>14}"
+        f"{'объекты, МиБ':>15}{'прирост RSS, МиБ':>18}"
+    )
+    for name, result in results.items():
+        print(
+            f"{name:<8}{result['db_size_kib']:>16.0f}{result['read_us']:>14.1f}"
+            f"{result['loaded_mib']:>15.1f}{result['rss_mib']:>18.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,14 @@
 from contextlib import asynccontextmanager
 
-import aiohttp
 import uvicorn
 from fastapi import FastAPI
 
 from src.api.city import city_router
+from src.api.metrics import metrics_router
+from src.api.service import service_router
 from src.api.weather import weather_router
 from src.background_tasks import WeatherCacheService
-from src.dependencies import SessionLocal
+from src.dependencies import SessionLocal, database_writer, db_maintenance, http_client
 from src.exceptions.city import CityNotFoundError
 from src.exceptions.handlers import (
     city_not_found_handler,
@@ -22,25 +23,38 @@ from src.exceptions.weather import (
     WeatherAPITimeoutError,
     WeatherServiceError,
 )
+from src.config import REQUEST_TIMING_ENABLED
+from src.metrics import MetricsMiddleware
+from src.timing import ServerTimingMiddleware
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    http_session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10))
+    await db_maintenance.start()
+    await database_writer.start()
+    await http_client.start()
 
-    weather_cache = WeatherCacheService(http_session, SessionLocal)
+    weather_cache = WeatherCacheService(http_client, SessionLocal)
 
     await weather_cache.start()
     yield
 
     await weather_cache.stop()
-    await http_session.close()
+    await http_client.close()
+    await database_writer.stop()
+    await db_maintenance.stop()
 
 
 app = FastAPI(title="Open-Meteo API", lifespan=lifespan)
 
 app.include_router(city_router)
 app.include_router(weather_router)
+app.include_router(service_router)
+app.include_router(metrics_router)
+
+app.add_middleware(MetricsMiddleware)
+if REQUEST_TIMING_ENABLED:
+    app.add_middleware(ServerTimingMiddleware)
 
 
 app.add_exception_handler(WeatherAPIError, weather_api_error_handler)
@@ -0,0 +1,40 @@
+"""Запуск в production: несколько процессов uvicorn на одном порту.
+
+Фоновое обновление погоды выполняет только процесс, владеющий арендой в таблице leases,
+остальные процессы обслуживают запросы и подгружают обновлённые данные из БД.
+
+    python server.py --workers 4
+"""
+import argparse
+import importlib.util
+
+import uvicorn
+
+from src.config import SERVER_WORKERS
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="0.0.0.0")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=SERVER_WORKERS)
+    args = parser.parse_args()
+
+    # uvloop и httptools устанавливаются необязательно: pip install .[speedups]
+    loop: str = "uvloop" if importlib.util.find_spec("uvloop") else "asyncio"
+    http: str = "httptools" if importlib.util.find_spec("httptools") else "h11"
+
+    uvicorn.run(
+        "main:app",
+        host=args.host,
+        port=args.port,
+        workers=args.workers,
+        loop=loop,
+        http=http,
+        log_level="info",
+        access_log=False,
+    )
+
+
+if __name__ == "__main__":
+    main()
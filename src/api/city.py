@@ -1,23 +1,33 @@
 from typing import Annotated
 
-import aiohttp
-from fastapi import APIRouter, Depends, Form
+from fastapi import APIRouter, Depends, Form, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.cache.responses import matches
+from src.config import CITY_PAGE_MAX_SIZE
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
+from src.database.writer import DatabaseWriter
 from src.dependencies import (
     get_city_mapper,
     get_city_repo,
-    get_http_session,
+    get_db_session_factory,
+    get_db_writer,
+    get_http_client,
     get_weather_repo,
 )
 from src.mappers.city import CityMapper
 from src.schemas.requests.city import (
     NewCityRequest,
 )
-from src.schemas.responses.city import CityDataResponse
+from src.schemas.responses.city import CityDataResponse, CityImportResponse
+from src.serialization import JSONBytesResponse
 from src.use_cases.create_new_city import GetOrCreateNewCity
+from src.upstream.client import UpstreamClient
 from src.use_cases.get_city_list import GetCityList
+from src.use_cases.import_cities import ImportCities
+from src.use_cases.stream_city_list import StreamCityList
 
 city_router = APIRouter(prefix="/cities", tags=["Cities"])
 
@@ -25,13 +35,43 @@ city_router = APIRouter(prefix="/cities", tags=["Cities"])
 @city_router.get(
     "/", 
     name="Список городов",
-    description="Список всех городов, хранящихся в собственной БД, для которых хранятся данные о погоде с актуальностью 15 минут"
+    description="Список всех городов, хранящихся в собственной БД, для которых хранятся данные о погоде с актуальностью 15 минут. "
+    "С параметрами after_id/limit - постранично по возрастанию ID, курсор следующей страницы возвращается в заголовке X-Next-Cursor. "
+    "Полный список возвращается с ETag, на запрос с актуальным If-None-Match возвращается 304",
+    responses={200: {"content": {"application/x-ndjson": {}}}},
 )
 async def all_cities(
+    request: Request,
+    after_id: int | None = Query(
+        None, ge=0, description="Курсор: вернуть города с ID больше указанного (значение заголовка X-Next-Cursor)"
+    ),
+    limit: int | None = Query(
+        None, ge=1, le=CITY_PAGE_MAX_SIZE, description="Размер страницы. Без after_id и limit возвращается весь список"
+    ),
+    stream: bool = Query(
+        False, description="Выдать города потоком NDJSON (по объекту на строку), limit не применяется"
+    ),
     city_repo: CityRepository = Depends(get_city_repo),
     mapper: CityMapper = Depends(get_city_mapper),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_db_session_factory),
 ) -> list[CityDataResponse]:
-    return await GetCityList(city_repo, mapper)()
+    if stream:
+        return StreamingResponse(
+            StreamCityList(session_factory, mapper)(after_id or 0),
+            media_type="application/x-ndjson",
+        )
+
+    if after_id is None and limit is None:
+        body, version = await GetCityList(city_repo, mapper)()
+        if matches(request.headers.get("if-none-match"), version.etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers())
+        return JSONBytesResponse(body, headers=version.headers())
+
+    cities, next_cursor = await GetCityList(city_repo, mapper).page(
+        after_id or 0, limit or CITY_PAGE_MAX_SIZE
+    )
+    headers: dict[str, str] = {} if next_cursor is None else {"X-Next-Cursor": str(next_cursor)}
+    return JSONBytesResponse(cities, headers=headers)
 
 
 @city_router.post(
@@ -44,13 +84,38 @@ async def add_new_city(
     city_repo: CityRepository = Depends(get_city_repo),
     weather_repo: WeatherRepository = Depends(get_weather_repo),
     mapper: CityMapper = Depends(get_city_mapper),
-    session: aiohttp.ClientSession = Depends(get_http_session),
+    http_client: UpstreamClient = Depends(get_http_client),
 ) -> CityDataResponse:
     return await GetOrCreateNewCity(city_repo, weather_repo, mapper)(
         city_name=data.name,
         latitude=data.latitude,
         longitude=data.longitude,
-        session=session,
+        http_client=http_client,
+    )
+
+
+@city_router.post(
+    "/import",
+    name="Массовое добавление городов",
+    description="Принимает CSV (Content-Type: text/csv, колонки name,latitude,longitude) или NDJSON (Content-Type: application/x-ndjson). Города без координат ищутся через геокодирование. Существующие и повторяющиеся в файле города пропускаются, для каждой строки возвращается результат",
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                "text/csv": {"schema": {"type": "string"}},
+                "application/x-ndjson": {"schema": {"type": "string"}},
+            },
+        }
+    },
+)
+async def import_cities(
+    request: Request,
+    city_repo: CityRepository = Depends(get_city_repo),
+    weather_repo: WeatherRepository = Depends(get_weather_repo),
+    http_client: UpstreamClient = Depends(get_http_client),
+) -> CityImportResponse:
+    return await ImportCities(city_repo, weather_repo)(
+        await request.body(), request.headers.get("content-type", ""), http_client
     )
 
 
@@ -60,8 +125,10 @@ async def add_new_city(
     description="Сервис больше не станет отслеживать данные о погоде для этого города. Все новые данные придётся получать либо по координатам, либо добавлять город в БД вновь"
 )
 async def delete_city(
-    name: str, city_repo: CityRepository = Depends(get_city_repo)
+    name: str,
+    city_repo: CityRepository = Depends(get_city_repo),
+    writer: DatabaseWriter = Depends(get_db_writer),
 ) -> dict[str, str]:
-    await city_repo.delete(name)
+    await writer.submit(lambda session: city_repo.with_session(session).delete(name))
 
     return {"message": "Город удалён"}
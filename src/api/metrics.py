@@ -0,0 +1,66 @@
+from typing import Iterable
+
+from fastapi import APIRouter
+from fastapi.responses import PlainTextResponse
+
+from src.cache.city_directory import city_directory
+from src.cache.forecast import forecast_cache
+from src.cache.geocoding import geocoding_cache
+from src.cache.responses import response_cache
+from src.cache.weather_snapshot import weather_snapshot
+from src.dependencies import database_writer
+from src.metrics import Sample, metrics
+from src.scheduler import refresh_scheduler
+
+metrics_router = APIRouter(tags=["Service"])
+
+CACHES = {
+    "city_directory": city_directory,
+    "weather_snapshot": weather_snapshot,
+    "forecast": forecast_cache,
+    "responses": response_cache,
+}
+
+
+def cache_hits() -> Iterable[Sample]:
+    for name, cache in CACHES.items():
+        yield {"cache": name}, cache.hits
+    # Кэш геокодирования проверяет память, затем таблицу geocoding_cache
+    yield {"cache": "geocoding_memory"}, geocoding_cache.memory_hits
+    yield {"cache": "geocoding_db"}, geocoding_cache.db_hits
+
+
+def cache_misses() -> Iterable[Sample]:
+    for name, cache in CACHES.items():
+        yield {"cache": name}, cache.misses
+    yield {"cache": "geocoding"}, geocoding_cache.misses
+
+
+metrics.collector("cache_hits_total", "Попадания в кэши процесса", "counter", cache_hits)
+metrics.collector("cache_misses_total", "Промахи кэшей процесса", "counter", cache_misses)
+metrics.collector(
+    "db_writer_jobs_total",
+    "Операции, выполненные задачей записи в БД",
+    "counter",
+    lambda: [
+        ({"outcome": "success"}, database_writer.jobs - database_writer.failed_jobs),
+        ({"outcome": "failure"}, database_writer.failed_jobs),
+    ],
+)
+metrics.collector(
+    "weather_refresh_overdue_cities",
+    "Города, срок обновления которых уже наступил",
+    "gauge",
+    lambda: [({}, refresh_scheduler.stats()["overdue"])],
+)
+
+
+@metrics_router.get(
+    "/metrics",
+    name="Метрики процесса в формате Prometheus",
+    description="Длительность запросов по маршрутам, запросы к внешним API и их повторы, длительность SQL-запросов, такты фонового обновления погоды, попадания и промахи кэшей. "
+    "Метрики ведутся отдельно в каждом процессе",
+    response_class=PlainTextResponse,
+)
+async def prometheus_metrics() -> PlainTextResponse:
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
@@ -0,0 +1,72 @@
+from typing import Any
+
+from fastapi import APIRouter
+
+from src.cache.city_directory import city_directory
+from src.cache.forecast import forecast_cache
+from src.cache.geocoding import geocoding_cache
+from src.cache.responses import response_cache
+from src.cache.weather_snapshot import weather_snapshot
+from src.dependencies import database_writer, db_maintenance, http_client
+from src.scheduler import refresh_scheduler
+from src.use_cases.city_service import city_flights, weather_flights
+from src.upstream.governor import upstream_governor
+
+service_router = APIRouter(prefix="/service", tags=["Service"])
+
+
+@service_router.get(
+    "/upstream",
+    name="Состояние очереди запросов к внешним API",
+    description="Глубина очереди по приоритетам, число одновременных запросов к каждому хосту и статистика времени ожидания",
+)
+async def upstream_stats() -> dict[str, Any]:
+    return upstream_governor.stats()
+
+
+@service_router.get(
+    "/http-pools",
+    name="Состояние пулов соединений к внешним API",
+    description="Число запросов, созданных и повторно использованных соединений, попаданий в DNS-кэш для пулов прогноза и геокодирования",
+)
+async def http_pool_stats() -> dict[str, Any]:
+    return http_client.stats()
+
+
+@service_router.get(
+    "/caches",
+    name="Состояние кэшей в памяти процесса",
+    description="Размер, версия и число попаданий/промахов кэшей",
+)
+async def cache_stats() -> dict[str, Any]:
+    return {
+        "city_directory": city_directory.stats(),
+        "weather_snapshot": weather_snapshot.stats(),
+        "forecast": forecast_cache.stats(),
+        "geocoding": geocoding_cache.stats(),
+        "responses": response_cache.stats(),
+        "city_single_flight": city_flights.stats(),
+        "weather_single_flight": weather_flights.stats(),
+    }
+
+
+@service_router.get(
+    "/scheduler",
+    name="Состояние планировщика обновления погоды",
+    description="Число городов в расписании и число городов, срок обновления которых уже наступил",
+)
+async def scheduler_stats() -> dict[str, Any]:
+    return refresh_scheduler.stats()
+
+
+@service_router.get(
+    "/database",
+    name="Настройки и обслуживание SQLite",
+    description="Действующие значения PRAGMA, проверенные при запуске, результат последнего обслуживания БД (PRAGMA optimize, сброс WAL) и статистика задачи записи",
+)
+async def database_stats() -> dict[str, Any]:
+    return {
+        "settings": db_maintenance.settings,
+        "last_maintenance": db_maintenance.last_run,
+        "writer": database_writer.stats(),
+    }
@@ -1,22 +1,33 @@
-import aiohttp
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response, status
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.cache.responses import ResponseVersion, matches
 from src.database.repositories.cities import CityRepository
+from src.config import WEATHER_BATCH_MAX_CITIES
 from src.database.repositories.weather_data import WeatherRepository
 from src.dependencies import (
     get_city_repo,
-    get_http_session,
+    get_db_session_factory,
+    get_http_client,
     get_weather_mapper,
     get_weather_repo,
 )
-from src.enums import WeatherFilters
+from src.enums import SortOrder, WeatherFilters
 from src.mappers.weather import WeatherMapper
 from src.schemas.responses.weather import (
+    CityWeatherValueResponse,
+    WeatherBatchResponse,
     WeatherDataResponse,
+    WeatherRangeResponse,
     WeatherWithFiltersResponse,
 )
+from src.serialization import JSONBytesResponse
+from src.upstream.client import UpstreamClient
 from src.use_cases.current_weather import CurrentCityWeather
+from src.use_cases.search_weather import SearchCitiesByWeather
 from src.use_cases.weather_by_city_name import CityWithWeather
+from src.use_cases.weather_by_city_names import CitiesWithWeather
+from src.use_cases.weather_range_by_city_name import CityWeatherRange
 
 weather_router = APIRouter(prefix="/weather", tags=["Weather"])
 
@@ -30,25 +41,27 @@ async def collect_weather_by_coordinates(
     latitude: float = Query(ge=-90, le=90, description="Ширина"),
     longitude: float = Query(ge=-180, le=180, description="Долгота"),
     mapper: WeatherMapper = Depends(get_weather_mapper),
-    http_session: aiohttp.ClientSession = Depends(get_http_session),
+    http_client: UpstreamClient = Depends(get_http_client),
 ) -> WeatherDataResponse:
     use_case = CurrentCityWeather(mapper)
 
-    return await use_case(latitude, longitude, http_session)
+    return await use_case(latitude, longitude, http_client)
 
 
 @weather_router.get(
     "/",
     name="Сведения о погоде в конкретном городе в конкретный час (Регистр не учитывается)",
-    description="Поиск данных начинается с собственной БД, если города или данных обнаружено не будет, производится запрос к API, полученные данные сохраняются.",
+    description="Поиск данных начинается с собственной БД, если города или данных обнаружено не будет, производится запрос к API, полученные данные сохраняются. "
+    "Ответ содержит ETag и Cache-Control до следующего обновления данных города, на запрос с актуальным If-None-Match возвращается 304",
 )
 async def collect_weather_by_city_name(
+    request: Request,
     city_name: str,
     hour: int = Query(ge=0, le=23, description="Час дня(0-23) в искомом городе"),
     weather_repo: WeatherRepository = Depends(get_weather_repo),
     city_repo: CityRepository = Depends(get_city_repo),
     weather_mapper: WeatherMapper = Depends(get_weather_mapper),
-    http_session: aiohttp.ClientSession = Depends(get_http_session),
+    http_client: UpstreamClient = Depends(get_http_client),
     filters: list[WeatherFilters] | None = Query(
         default=None,
         title="Фильтры погоды",
@@ -56,5 +69,88 @@ async def collect_weather_by_city_name(
     ),
 ) -> WeatherDataResponse | WeatherWithFiltersResponse:
     use_case = CityWithWeather(weather_repo, city_repo, weather_mapper)
+    if_none_match: str | None = request.headers.get("if-none-match")
 
-    return await use_case(city_name, hour, http_session, filters)
+    version: ResponseVersion | None = use_case.not_modified(city_name, hour, filters, if_none_match)
+    if version is not None:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers())
+
+    body, version = await use_case(city_name, hour, http_client, filters)
+    if version is None:
+        return JSONBytesResponse(body)
+    if matches(if_none_match, version.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=version.headers())
+    return JSONBytesResponse(body, headers=version.headers())
+
+
+@weather_router.get(
+    "/range",
+    name="Сведения о погоде в конкретном городе за диапазон часов (Регистр не учитывается)",
+    description="Возвращает значения выбранных показателей за часы от start_hour до end_hour включительно (по умолчанию - за весь день) массивами по показателям. Поиск города и данных - как в GET /weather/",
+)
+async def collect_weather_range_by_city_name(
+    city_name: str,
+    start_hour: int = Query(default=0, ge=0, le=23, description="Первый час диапазона(0-23)"),
+    end_hour: int = Query(default=23, ge=0, le=23, description="Последний час диапазона(0-23), включительно"),
+    weather_repo: WeatherRepository = Depends(get_weather_repo),
+    city_repo: CityRepository = Depends(get_city_repo),
+    weather_mapper: WeatherMapper = Depends(get_weather_mapper),
+    http_client: UpstreamClient = Depends(get_http_client),
+    filters: list[WeatherFilters] | None = Query(
+        default=None,
+        title="Фильтры погоды",
+        description="Выберите данные для получения(По умолчанию температура, скорость ветра и давление)",
+    ),
+) -> WeatherRangeResponse:
+    use_case = CityWeatherRange(weather_repo, city_repo, weather_mapper)
+
+    return JSONBytesResponse(await use_case(city_name, start_hour, end_hour, http_client, filters))
+
+
+@weather_router.get(
+    "/batch",
+    name="Сведения о погоде в нескольких городах в конкретный час (Регистр не учитывается)",
+    description="Возвращает погоду для каждого из переданных городов одним ответом. Города, которых нет в собственной БД, обрабатываются как в GET /weather/. Ошибка по одному городу не влияет на остальные и возвращается в поле error",
+)
+async def collect_weather_by_city_names(
+    city_names: list[str] = Query(
+        min_length=1,
+        max_length=WEATHER_BATCH_MAX_CITIES,
+        description="Названия городов (параметр повторяется для каждого города)",
+    ),
+    hour: int = Query(ge=0, le=23, description="Час дня(0-23) в искомых городах"),
+    weather_repo: WeatherRepository = Depends(get_weather_repo),
+    city_repo: CityRepository = Depends(get_city_repo),
+    weather_mapper: WeatherMapper = Depends(get_weather_mapper),
+    session_factory: async_sessionmaker[AsyncSession] = Depends(get_db_session_factory),
+    http_client: UpstreamClient = Depends(get_http_client),
+    filters: list[WeatherFilters] | None = Query(
+        default=None,
+        title="Фильтры погоды",
+        description="Выберите данные для получения(Может быть пустым)",
+    ),
+) -> WeatherBatchResponse:
+    use_case = CitiesWithWeather(weather_repo, city_repo, weather_mapper, session_factory)
+
+    return JSONBytesResponse(await use_case(city_names, hour, http_client, filters))
+
+
+@weather_router.get(
+    "/search",
+    name="Поиск городов по значению погодного показателя в конкретный час",
+    description="Возвращает отслеживаемые города, у которых выбранный показатель в указанный час попадает в диапазон [min_value, max_value], отсортированные по значению показателя",
+)
+async def search_cities_by_weather(
+    hour: int = Query(ge=0, le=23, description="Час дня(0-23) в искомых городах"),
+    variable: WeatherFilters = Query(
+        default=WeatherFilters.TEMPERATURE, description="Показатель для фильтрации и сортировки"
+    ),
+    min_value: float | None = Query(default=None, description="Нижняя граница значения"),
+    max_value: float | None = Query(default=None, description="Верхняя граница значения"),
+    order: SortOrder = Query(default=SortOrder.DESC, description="Порядок сортировки"),
+    limit: int = Query(default=100, ge=1, le=1000, description="Максимальное число городов"),
+    weather_repo: WeatherRepository = Depends(get_weather_repo),
+) -> list[CityWeatherValueResponse]:
+    use_case = SearchCitiesByWeather(weather_repo)
+
+    return await use_case(hour, variable, min_value, max_value, order, limit)
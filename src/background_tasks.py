@@ -1,26 +1,49 @@
 import asyncio
+import time
+from datetime import datetime, timedelta
 from logging import Logger
 from typing import Any, NoReturn
 
-import aiohttp
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models.cities import CityModel
+from src.cache.weather_snapshot import weather_snapshot
+from src.database.hooks import on_commit
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
+from src.database.writer import DatabaseWriter, database_writer
+from src.enums import UpstreamPriority
+from src.forecast_codec import PackedForecast
+from src.lease import Lease
 from src.mappers.city import CityMapper
 from src.mappers.weather import WeatherMapper
+from src.metrics import refresh_cities, refresh_cycle_duration
+from src.scheduler import RefreshScheduler, refresh_scheduler
+from src.upstream.client import UpstreamClient
 from src.use_cases.fetch_weather_data import FetchWeatherData
 
 from src.logging import get_logger
 logger: Logger = get_logger(__name__)
 
 class WeatherCacheService:
-    def __init__(self, http_session: aiohttp.ClientSession, db_session_factory) -> None:
-        self.http_session: aiohttp.ClientSession = http_session
+    def __init__(
+        self,
+        http_client: UpstreamClient,
+        db_session_factory,
+        writer: DatabaseWriter = database_writer,
+    ) -> None:
+        self.http_client: UpstreamClient = http_client
         self.SessionLocal = db_session_factory
+        self.writer: DatabaseWriter = writer
         self.city_mapper = CityMapper()
         self.weather_mapper = WeatherMapper()
-        self.city_weather = FetchWeatherData()
+        self.city_weather = FetchWeatherData(priority=UpstreamPriority.BACKGROUND)
+        self.scheduler: RefreshScheduler = refresh_scheduler
+        # Обновление выполняет только владелец аренды, остальные процессы подгружают его результаты
+        self.lease: Lease = Lease("weather_refresh", writer)
+        self.synced_at: datetime | None = None
+        # Список городов перечитывается, только когда меняется версия таблицы
+        self.cities: dict[int, dict[str, Any]] = {}
+        self.cities_version: int | None = None
 
     async def start(self) -> None:
         self.task: asyncio.Task[NoReturn] = asyncio.create_task(self._update_loop())
@@ -33,38 +56,144 @@ class WeatherCacheService:
                 await self.task
             except asyncio.CancelledError:
                 pass
+            await self.lease.release()
             logger.info("WeatherCacheService остановлен")
 
     async def _update_loop(self) -> NoReturn:
         while True:
             try:
-                await self._update_all_cities() 
+                was_owner: bool = self.lease.held
+                if await self.lease.renew():
+                    if not was_owner:
+                        # Пока аренда была у другого процесса, сроки в расписании устарели
+                        self.scheduler.clear()
+                    await self._refresh_due_cities()
+                else:
+                    await self._sync_snapshot()
             except Exception as e:
                 logger.error(f"Ошибка обновления кэша: {e}")
 
-            await asyncio.sleep(900)
+            await asyncio.sleep(self.scheduler.tick)
 
-    async def _update_all_cities(self) -> None:
+    async def _refresh_due_cities(self) -> None:
         async with self.SessionLocal() as db_session:
             city_repo = CityRepository(db_session, self.city_mapper)
             weather_repo = WeatherRepository(db_session, self.weather_mapper)
 
-            cities: list[CityModel] = await city_repo.all()
-            logger.info(f"Обновление данных о погоде для {len(cities)} городов")
+            await self._load_cities(city_repo)
+            if set(self.cities) != self.scheduler.city_ids:
+                # Сроки новых городов считаются от updated_at в БД, а не от момента запуска
+                updated_at: dict[int, datetime] = await weather_repo.updated_at()
+                self.scheduler.sync({city_id: updated_at.get(city_id) for city_id in self.cities})
+                logger.info(f"Расписание обновления: {self.scheduler.stats()}")
 
-            weather_datas: list[Any | BaseException] = await asyncio.gather(
-                *[
-                    self.city_weather(city["latitude"], city["longitude"], self.http_session)
-                    for city in cities
-                ],
-                return_exceptions=True,
+            due: list[dict[str, Any]] = [self.cities[city_id] for city_id in self.scheduler.due()]
+            if not due:
+                return
+
+            logger.info(f"Обновление данных о погоде для {len(due)} из {len(self.cities)} городов")
+            cycle_started: float = time.perf_counter()
+
+            weather_datas: list[PackedForecast | Exception] = await self.city_weather.fetch_many(
+                [(city["latitude"], city["longitude"]) for city in due],
+                self.http_client.forecast,
+            )
+
+            updated_at: datetime = datetime.now()
+            fresh: dict[int, PackedForecast] = {
+                city["id"]: weather_data
+                for city, weather_data in zip(due, weather_datas)
+                if not isinstance(weather_data, Exception)
+            }
+
+            async def write(session: AsyncSession) -> tuple[set[int], float]:
+                written, write_time = await weather_repo.with_session(session).bulk_upsert(
+                    fresh, updated_at
+                )
+                # Снимок обновляется в момент коммита: удаление города, закоммиченное
+                # следом, уже не будет перезаписано этими данными
+                on_commit(
+                    session,
+                    lambda: weather_snapshot.publish(
+                        {city_id: (fresh[city_id], updated_at) for city_id in written}
+                    ),
+                )
+                return written, write_time
+
+            # Время от постановки в очередь записи до подтверждения коммита
+            write_started: float = time.perf_counter()
+            try:
+                # Запросы к API могут идти дольше срока аренды: запись выполняется, только если
+                # процесс всё ещё владелец, иначе она перезаписала бы данные нового владельца
+                result: tuple[set[int], float] | None = await self.lease.submit(write)
+            except Exception:
+                for city in due:
+                    self.scheduler.reschedule(city["id"], succeeded=False)
+                refresh_cities.inc("failure", amount=len(due))
+                raise
+            if result is None:
+                logger.warning(
+                    f"Аренда перешла к другому процессу во время обновления, "
+                    f"данные {len(fresh)} городов не записаны"
+                )
+                return
+            written, write_time = result
+            commit_time: float = time.perf_counter() - write_started
+            # Города, удалённые во время запроса к API, не записаны и обновлёнными не считаются
+            fresh = {city_id: data for city_id, data in fresh.items() if city_id in written}
+
+            for city in due:
+                self.scheduler.reschedule(city["id"], succeeded=city["id"] in fresh)
+
+            logger.info(
+                f"Обновлено {len(fresh)}/{len(due)} городов: запись {write_time:.3f} c, "
+                f"до подтверждения коммита {commit_time:.3f} c"
             )
 
-            updated = 0
-            for city, weather_data in zip(cities, weather_datas):
-                if not isinstance(weather_data, Exception):
-                    await weather_repo.update(city["id"], weather_data)
-                    updated += 1
+            refresh_cities.inc("success", amount=len(fresh))
+            refresh_cities.inc("failure", amount=len(due) - len(fresh))
+            refresh_cycle_duration.observe(time.perf_counter() - cycle_started)
+
+    async def _load_cities(self, city_repo: CityRepository) -> None:
+        """Перечитывает ID и координаты городов, если таблица изменилась с прошлого чтения.
+
+        Изменение могло быть сделано другим процессом, поэтому справочник городов
+        сбрасывается, а из снимка погоды убираются удалённые города.
+        """
+        # Версия читается раньше списка: изменение между запросами просто даст лишнее перечитывание
+        version: int = await city_repo.version()
+        if version == self.cities_version:
+            return
+
+        self.cities = await city_repo.coordinates()
+        self.cities_version = version
+        city_repo.directory.clear()
+        weather_snapshot.publish({}, retain=self.cities)
+        logger.info(f"Список городов перечитан: {len(self.cities)}, версия {version}")
+
+    async def _sync_snapshot(self) -> None:
+        """Публикует в снимок данные и изменения списка городов, записанные в БД другими процессами"""
+        # Строки могут быть закоммичены позже, чем проставлен их updated_at,
+        # поэтому окно выборки захватывает предыдущий такт
+        since: datetime | None = (
+            self.synced_at - timedelta(seconds=self.scheduler.tick)
+            if self.synced_at is not None
+            else None
+        )
+        async with self.SessionLocal() as db_session:
+            await self._load_cities(CityRepository(db_session, self.city_mapper))
+            version: int = weather_snapshot.version
+            weather_repo = WeatherRepository(db_session, self.weather_mapper)
+            rows: list[dict[str, Any]] = await weather_repo.updated_since(since)
+
+        if weather_snapshot.version != version:
+            # Пока шло чтение, из снимка удалялись города: строки перечитываются в следующем такте
+            return
 
-            logger.info(f"Обновлено {updated}/{len(cities)} городов")
-            await db_session.commit()
+        filled: int = weather_snapshot.fill(
+            {row["city_id"]: (row["data"], row["updated_at"]) for row in rows}, version
+        )
+        if rows:
+            self.synced_at = max(row["updated_at"] for row in rows)
+        if filled:
+            logger.info(f"В снимок погоды загружены данные {filled} городов из БД")
@@ -0,0 +1,124 @@
+import time
+from collections import OrderedDict
+from logging import Logger
+from typing import Any, Callable, TypeVar
+
+from src.config import CITY_DIRECTORY_MAX_ENTRIES, CITY_DIRECTORY_TTL_SECONDS
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class CityDirectory:
+    """Справочник городов в памяти процесса.
+
+    Каждое изменение таблицы городов увеличивает version: результаты запросов к БД,
+    начатых до изменения, в справочник уже не попадут.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = CITY_DIRECTORY_MAX_ENTRIES,
+        ttl: float = CITY_DIRECTORY_TTL_SECONDS,
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: float = ttl
+        self.version: int = 0
+
+        self._by_name: OrderedDict[str, tuple[float, dict[str, Any]]] = OrderedDict()
+        self._listing: tuple[float, list[dict[str, Any]]] | None = None
+        self._listing_response: Any = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return name.strip().title()
+
+    def get(self, name: str) -> dict[str, Any] | None:
+        entry: tuple[float, dict[str, Any]] | None = self._by_name.get(name)
+        if entry is None or entry[0] < time.monotonic():
+            self.misses += 1
+            return None
+
+        self._by_name.move_to_end(name)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, city: dict[str, Any], version: int | None = None) -> None:
+        if version is not None and version != self.version:
+            return
+
+        self._by_name[city["name"]] = (time.monotonic() + self.ttl, city)
+        self._by_name.move_to_end(city["name"])
+        while len(self._by_name) > self.max_entries:
+            self._by_name.popitem(last=False)
+
+    def listing(self) -> list[dict[str, Any]] | None:
+        if self._listing is None or self._listing[0] < time.monotonic():
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        return self._listing[1]
+
+    def set_listing(self, cities: list[dict[str, Any]], version: int) -> None:
+        # Слишком большой список не кэшируется целиком, чтобы не держать его в памяти
+        if version != self.version or len(cities) > self.max_entries:
+            return
+
+        self._listing = (time.monotonic() + self.ttl, cities)
+        self._listing_response = None
+        for city in cities:
+            self.put(city)
+
+    def listing_response(self, build: Callable[[list[dict[str, Any]]], T]) -> T | None:
+        """Готовый ответ для списка городов, строится один раз на версию справочника.
+
+        Вызывается после CityRepository.all(), которое уже учло попадание или промах,
+        поэтому список читается напрямую, без счётчиков listing().
+        """
+        if self._listing is None or self._listing[0] < time.monotonic():
+            return None
+
+        if self._listing_response is None:
+            self._listing_response = build(self._listing[1])
+        return self._listing_response
+
+    def add(self, city: dict[str, Any]) -> None:
+        self._invalidate_listing()
+        self.put(city)
+
+    def add_many(self, cities: list[dict[str, Any]]) -> None:
+        self._invalidate_listing()
+        for city in cities:
+            self.put(city)
+
+    def remove(self, name: str) -> None:
+        self._invalidate_listing()
+        self._by_name.pop(name, None)
+
+    def clear(self) -> None:
+        self._invalidate_listing()
+        self._by_name.clear()
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "version": self.version,
+            "entries": len(self._by_name),
+            "listing_cached": int(self._listing is not None),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _invalidate_listing(self) -> None:
+        self.version += 1
+        self._listing = None
+        self._listing_response = None
+        logger.info(f"Справочник городов сброшен, версия {self.version}")
+
+
+city_directory = CityDirectory()
@@ -0,0 +1,118 @@
+import sys
+import time
+from collections import OrderedDict
+from logging import Logger
+from typing import Any, Hashable
+
+from src.config import (
+    FORECAST_CACHE_GRID_STEP,
+    FORECAST_CACHE_MAX_BYTES,
+    FORECAST_CACHE_TTL_SECONDS,
+)
+from src.forecast_codec import PackedForecast
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class ForecastCache:
+    """LRU-кэш ответов API прогноза, общий для фонового обновления и запросов пользователей.
+
+    Координаты округляются до центра ячейки сетки (snap), и в API уходит уже центр:
+    точки из одной ячейки получают один и тот же прогноз, в том числе часовой пояс
+    при timezone=auto, который API определяет по переданной точке. Записи истекают
+    на ближайшей границе интервала обновления данных Open-Meteo, а не через
+    фиксированное время после записи.
+    """
+
+    def __init__(
+        self,
+        grid_step: float = FORECAST_CACHE_GRID_STEP,
+        ttl: int = FORECAST_CACHE_TTL_SECONDS,
+        max_bytes: int = FORECAST_CACHE_MAX_BYTES,
+    ) -> None:
+        self.grid_step: float = grid_step
+        self.ttl: int = ttl
+        self.max_bytes: int = max_bytes
+
+        self._entries: OrderedDict[Hashable, tuple[float, int, PackedForecast]] = OrderedDict()
+        self._size: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def snap(self, latitude: float, longitude: float) -> tuple[float, float]:
+        """Центр ячейки сетки, в которую попадает точка (при шаге 0 - сама точка)"""
+        if not self.grid_step:
+            return latitude, longitude
+        return (
+            round(round(latitude / self.grid_step) * self.grid_step, 6),
+            round(round(longitude / self.grid_step) * self.grid_step, 6),
+        )
+
+    def key(self, latitude: float, longitude: float, params: dict[str, Any]) -> Hashable:
+        return (
+            *self.snap(latitude, longitude),
+            tuple(
+                sorted(
+                    (name, str(value))
+                    for name, value in params.items()
+                    if name not in ("latitude", "longitude")
+                )
+            ),
+        )
+
+    def get(self, key: Hashable) -> PackedForecast | None:
+        entry: tuple[float, int, PackedForecast] | None = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        expires_at, size, payload = entry
+        if expires_at <= time.time():
+            self._remove(key)
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return payload
+
+    def put(self, key: Hashable, payload: PackedForecast) -> None:
+        if key in self._entries:
+            self._remove(key)
+
+        size: int = sys.getsizeof(payload)
+        if size > self.max_bytes:
+            return
+
+        # Данные Open-Meteo обновляются на границах интервала ttl
+        expires_at: float = (time.time() // self.ttl + 1) * self.ttl
+        self._entries[key] = (expires_at, size, payload)
+        self._size += size
+
+        while self._size > self.max_bytes:
+            oldest: Hashable = next(iter(self._entries))
+            self._remove(oldest)
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._size -= size
+
+
+forecast_cache = ForecastCache()
@@ -0,0 +1,118 @@
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from logging import Logger
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import (
+    GEOCODING_CACHE_MAX_ENTRIES,
+    GEOCODING_CACHE_TTL_SECONDS,
+    GEOCODING_NEGATIVE_TTL_SECONDS,
+)
+from src.database.repositories.geocoding import GeocodingRepository
+from src.database.writer import DatabaseWriter
+from src.exceptions.repository import RepositoryError, RepositorySaveError
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class GeocodingCache:
+    """Кэш ответов геокодирования: LRU в памяти поверх таблицы geocoding_cache.
+
+    Отрицательные ответы (город не найден) тоже кэшируются, но на меньший срок.
+    Пока кэш не привязан к БД через bind, работает только слой в памяти.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = GEOCODING_CACHE_MAX_ENTRIES,
+        ttl: int = GEOCODING_CACHE_TTL_SECONDS,
+        negative_ttl: int = GEOCODING_NEGATIVE_TTL_SECONDS,
+    ) -> None:
+        self.max_entries: int = max_entries
+        self.ttl: int = ttl
+        self.negative_ttl: int = negative_ttl
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+        self.writer: DatabaseWriter | None = None
+
+        self._entries: OrderedDict[str, tuple[float, dict[str, float] | None]] = OrderedDict()
+
+        self.memory_hits: int = 0
+        self.db_hits: int = 0
+        self.misses: int = 0
+
+    def bind(
+        self, session_factory: async_sessionmaker[AsyncSession], writer: DatabaseWriter
+    ) -> None:
+        self.session_factory = session_factory
+        self.writer = writer
+
+    @staticmethod
+    def normalize(name: str) -> str:
+        return " ".join(name.split()).casefold()
+
+    async def lookup(self, query: str) -> tuple[bool, dict[str, float] | None]:
+        """Возвращает (найдено ли в кэше, координаты или None для отрицательного ответа)"""
+        entry: tuple[float, dict[str, float] | None] | None = self._entries.get(query)
+        if entry is not None and entry[0] > time.time():
+            self._entries.move_to_end(query)
+            self.memory_hits += 1
+            return True, entry[1]
+
+        if self.session_factory is not None:
+            try:
+                async with self.session_factory() as session:
+                    record = await GeocodingRepository(session).get(query)
+            except RepositoryError as e:
+                logger.warning(f"Кэш геокодирования в БД недоступен: {e}")
+                record = None
+
+            if record is not None:
+                coordinates: dict[str, float] | None = (
+                    {"latitude": record.latitude, "longitude": record.longitude}
+                    if record.latitude is not None
+                    else None
+                )
+                self._remember(query, coordinates, record.expires_at.timestamp())
+                self.db_hits += 1
+                return True, coordinates
+
+        self.misses += 1
+        return False, None
+
+    async def store(self, query: str, coordinates: dict[str, float] | None) -> None:
+        ttl: int = self.ttl if coordinates is not None else self.negative_ttl
+        expires_at: datetime = datetime.now() + timedelta(seconds=ttl)
+        self._remember(query, coordinates, expires_at.timestamp())
+
+        if self.writer is None:
+            return
+
+        try:
+            await self.writer.submit(
+                lambda session: GeocodingRepository(session).save(query, coordinates, expires_at)
+            )
+        except (RepositorySaveError, SQLAlchemyError, RuntimeError) as e:
+            logger.warning(f"Не удалось сохранить '{query}' в кэш геокодирования в БД: {e}")
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+        }
+
+    def _remember(
+        self, query: str, coordinates: dict[str, float] | None, expires_at: float
+    ) -> None:
+        self._entries[query] = (expires_at, coordinates)
+        self._entries.move_to_end(query)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+
+geocoding_cache = GeocodingCache()
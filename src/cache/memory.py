@@ -0,0 +1,12 @@
+import sys
+from typing import Any, Mapping
+
+
+def deep_size(value: Any) -> int:
+    """Приблизительный объём памяти, занимаемый значением вместе с вложенными объектами"""
+    size: int = sys.getsizeof(value)
+    if isinstance(value, Mapping):
+        size += sum(deep_size(key) + deep_size(item) for key, item in value.items())
+    elif isinstance(value, (list, tuple)):
+        size += sum(deep_size(item) for item in value)
+    return size
@@ -0,0 +1,106 @@
+import hashlib
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from email.utils import formatdate
+from typing import Any, Hashable
+
+from src.config import RESPONSE_CACHE_MAX_BYTES
+
+
+@dataclass(frozen=True, slots=True)
+class ResponseVersion:
+    """Версия ответа для условных запросов: ETag и срок, до которого ответ не изменится"""
+
+    etag: str
+    # None - срок неизвестен, клиент должен проверять ответ при каждом запросе
+    expires_at: float | None = None
+
+    def headers(self) -> dict[str, str]:
+        if self.expires_at is None:
+            return {"ETag": self.etag, "Cache-Control": "no-cache"}
+
+        max_age: int = max(0, int(self.expires_at - time.time()))
+        return {
+            "ETag": self.etag,
+            "Cache-Control": f"max-age={max_age}",
+            "Expires": formatdate(time.time() + max_age, usegmt=True),
+        }
+
+
+def make_etag(key: Hashable, version: Any) -> str:
+    """Сильный ETag из ключа ответа и версии данных, из которых он построен"""
+    return '"' + hashlib.blake2b(repr((key, version)).encode(), digest_size=12).hexdigest() + '"'
+
+
+def matches(if_none_match: str | None, etag: str) -> bool:
+    """Совпадает ли ETag с одним из значений заголовка If-None-Match"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        # Для If-None-Match действует слабое сравнение: префикс W/ не учитывается
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+class ResponseCache:
+    """LRU-кэш сериализованных ответов с ограничением по объёму.
+
+    Запись хранит версию данных, из которых построен ответ: после обновления
+    данных запись с прежней версией считается промахом и заменяется.
+    """
+
+    def __init__(self, max_bytes: int = RESPONSE_CACHE_MAX_BYTES) -> None:
+        self.max_bytes: int = max_bytes
+
+        self._entries: OrderedDict[Hashable, tuple[Any, bytes]] = OrderedDict()
+        self._size: int = 0
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.evictions: int = 0
+
+    def get(self, key: Hashable, version: Any) -> bytes | None:
+        entry: tuple[Any, bytes] | None = self._entries.get(key)
+        if entry is None or entry[0] != version:
+            self.misses += 1
+            return None
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def put(self, key: Hashable, version: Any, body: bytes) -> None:
+        if key in self._entries:
+            self._remove(key)
+        if len(body) > self.max_bytes:
+            return
+
+        self._entries[key] = (version, body)
+        self._size += len(body)
+
+        while self._size > self.max_bytes:
+            self._remove(next(iter(self._entries)))
+            self.evictions += 1
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self._size = 0
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, body = self._entries.pop(key)
+        self._size -= len(body)
+
+
+response_cache = ResponseCache()
@@ -0,0 +1,121 @@
+import sys
+from dataclasses import dataclass
+from datetime import datetime
+from logging import Logger
+from typing import Iterable
+
+from src.forecast_codec import PackedForecast
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class WeatherSnapshotEntry:
+    city_id: int
+    data: PackedForecast
+    updated_at: datetime
+    size: int
+
+
+class WeatherSnapshotStore:
+    """Последние данные о погоде по всем городам в памяти процесса.
+
+    Все изменения выполняются синхронно в одном цикле событий, поэтому читатели
+    не видят частичных изменений. Изменение одного города - O(1): словарь
+    обновляется на месте, суммарный размер ведётся счётчиком.
+
+    put и publish вызываются после коммита записи и перезаписывают снимок безусловно.
+    Данные, прочитанные из БД, добавляются через fill: каждое удаление из снимка
+    увеличивает version, и чтение, начатое до удаления, город уже не вернёт.
+    """
+
+    def __init__(self) -> None:
+        self._entries: dict[int, WeatherSnapshotEntry] = {}
+        self._size: int = 0
+        self.version: int = 0
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def get(self, city_id: int) -> WeatherSnapshotEntry | None:
+        entry: WeatherSnapshotEntry | None = self._entries.get(city_id)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def peek(self, city_id: int) -> WeatherSnapshotEntry | None:
+        """Запись снимка без учёта в статистике попаданий"""
+        return self._entries.get(city_id)
+
+    def publish(
+        self,
+        payloads: dict[int, tuple[PackedForecast, datetime]],
+        retain: Iterable[int] | None = None,
+    ) -> None:
+        """Публикует новые данные.
+
+        Если передан retain, снимок строится заново: из текущего снимка остаются
+        только города из retain, остальные (например, удалённые) отбрасываются.
+        """
+        if retain is not None:
+            current: dict[int, WeatherSnapshotEntry] = self._entries
+            self._entries = {city_id: current[city_id] for city_id in retain if city_id in current}
+            self._size = sum(entry.size for entry in self._entries.values())
+            self.version += 1
+
+        for city_id, (data, updated_at) in payloads.items():
+            self.put(city_id, data, updated_at)
+
+    def fill(self, payloads: dict[int, tuple[PackedForecast, datetime]], version: int) -> int:
+        """Добавляет данные, прочитанные из БД; version - значение self.version до чтения.
+
+        Запись снимка заменяется, только если она старше прочитанной, а если после
+        начала чтения из снимка что-то удалялось, не добавляется ничего.
+        Возвращает число добавленных городов.
+        """
+        if version != self.version:
+            return 0
+
+        filled: int = 0
+        for city_id, (data, updated_at) in payloads.items():
+            entry: WeatherSnapshotEntry | None = self._entries.get(city_id)
+            if entry is None or entry.updated_at < updated_at:
+                self.put(city_id, data, updated_at)
+                filled += 1
+        return filled
+
+    def put(self, city_id: int, data: PackedForecast, updated_at: datetime) -> None:
+        self._pop(city_id)
+        entry = WeatherSnapshotEntry(
+            city_id=city_id, data=data, updated_at=updated_at, size=sys.getsizeof(data)
+        )
+        self._entries[city_id] = entry
+        self._size += entry.size
+
+    def discard(self, city_id: int) -> None:
+        self._pop(city_id)
+        self.version += 1
+
+    def clear(self) -> None:
+        self._entries = {}
+        self._size = 0
+        self.version += 1
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "version": self.version,
+            "entries": len(self._entries),
+            "size_bytes": self._size,
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+    def _pop(self, city_id: int) -> None:
+        entry: WeatherSnapshotEntry | None = self._entries.pop(city_id, None)
+        if entry is not None:
+            self._size -= entry.size
+
+
+weather_snapshot = WeatherSnapshotStore()
@@ -0,0 +1,86 @@
+import os
+
+# Пакетный запрос прогноза: сколько городов уходит в один запрос к Open-Meteo
+WEATHER_BATCH_SIZE: int = int(os.getenv("WEATHER_BATCH_SIZE", "100"))
+# Сколько пакетов обрабатывается одновременно во время обновления кэша
+WEATHER_BATCH_CONCURRENCY: int = int(os.getenv("WEATHER_BATCH_CONCURRENCY", "4"))
+
+# Адреса API Open-Meteo: для нагрузочного теста их заменяет локальная имитация (benchmarks/fake_upstream.py)
+OPEN_METEO_FORECAST_URL: str = os.getenv("OPEN_METEO_FORECAST_URL", "https://api.open-meteo.com/v1/forecast")
+OPEN_METEO_GEOCODING_URL: str = os.getenv("OPEN_METEO_GEOCODING_URL", "https://geocoding-api.open-meteo.com/v1/search")
+
+# Общий бюджет запросов к внешним API (токен-бакет) на весь процесс
+UPSTREAM_RATE_PER_SECOND: float = float(os.getenv("UPSTREAM_RATE_PER_SECOND", "10"))
+UPSTREAM_BURST: int = int(os.getenv("UPSTREAM_BURST", "20"))
+UPSTREAM_MAX_IN_FLIGHT_PER_HOST: int = int(os.getenv("UPSTREAM_MAX_IN_FLIGHT_PER_HOST", "8"))
+
+# Пулы соединений к внешним API (общие для всех обработчиков и фонового обновления)
+FORECAST_POOL_SIZE: int = int(os.getenv("FORECAST_POOL_SIZE", "20"))
+GEOCODING_POOL_SIZE: int = int(os.getenv("GEOCODING_POOL_SIZE", "5"))
+UPSTREAM_KEEPALIVE_SECONDS: float = float(os.getenv("UPSTREAM_KEEPALIVE_SECONDS", "60"))
+UPSTREAM_DNS_CACHE_SECONDS: int = int(os.getenv("UPSTREAM_DNS_CACHE_SECONDS", "300"))
+UPSTREAM_TIMEOUT_SECONDS: float = float(os.getenv("UPSTREAM_TIMEOUT_SECONDS", "10"))
+
+# Кэш справочника городов в памяти процесса
+CITY_DIRECTORY_MAX_ENTRIES: int = int(os.getenv("CITY_DIRECTORY_MAX_ENTRIES", "50000"))
+CITY_DIRECTORY_TTL_SECONDS: float = float(os.getenv("CITY_DIRECTORY_TTL_SECONDS", "300"))
+
+# Кэш ответов API прогноза: координаты округляются до центра ячейки сетки (0 - без округления)
+# и в таком виде уходят в API, записи живут до следующего обновления данных Open-Meteo (раз в 15 минут)
+FORECAST_CACHE_GRID_STEP: float = float(os.getenv("FORECAST_CACHE_GRID_STEP", "0.1"))
+FORECAST_CACHE_TTL_SECONDS: int = int(os.getenv("FORECAST_CACHE_TTL_SECONDS", "900"))
+FORECAST_CACHE_MAX_BYTES: int = int(os.getenv("FORECAST_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+
+# Кэш геокодирования: найденные координаты хранятся долго, ответы "не найдено" - недолго
+GEOCODING_CACHE_TTL_SECONDS: int = int(os.getenv("GEOCODING_CACHE_TTL_SECONDS", str(30 * 24 * 3600)))
+GEOCODING_NEGATIVE_TTL_SECONDS: int = int(os.getenv("GEOCODING_NEGATIVE_TTL_SECONDS", "3600"))
+GEOCODING_CACHE_MAX_ENTRIES: int = int(os.getenv("GEOCODING_CACHE_MAX_ENTRIES", "10000"))
+
+# Размер пачки строк в одном executemany при массовой записи данных о погоде
+WEATHER_UPSERT_BATCH_SIZE: int = int(os.getenv("WEATHER_UPSERT_BATCH_SIZE", "500"))
+
+# Планировщик обновления: популярные города обновляются раз в REFRESH_MIN_INTERVAL_SECONDS,
+# города без обращений - раз в REFRESH_MAX_INTERVAL_SECONDS
+REFRESH_MIN_INTERVAL_SECONDS: float = float(os.getenv("REFRESH_MIN_INTERVAL_SECONDS", "900"))
+REFRESH_MAX_INTERVAL_SECONDS: float = float(os.getenv("REFRESH_MAX_INTERVAL_SECONDS", "10800"))
+REFRESH_RETRY_SECONDS: float = float(os.getenv("REFRESH_RETRY_SECONDS", "120"))
+REFRESH_TICK_SECONDS: float = float(os.getenv("REFRESH_TICK_SECONDS", "15"))
+REFRESH_JITTER: float = float(os.getenv("REFRESH_JITTER", "0.1"))
+ACCESS_HALF_LIFE_SECONDS: float = float(os.getenv("ACCESS_HALF_LIFE_SECONDS", "3600"))
+
+# Аренда фонового обновления: из нескольких процессов обновление выполняет только владелец аренды,
+# при остановке владельца аренду через REFRESH_LEASE_TTL_SECONDS перехватывает другой процесс
+REFRESH_LEASE_TTL_SECONDS: float = float(os.getenv("REFRESH_LEASE_TTL_SECONDS", "60"))
+
+# Число процессов uvicorn при запуске через server.py
+SERVER_WORKERS: int = int(os.getenv("SERVER_WORKERS", str(os.cpu_count() or 1)))
+
+# Подключение к БД и профиль настроек SQLite (см. src/database/sqlite.py)
+DATABASE_URL: str = os.getenv("DATABASE_URL", "sqlite+aiosqlite:///weather.db")
+SQLITE_PROFILE: str = os.getenv("SQLITE_PROFILE", "balanced")
+# Период PRAGMA optimize и сброса WAL в основной файл БД
+SQLITE_MAINTENANCE_INTERVAL_SECONDS: float = float(
+    os.getenv("SQLITE_MAINTENANCE_INTERVAL_SECONDS", "3600")
+)
+
+# Максимальное число операций записи, объединяемых в одну транзакцию
+WRITER_MAX_BATCH: int = int(os.getenv("WRITER_MAX_BATCH", "64"))
+
+# Максимальный размер страницы GET /cities/ и число строк в одной порции потоковой выдачи
+CITY_PAGE_MAX_SIZE: int = int(os.getenv("CITY_PAGE_MAX_SIZE", "1000"))
+CITY_STREAM_BATCH_SIZE: int = int(os.getenv("CITY_STREAM_BATCH_SIZE", "500"))
+
+# Импорт городов: максимальное число строк в файле и одновременных запросов геокодирования
+CITY_IMPORT_MAX_ROWS: int = int(os.getenv("CITY_IMPORT_MAX_ROWS", "50000"))
+CITY_IMPORT_GEOCODING_CONCURRENCY: int = int(os.getenv("CITY_IMPORT_GEOCODING_CONCURRENCY", "8"))
+
+# Пакетный запрос погоды: максимальное число городов и одновременно обрабатываемых промахов
+WEATHER_BATCH_MAX_CITIES: int = int(os.getenv("WEATHER_BATCH_MAX_CITIES", "500"))
+WEATHER_BATCH_MISS_CONCURRENCY: int = int(os.getenv("WEATHER_BATCH_MISS_CONCURRENCY", "8"))
+
+# Кэш сериализованных ответов GET /weather/ по (город, час, фильтры), объём в байтах
+RESPONSE_CACHE_MAX_BYTES: int = int(os.getenv("RESPONSE_CACHE_MAX_BYTES", str(16 * 1024 * 1024)))
+
+# Разбивка времени обработки запроса по этапам: заголовок Server-Timing и журнал медленных запросов
+REQUEST_TIMING_ENABLED: bool = os.getenv("REQUEST_TIMING_ENABLED", "false").lower() in ("1", "true", "yes")
+REQUEST_TIMING_SLOW_SECONDS: float = float(os.getenv("REQUEST_TIMING_SLOW_SECONDS", "1.0"))
@@ -0,0 +1,32 @@
+from typing import Callable
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+_CALLBACKS_KEY = "on_commit_callbacks"
+
+
+def on_commit(session: AsyncSession | Session, callback: Callable[[], None]) -> None:
+    """Выполняет callback после успешного коммита транзакции сессии, при откате - отбрасывает"""
+    session.info.setdefault(_CALLBACKS_KEY, []).append(callback)
+
+
+def pending_callbacks(session: AsyncSession | Session) -> int:
+    return len(session.info.get(_CALLBACKS_KEY, []))
+
+
+def discard_callbacks(session: AsyncSession | Session, keep: int = 0) -> None:
+    """Отбрасывает callback'и, зарегистрированные после первых keep (например, при откате SAVEPOINT)"""
+    del session.info.get(_CALLBACKS_KEY, [])[keep:]
+
+
+@event.listens_for(Session, "after_commit")
+def _run_callbacks(session: Session) -> None:
+    for callback in session.info.pop(_CALLBACKS_KEY, []):
+        callback()
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_callbacks(session: Session) -> None:
+    session.info.pop(_CALLBACKS_KEY, None)
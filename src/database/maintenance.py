@@ -0,0 +1,69 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Any, NoReturn
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import SQLITE_MAINTENANCE_INTERVAL_SECONDS
+from src.database.sqlite import SQLiteProfile, check_profile
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class DatabaseMaintenance:
+    """Проверка настроек SQLite при запуске и периодическое обслуживание БД.
+
+    PRAGMA optimize обновляет статистику планировщика запросов, а сброс WAL
+    не даёт файлу журнала расти после массовых обновлений погоды.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        profile: SQLiteProfile,
+        interval: float = SQLITE_MAINTENANCE_INTERVAL_SECONDS,
+    ) -> None:
+        self.engine: AsyncEngine = engine
+        self.profile: SQLiteProfile = profile
+        self.interval: float = interval
+        self.settings: dict[str, Any] = {}
+        self.last_run: dict[str, Any] = {}
+
+    async def start(self) -> None:
+        self.settings = await check_profile(self.engine, self.profile)
+        self.task: asyncio.Task[NoReturn] = asyncio.create_task(self._maintenance_loop())
+
+    async def stop(self) -> None:
+        if hasattr(self, "task"):
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+
+    async def run(self) -> dict[str, Any]:
+        started: float = time.perf_counter()
+        async with self.engine.connect() as connection:
+            await connection.execute(text("PRAGMA optimize"))
+            result: dict[str, Any] = {}
+            if self.profile.journal_mode == "wal":
+                busy, wal_pages, checkpointed = (
+                    await connection.execute(text("PRAGMA wal_checkpoint(TRUNCATE)"))
+                ).one()
+                result = {"busy": bool(busy), "wal_pages": wal_pages, "checkpointed": checkpointed}
+
+        result["duration"] = round(time.perf_counter() - started, 3)
+        logger.info(f"Обслуживание БД выполнено: {result}")
+        self.last_run = result
+        return result
+
+    async def _maintenance_loop(self) -> NoReturn:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.run()
+            except Exception as e:
+                logger.error(f"Ошибка обслуживания БД: {e}")
@@ -16,3 +16,6 @@ class CityModel(Base):
     measurements: Mapped["WeatherDataModel"] = relationship(
         back_populates="city", cascade="all, delete"
     )
+    hours: Mapped[list["WeatherHourModel"]] = relationship(
+        back_populates="city", cascade="all, delete"
+    )
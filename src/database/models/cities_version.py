@@ -0,0 +1,33 @@
+from sqlalchemy import DDL, Integer, event
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.models.base import Base
+
+# Триггеры увеличивают счётчик при любом изменении таблицы городов, каким бы путём
+# оно ни было сделано; в миграции 3b1f0c6d2e87 создаются те же самые
+TRIGGERS: list[str] = [
+    f"CREATE TRIGGER cities_version_{operation.lower()} AFTER {operation} ON cities "
+    "BEGIN UPDATE cities_version SET version = version + 1; END"
+    for operation in ("INSERT", "UPDATE", "DELETE")
+]
+
+
+class CitiesVersionModel(Base):
+    """Единственная строка со счётчиком изменений таблицы cities.
+
+    По нему процессы дешёвым запросом узнают, что их копия списка городов устарела.
+    """
+
+    __tablename__ = "cities_version"
+
+    id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+
+
+event.listen(
+    CitiesVersionModel.__table__,
+    "after_create",
+    DDL("INSERT INTO cities_version (id, version) VALUES (1, 0)"),
+)
+for trigger in TRIGGERS:
+    event.listen(CitiesVersionModel.__table__, "after_create", DDL(trigger))
@@ -0,0 +1,18 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.models.base import Base
+
+
+class GeocodingCacheModel(Base):
+    __tablename__ = "geocoding_cache"
+
+    query: Mapped[str] = mapped_column(String(length=255), primary_key=True)
+
+    # Пустые координаты - запомненный ответ "город не найден"
+    latitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+    longitude: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
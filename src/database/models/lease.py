@@ -0,0 +1,14 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.database.models.base import Base
+
+
+class LeaseModel(Base):
+    __tablename__ = "leases"
+
+    name: Mapped[str] = mapped_column(String(length=64), primary_key=True)
+    owner: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)
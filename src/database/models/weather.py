@@ -1,6 +1,6 @@
 from typing import Any
 from datetime import datetime
-from sqlalchemy import JSON, ForeignKey, Integer, DateTime
+from sqlalchemy import JSON, ForeignKey, Integer, DateTime, LargeBinary, String
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from src.database.models.base import Base
 
@@ -9,9 +9,18 @@ class WeatherDataModel(Base):
     __tablename__ = "weather_data"
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
-    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"))
-    data: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), unique=True, index=True)
 
-    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, nullable=False)
+    # Почасовой прогноз в формате PackedForecast: имена переменных через запятую,
+    # значения float32 подряд по переменным, время первого часа (UTC, секунды)
+    variables: Mapped[str] = mapped_column(String(length=255), nullable=False)
+    hourly: Mapped[bytes] = mapped_column(LargeBinary, nullable=False)
+    start_time: Mapped[int] = mapped_column(Integer, nullable=False)
+    meta: Mapped[dict[str, Any]] = mapped_column(JSON, nullable=False)
+
+    # Индекс нужен процессам без аренды обновления: они догружают строки, обновлённые владельцем
+    updated_at: Mapped[datetime] = mapped_column(
+        DateTime, default=datetime.now, nullable=False, index=True
+    )
 
     city: Mapped["CityModel"] = relationship(back_populates="measurements")
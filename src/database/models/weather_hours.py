@@ -0,0 +1,30 @@
+from sqlalchemy import Float, ForeignKey, Index, Integer
+from sqlalchemy.orm import Mapped, mapped_column, relationship
+
+from src.database.models.base import Base
+
+
+class WeatherHourModel(Base):
+    """Почасовые значения прогноза по городам для запросов с фильтрацией по всем городам"""
+
+    __tablename__ = "weather_hours"
+
+    city_id: Mapped[int] = mapped_column(ForeignKey("cities.id"), primary_key=True)
+    hour: Mapped[int] = mapped_column(Integer, primary_key=True)
+
+    # Имена колонок совпадают со значениями WeatherFilters
+    temperature: Mapped[float | None] = mapped_column(Float, nullable=True)
+    wind_speed: Mapped[float | None] = mapped_column(Float, nullable=True)
+    pressure_msl: Mapped[float | None] = mapped_column(Float, nullable=True)
+    humidity: Mapped[float | None] = mapped_column(Float, nullable=True)
+    precipitation: Mapped[float | None] = mapped_column(Float, nullable=True)
+
+    city: Mapped["CityModel"] = relationship(back_populates="hours")
+
+    __table_args__ = (
+        Index("ix_weather_hours_hour_temperature", "hour", "temperature"),
+        Index("ix_weather_hours_hour_wind_speed", "hour", "wind_speed"),
+        Index("ix_weather_hours_hour_pressure_msl", "hour", "pressure_msl"),
+        Index("ix_weather_hours_hour_humidity", "hour", "humidity"),
+        Index("ix_weather_hours_hour_precipitation", "hour", "precipitation"),
+    )
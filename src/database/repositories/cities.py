@@ -1,12 +1,17 @@
 from logging import Logger
-from typing import Any, Tuple
+from typing import Any, AsyncIterator, Tuple
 
 from sqlalchemy import Result
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.future import select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache.city_directory import CityDirectory, city_directory
+from src.cache.weather_snapshot import weather_snapshot
+from src.database.hooks import on_commit
 from src.database.models.cities import CityModel
+from src.database.models.cities_version import CitiesVersionModel
 from src.exceptions.city import CityNotFoundError
 from src.exceptions.repository import RepositoryError, RepositorySaveError
 from src.logging import get_logger
@@ -16,21 +21,92 @@ logger: Logger = get_logger(__name__)
 
 
 class CityRepository:
-    def __init__(self, session: AsyncSession, mapper: CityMapper) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        mapper: CityMapper,
+        directory: CityDirectory = city_directory,
+    ) -> None:
         self.session: AsyncSession = session
         self.mapper: CityMapper = mapper
+        self.directory: CityDirectory = directory
+
+    def with_session(self, session: AsyncSession) -> "CityRepository":
+        """Тот же репозиторий поверх другой сессии, например сессии DatabaseWriter"""
+        return CityRepository(session, self.mapper, self.directory)
 
     async def all(self) -> list[dict[str, Any]]:
+        cached: list[dict[str, Any]] | None = self.directory.listing()
+        if cached is not None:
+            return cached
+
+        version: int = self.directory.version
         logger.info("Обращение к БД для получения полного списка доступных городов")
         cities: Result[Tuple[CityModel]] = await self.session.execute(select(CityModel))
         cities = cities.scalars().all()
         logger.info(f"Успешно извлечены данные о {len(cities)} городах")
 
-        return [self.mapper.to_dto(city) for city in cities]
+        result: list[dict[str, Any]] = [self.mapper.to_dto(city) for city in cities]
+        self.directory.set_listing(result, version)
+        return result
+
+    async def version(self) -> int:
+        """Счётчик изменений таблицы городов (увеличивается триггерами при каждом изменении)"""
+        try:
+            version: int | None = await self.session.scalar(select(CitiesVersionModel.version))
+            return version or 0
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при чтении версии списка городов: {e}")
+            raise RepositoryError(f"Ошибка чтения версии списка городов: {e}") from e
+
+    async def coordinates(self) -> dict[int, dict[str, Any]]:
+        """ID и координаты всех городов без ORM-объектов и справочника"""
+        try:
+            result = await self.session.execute(
+                select(CityModel.id, CityModel.latitude, CityModel.longitude)
+            )
+            return {row["id"]: dict(row) for row in result.mappings()}
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при получении координат городов: {e}")
+            raise RepositoryError(f"Ошибка получения координат городов: {e}") from e
+
+    async def page(self, after_id: int, limit: int) -> list[dict[str, Any]]:
+        """Города с ID больше after_id по возрастанию ID (пагинация по ключу)"""
+        try:
+            logger.info(f"Получение {limit} городов после ID={after_id}")
+            result: Result[Tuple[CityModel]] = await self.session.execute(
+                select(CityModel).where(CityModel.id > after_id).order_by(CityModel.id).limit(limit)
+            )
+            return [self.mapper.to_dto(city) for city in result.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при получении страницы списка городов: {e}")
+            raise RepositoryError(f"Ошибка получения списка городов: {e}") from e
+
+    async def stream(
+        self, after_id: int, batch_size: int
+    ) -> AsyncIterator[list[tuple[int, str, float, float]]]:
+        """Города с ID больше after_id порциями по batch_size строк прямо с курсора БД, без ORM-объектов"""
+        try:
+            result = await self.session.stream(
+                select(CityModel.id, CityModel.name, CityModel.latitude, CityModel.longitude)
+                .where(CityModel.id > after_id)
+                .order_by(CityModel.id)
+                .execution_options(yield_per=batch_size)
+            )
+            async for rows in result.partitions():
+                yield [tuple(row) for row in rows]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при потоковой выдаче списка городов: {e}")
+            raise RepositoryError(f"Ошибка получения списка городов: {e}") from e
 
     async def _get(self, name: str) -> dict[str, Any]:
+        name = self.directory.normalize(name)
+        cached: dict[str, Any] | None = self.directory.get(name)
+        if cached is not None:
+            return cached
+
+        version: int = self.directory.version
         try:
-            name = name.strip().title()
             logger.info(f"Поиск города {name} в собственной БД")
             result: Result[Tuple[CityModel]] = await self.session.execute(
                 select(CityModel).where(CityModel.name == name)
@@ -42,7 +118,9 @@ class CityRepository:
                 raise CityNotFoundError(name)
 
             logger.info(f"Город {name} найден в собственной БД(ID={city.id})")
-            return self.mapper.to_dto(city)
+            dto: dict[str, Any] = self.mapper.to_dto(city)
+            self.directory.put(dto, version)
+            return dto
         except SQLAlchemyError as e:
             logger.error(f"Ошибка БД при поиске города {name}: {e}")
             raise RepositoryError(
@@ -50,7 +128,7 @@ class CityRepository:
             ) from e
 
     async def save(self, data: dict) -> dict[str, Any]:
-        data["name"] = data["name"].strip().title()
+        data["name"] = self.directory.normalize(data["name"])
 
         name: str = data["name"]
         latitude: float = data["latitude"]
@@ -65,7 +143,9 @@ class CityRepository:
 
             await self.session.refresh(city)
             logger.info(f"Город {name} успешно сохранен в БД(ID={city.id})")
-            return self.mapper.to_dto(city)
+            dto: dict[str, Any] = self.mapper.to_dto(city)
+            on_commit(self.session, lambda: self.directory.add(dto))
+            return dto
         except IntegrityError as e:
             logger.error(
                 f"Ошибка согласованности данных при сохранениее данных о городе {name}: {e}"
@@ -75,9 +155,81 @@ class CityRepository:
             logger.error(f"Ошибка БД во время сохранения данных о городе {name}: {e}")
             raise RepositorySaveError(f"Ошибка сохранения '{name}': {e}") from e
 
+    async def get_many(self, names: list[str], batch_size: int = 500) -> dict[str, dict[str, Any]]:
+        """Города по именам: из справочника, недостающие - запросом с IN пачками по batch_size имён.
+
+        Имена, которых нет в БД, в результат не попадают.
+        """
+        found: dict[str, dict[str, Any]] = {}
+        missing: list[str] = []
+        for name in {self.directory.normalize(name) for name in names}:
+            cached: dict[str, Any] | None = self.directory.get(name)
+            if cached is None:
+                missing.append(name)
+            else:
+                found[name] = cached
+
+        if not missing:
+            return found
+
+        version: int = self.directory.version
+        try:
+            logger.info(f"Поиск {len(missing)} городов в собственной БД")
+            for start in range(0, len(missing), batch_size):
+                result: Result[Tuple[CityModel]] = await self.session.execute(
+                    select(CityModel).where(CityModel.name.in_(missing[start : start + batch_size]))
+                )
+                for city in result.scalars():
+                    dto: dict[str, Any] = self.mapper.to_dto(city)
+                    self.directory.put(dto, version)
+                    found[dto["name"]] = dto
+            return found
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при поиске городов: {e}")
+            raise RepositoryError(f"Ошибка поиска городов: {e}") from e
+
+    async def existing_names(self, names: list[str], batch_size: int = 500) -> set[str]:
+        """Имена из names, уже сохранённые в БД (запрос с IN пачками по batch_size имён)"""
+        found: set[str] = set()
+        try:
+            for start in range(0, len(names), batch_size):
+                result = await self.session.execute(
+                    select(CityModel.name).where(CityModel.name.in_(names[start : start + batch_size]))
+                )
+                found.update(result.scalars())
+            return found
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при проверке существующих городов: {e}")
+            raise RepositoryError(f"Ошибка проверки существующих городов: {e}") from e
+
+    async def insert_many(
+        self, cities: list[dict[str, Any]], batch_size: int = 500
+    ) -> list[dict[str, Any]]:
+        """Сохраняет города пачками INSERT ... ON CONFLICT DO NOTHING RETURNING.
+
+        Возвращает только добавленные города: уже существующие имена пропускаются.
+        """
+        statement = insert(CityModel).on_conflict_do_nothing(index_elements=[CityModel.name])
+        created: list[dict[str, Any]] = []
+        try:
+            for start in range(0, len(cities), batch_size):
+                result = await self.session.execute(
+                    statement.values(cities[start : start + batch_size]).returning(
+                        CityModel.id, CityModel.name, CityModel.latitude, CityModel.longitude
+                    )
+                )
+                created.extend(dict(row) for row in result.mappings())
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при массовом сохранении городов: {e}")
+            raise RepositorySaveError(f"Ошибка массового сохранения городов: {e}") from e
+
+        logger.info(f"Сохранено {len(created)} новых городов из {len(cities)}")
+        on_commit(self.session, lambda: self.directory.add_many(created))
+        return created
+
     async def delete(self, name: str) -> None:
         try:
-            name = name.strip().title()
+            name = self.directory.normalize(name)
             logger.info(f"Поиск города {name} для удаления в БД")
 
             result: Result[Tuple[CityModel]] = await self.session.execute(
@@ -91,6 +243,9 @@ class CityRepository:
 
             logger.info(f"Город {name} найден в БД для удаления")
             await self.session.delete(city)
+            city_id: int = city.id
+            on_commit(self.session, lambda: self.directory.remove(name))
+            on_commit(self.session, lambda: weather_snapshot.discard(city_id))
             logger.info(f"Город {name} удалён из БД")
         except SQLAlchemyError as e:
             raise RepositoryError(f"Ошибка удаления '{name}': {e}") from e
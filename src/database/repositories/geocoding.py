@@ -0,0 +1,49 @@
+from datetime import datetime
+from logging import Logger
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models.geocoding import GeocodingCacheModel
+from src.exceptions.repository import RepositoryError, RepositorySaveError
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class GeocodingRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session: AsyncSession = session
+
+    async def get(self, query: str) -> GeocodingCacheModel | None:
+        try:
+            record: GeocodingCacheModel | None = await self.session.get(
+                GeocodingCacheModel, query
+            )
+            if record is None or record.expires_at <= datetime.now():
+                return None
+
+            return record
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при поиске '{query}' в кэше геокодирования: {e}")
+            raise RepositoryError(f"Ошибка чтения кэша геокодирования: {e}") from e
+
+    async def save(
+        self,
+        query: str,
+        coordinates: dict[str, float] | None,
+        expires_at: datetime,
+    ) -> None:
+        try:
+            await self.session.merge(
+                GeocodingCacheModel(
+                    query=query,
+                    latitude=coordinates["latitude"] if coordinates else None,
+                    longitude=coordinates["longitude"] if coordinates else None,
+                    expires_at=expires_at,
+                )
+            )
+            await self.session.flush()
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при сохранении '{query}' в кэш геокодирования: {e}")
+            raise RepositorySaveError(f"Ошибка сохранения кэша геокодирования: {e}") from e
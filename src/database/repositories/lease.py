@@ -0,0 +1,49 @@
+from datetime import datetime
+from logging import Logger
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.sqlite import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.database.models.lease import LeaseModel
+from src.exceptions.repository import RepositoryError
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class LeaseRepository:
+    def __init__(self, session: AsyncSession) -> None:
+        self.session: AsyncSession = session
+
+    async def acquire(self, name: str, owner: str, expires_at: datetime) -> bool:
+        """Захватывает или продлевает аренду одним UPSERT.
+
+        Запись перезаписывается, только если аренда уже принадлежит owner или истекла,
+        поэтому из нескольких процессов аренду получает ровно один.
+        """
+        statement = insert(LeaseModel).values(name=name, owner=owner, expires_at=expires_at)
+        statement = statement.on_conflict_do_update(
+            index_elements=[LeaseModel.name],
+            set_={"owner": statement.excluded.owner, "expires_at": statement.excluded.expires_at},
+            where=(LeaseModel.owner == owner) | (LeaseModel.expires_at <= datetime.now()),
+        )
+        try:
+            await self.session.execute(statement)
+            holder: str | None = await self.session.scalar(
+                select(LeaseModel.owner).where(LeaseModel.name == name)
+            )
+            return holder == owner
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при захвате аренды '{name}': {e}")
+            raise RepositoryError(f"Ошибка захвата аренды: {e}") from e
+
+    async def release(self, name: str, owner: str) -> None:
+        try:
+            await self.session.execute(
+                delete(LeaseModel).where(LeaseModel.name == name, LeaseModel.owner == owner)
+            )
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при освобождении аренды '{name}': {e}")
+            raise RepositoryError(f"Ошибка освобождения аренды: {e}") from e
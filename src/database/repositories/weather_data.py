@@ -1,25 +1,57 @@
+import time
 from datetime import datetime
 from logging import Logger
 from typing import Any, Tuple
 
 from sqlalchemy import Result, select
+from sqlalchemy.dialects.sqlite import insert
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from src.cache.weather_snapshot import (
+    WeatherSnapshotEntry,
+    WeatherSnapshotStore,
+    weather_snapshot,
+)
+from src.config import WEATHER_UPSERT_BATCH_SIZE
+from src.database.hooks import on_commit
+from src.database.models.cities import CityModel
 from src.database.models.weather import WeatherDataModel
+from src.database.models.weather_hours import WeatherHourModel
+from src.enums import SortOrder, WeatherFilters
 from src.exceptions.repository import RepositoryError, RepositorySaveError
 from src.exceptions.weather import WeatherNotFoundError
+from src.forecast_codec import PackedForecast
 from src.mappers.weather import WeatherMapper
 
 from src.logging import get_logger
 logger: Logger = get_logger(__name__)
 
 class WeatherRepository:
-    def __init__(self, session: AsyncSession, mapper: WeatherMapper) -> None:
+    def __init__(
+        self,
+        session: AsyncSession,
+        mapper: WeatherMapper,
+        snapshot: WeatherSnapshotStore = weather_snapshot,
+    ) -> None:
         self.session: AsyncSession = session
         self.mapper: WeatherMapper = mapper
+        self.snapshot: WeatherSnapshotStore = snapshot
+
+    def with_session(self, session: AsyncSession) -> "WeatherRepository":
+        """Тот же репозиторий поверх другой сессии, например сессии DatabaseWriter"""
+        return WeatherRepository(session, self.mapper, self.snapshot)
 
     async def get(self, city_id: int) -> dict[str, Any]:
+        entry: WeatherSnapshotEntry | None = self.snapshot.get(city_id)
+        if entry is not None:
+            return {
+                "city_id": entry.city_id,
+                "data": entry.data,
+                "updated_at": entry.updated_at,
+            }
+
+        version: int = self.snapshot.version
         try:
             logger.info(f"Поиск данных о погоде для города с ID={city_id} в собственной БД")
             data: Result[Tuple[WeatherDataModel]] = await self.session.execute(
@@ -31,44 +63,214 @@ class WeatherRepository:
                 raise WeatherNotFoundError(city_id)
 
             logger.info(f"Данные о погоде для города c ID={city_id} успешно извлечены из БД")
-            return self.mapper.to_dto(model=data)
+            dto: dict[str, Any] = self.mapper.to_dto(model=data)
+            self.snapshot.fill({city_id: (dto["data"], dto["updated_at"])}, version)
+            return dto
         except SQLAlchemyError as e:
             logger.error(f"Ошибка БД во время извлечения данных о погоде для города с ID={city_id}: {e}")
             raise RepositoryError(
                 f"Произошла непредвиденная ошибка при попытке получения данных о погоде в городе: {e}"
             ) from e
 
+    async def get_many(self, city_ids: list[int], batch_size: int = 500) -> dict[int, dict[str, Any]]:
+        """Данные о погоде для многих городов: из снимка, недостающие - запросом с IN.
+
+        Города без данных в результат не попадают.
+        """
+        found: dict[int, dict[str, Any]] = {}
+        missing: list[int] = []
+        for city_id in set(city_ids):
+            entry: WeatherSnapshotEntry | None = self.snapshot.get(city_id)
+            if entry is None:
+                missing.append(city_id)
+            else:
+                found[city_id] = {
+                    "city_id": entry.city_id,
+                    "data": entry.data,
+                    "updated_at": entry.updated_at,
+                }
+
+        if not missing:
+            return found
+
+        version: int = self.snapshot.version
+        loaded: dict[int, dict[str, Any]] = {}
+        try:
+            logger.info(f"Поиск данных о погоде для {len(missing)} городов в собственной БД")
+            for start in range(0, len(missing), batch_size):
+                result: Result[Tuple[WeatherDataModel]] = await self.session.execute(
+                    select(WeatherDataModel).where(
+                        WeatherDataModel.city_id.in_(missing[start : start + batch_size])
+                    )
+                )
+                for model in result.scalars():
+                    loaded[model.city_id] = self.mapper.to_dto(model=model)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД во время извлечения данных о погоде для {len(missing)} городов: {e}")
+            raise RepositoryError(f"Ошибка получения данных о погоде: {e}") from e
+
+        if loaded:
+            self.snapshot.fill(
+                {city_id: (dto["data"], dto["updated_at"]) for city_id, dto in loaded.items()},
+                version,
+            )
+        return found | loaded
+
     async def save(self, data: dict) -> dict[str, Any]:
         city_id = data["city_id"]
         try:
             logger.info(f"Сохранение данных о погоде для города с ID={city_id} в собственной БД")
-            stmp = WeatherDataModel(city_id=data["city_id"], data=data["data"])
+            stmp = WeatherDataModel(city_id=data["city_id"], **data["data"].columns())
 
             self.session.add(stmp)
             await self.session.flush()
+            await self._upsert_hours({city_id: data["data"]})
             await self.session.refresh(stmp)
 
             logger.info(f"Данные о погоде для города c ID={city_id} успешно добавлены")
-            return self.mapper.to_dto(stmp)
+            dto: dict[str, Any] = self.mapper.to_dto(stmp)
+            on_commit(
+                self.session,
+                lambda: self.snapshot.put(city_id, dto["data"], dto["updated_at"]),
+            )
+            return dto
         except IntegrityError as e:
             logger.info(f"Ошибка согласованности данных во время сохранения данных о погоде для города с ID={city_id}: {e}")
-            self.session.rollback()
             raise RepositorySaveError(f"Ошибка целостности данных: {e}") from e
         except SQLAlchemyError as e:
             logger.error(f"Ошибка БД во время сохранения данных о погоде для города с ID={city_id}: {e}")
-            self.session.rollback()
             raise RepositorySaveError(f"Ошибка сохранения: {e}") from e
 
-    async def update(self, city_id: int, data: dict) -> None:
-        weather_record: Result[Tuple[WeatherDataModel]] = await self.session.execute(
-            select(WeatherDataModel).where(WeatherDataModel.city_id == city_id)
+    async def bulk_upsert(
+        self,
+        payloads: dict[int, PackedForecast],
+        updated_at: datetime,
+        batch_size: int = WEATHER_UPSERT_BATCH_SIZE,
+    ) -> tuple[set[int], float]:
+        """Записывает данные о погоде для многих городов пачками INSERT ... ON CONFLICT DO UPDATE.
+
+        Города, удалённые пока шёл запрос к API, пропускаются: иначе их строки вернулись бы
+        в БД без города. Возвращает ID записанных городов и время записи в секундах
+        (без учёта коммита).
+        """
+        statement = insert(WeatherDataModel)
+        statement = statement.on_conflict_do_update(
+            index_elements=[WeatherDataModel.city_id],
+            set_={
+                "variables": statement.excluded.variables,
+                "hourly": statement.excluded.hourly,
+                "start_time": statement.excluded.start_time,
+                "meta": statement.excluded.meta,
+                "updated_at": statement.excluded.updated_at,
+            },
         )
-        weather_record = weather_record.scalar_one_or_none()
+        started: float = time.perf_counter()
+        try:
+            # executemany через соединение Core, минуя поштучную обработку строк в ORM bulk insert
+            connection = await self.session.connection()
+            city_ids: list[int] = list(payloads)
+            existing: set[int] = set()
+            for start in range(0, len(city_ids), batch_size):
+                result = await connection.execute(
+                    select(CityModel.id).where(CityModel.id.in_(city_ids[start : start + batch_size]))
+                )
+                existing.update(result.scalars())
+            if len(existing) < len(payloads):
+                logger.info(f"Пропущены данные {len(payloads) - len(existing)} удалённых городов")
+                payloads = {city_id: payloads[city_id] for city_id in city_ids if city_id in existing}
 
-        if not weather_record:
-            raise WeatherNotFoundError(city_id)
+            rows: list[dict[str, Any]] = [
+                {"city_id": city_id, **forecast.columns(), "updated_at": updated_at}
+                for city_id, forecast in payloads.items()
+            ]
+            for start in range(0, len(rows), batch_size):
+                await connection.execute(statement, rows[start : start + batch_size])
+            await self._upsert_hours(payloads, batch_size)
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД во время массовой записи данных о погоде: {e}")
+            raise RepositorySaveError(f"Ошибка массовой записи: {e}") from e
 
-        weather_record.data = data
-        weather_record.updated_at = datetime.now()
+        elapsed: float = time.perf_counter() - started
+        logger.info(f"Данные о погоде для {len(rows)} городов записаны за {elapsed:.3f} c")
+        return existing, elapsed
 
-        await self.session.flush()
+    async def updated_at(self) -> dict[int, datetime]:
+        """Время последнего обновления данных о погоде по ID города"""
+        try:
+            result = await self.session.execute(
+                select(WeatherDataModel.city_id, WeatherDataModel.updated_at)
+            )
+            return dict(result.all())
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при получении времени обновления данных о погоде: {e}")
+            raise RepositoryError(f"Ошибка получения времени обновления: {e}") from e
+
+    async def updated_since(self, since: datetime | None = None) -> list[dict[str, Any]]:
+        """Данные о погоде, обновлённые позже since (все, если since не задан)"""
+        query = select(WeatherDataModel)
+        if since is not None:
+            query = query.where(WeatherDataModel.updated_at > since)
+
+        try:
+            result = await self.session.execute(query)
+            return [self.mapper.to_dto(model=model) for model in result.scalars()]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при загрузке обновлённых данных о погоде: {e}")
+            raise RepositoryError(f"Ошибка загрузки обновлённых данных о погоде: {e}") from e
+
+    async def search(
+        self,
+        hour: int,
+        variable: WeatherFilters,
+        min_value: float | None = None,
+        max_value: float | None = None,
+        order: SortOrder = SortOrder.DESC,
+        limit: int = 100,
+    ) -> list[dict[str, Any]]:
+        """Города, у которых значение variable в час hour попадает в диапазон, одним запросом по индексу"""
+        column = getattr(WeatherHourModel, variable.value)
+        query = (
+            select(CityModel.id, CityModel.name, column)
+            .join(CityModel, CityModel.id == WeatherHourModel.city_id)
+            .where(WeatherHourModel.hour == hour, column.is_not(None))
+            .order_by(column.desc() if order is SortOrder.DESC else column.asc())
+            .limit(limit)
+        )
+        if min_value is not None:
+            query = query.where(column >= min_value)
+        if max_value is not None:
+            query = query.where(column <= max_value)
+
+        try:
+            logger.info(
+                f"Поиск городов по {variable.value} в {hour} ч: от {min_value} до {max_value}"
+            )
+            result = await self.session.execute(query)
+            return [
+                {"id": city_id, "name": name, "value": value}
+                for city_id, name, value in result.all()
+            ]
+        except SQLAlchemyError as e:
+            logger.error(f"Ошибка БД при поиске городов по погоде: {e}")
+            raise RepositoryError(f"Ошибка поиска городов по погоде: {e}") from e
+
+    async def _upsert_hours(
+        self,
+        payloads: dict[int, PackedForecast],
+        batch_size: int = WEATHER_UPSERT_BATCH_SIZE,
+    ) -> None:
+        statement = insert(WeatherHourModel)
+        statement = statement.on_conflict_do_update(
+            index_elements=[WeatherHourModel.city_id, WeatherHourModel.hour],
+            set_={
+                f.value: getattr(statement.excluded, f.value) for f in WeatherFilters
+            },
+        )
+        rows: list[dict[str, Any]] = [
+            row
+            for city_id, forecast in payloads.items()
+            for row in self.mapper.to_hour_rows(city_id, forecast)
+        ]
+        connection = await self.session.connection()
+        for start in range(0, len(rows), batch_size):
+            await connection.execute(statement, rows[start : start + batch_size])
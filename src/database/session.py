@@ -1,12 +1,76 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.pool import NullPool
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncEngine, async_sessionmaker, AsyncSession
 
-URL = "sqlite+aiosqlite:///weather.db"
+from src.config import DATABASE_URL, SQLITE_PROFILE
+from src.database.sqlite import (
+    SQLiteProfile,
+    apply_profile,
+    get_profile,
+    use_immediate_transactions,
+)
+from src.metrics import db_query_duration
+from src.timing import record
+
+URL = DATABASE_URL
 
-def create_db_engine() -> AsyncEngine:
-    return create_async_engine(
+def create_db_engine(profile: SQLiteProfile | None = None) -> AsyncEngine:
+    """Движок только для чтения: запись через него завершается ошибкой"""
+    profile = profile or get_profile(SQLITE_PROFILE)
+    engine: AsyncEngine = create_async_engine(
         URL,
-        connect_args={"check_same_thread": False}
+        connect_args={"check_same_thread": False},
+        pool_size=profile.pool_size,
+        max_overflow=profile.max_overflow,
     )
+    apply_profile(engine, profile, read_only=True)
+    track_queries(engine, "read")
+    return engine
+
+def create_writer_engine(profile: SQLiteProfile | None = None) -> AsyncEngine:
+    """Движок с единственным соединением для DatabaseWriter"""
+    profile = profile or get_profile(SQLITE_PROFILE)
+    engine: AsyncEngine = create_async_engine(
+        URL,
+        connect_args={"check_same_thread": False},
+        pool_size=1,
+        max_overflow=0,
+    )
+    apply_profile(engine, profile)
+    use_immediate_transactions(engine)
+    track_queries(engine, "write")
+    return engine
+
+def create_maintenance_engine(profile: SQLiteProfile | None = None) -> AsyncEngine:
+    """Движок для обслуживания БД: отдельное соединение на каждый запуск, без транзакций.
+
+    PRAGMA wal_checkpoint(TRUNCATE) не выполняется внутри открытой транзакции,
+    поэтому соединение DatabaseWriter с его BEGIN IMMEDIATE для этого не подходит.
+    """
+    profile = profile or get_profile(SQLITE_PROFILE)
+    engine: AsyncEngine = create_async_engine(
+        URL,
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+        isolation_level="AUTOCOMMIT",
+    )
+    apply_profile(engine, profile)
+    return engine
+
+def track_queries(engine: AsyncEngine, name: str) -> None:
+    """Длительность SQL-запросов движка: в метрике db_query_duration_seconds и в этапе db запроса"""
+
+    @event.listens_for(engine.sync_engine, "before_cursor_execute")
+    def query_started(connection, cursor, statement, parameters, context, executemany) -> None:
+        connection.info["query_started"] = time.perf_counter()
+
+    @event.listens_for(engine.sync_engine, "after_cursor_execute")
+    def query_finished(connection, cursor, statement, parameters, context, executemany) -> None:
+        duration: float = time.perf_counter() - connection.info["query_started"]
+        db_query_duration.observe(duration, name, statement.split(None, 1)[0].upper())
+        record("db", duration)
 
 def get_session_factory(engine: AsyncEngine) -> AsyncSession:
     return async_sessionmaker(
@@ -14,4 +78,3 @@ def get_session_factory(engine: AsyncEngine) -> AsyncSession:
         autocommit=False,
         autoflush=False
     )
-
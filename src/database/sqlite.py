@@ -0,0 +1,142 @@
+from dataclasses import asdict, dataclass
+from logging import Logger
+from typing import Any
+
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class SQLiteProfile:
+    """Набор PRAGMA и размеры пула соединений для одного сценария работы с БД"""
+
+    journal_mode: str
+    synchronous: str
+    mmap_size: int
+    # Отрицательное значение - размер в КиБ, положительное - в страницах
+    cache_size: int
+    busy_timeout: int
+    temp_store: str
+    foreign_keys: int
+    pool_size: int
+    max_overflow: int
+
+    def pragmas(self) -> dict[str, Any]:
+        return {
+            name: value
+            for name, value in asdict(self).items()
+            if name not in ("pool_size", "max_overflow")
+        }
+
+
+PROFILES: dict[str, SQLiteProfile] = {
+    # Журнал отката, синхронизация и кэш SQLite по умолчанию, читатели ждут записи;
+    # ожидание блокировки и проверка внешних ключей включены, как и в остальных профилях
+    "default": SQLiteProfile(
+        journal_mode="delete",
+        synchronous="full",
+        mmap_size=0,
+        cache_size=-2000,
+        busy_timeout=5000,
+        temp_store="default",
+        foreign_keys=1,
+        pool_size=5,
+        max_overflow=10,
+    ),
+    # WAL: читатели не блокируются записью фонового обновления; при сбое питания
+    # могут потеряться последние транзакции, но не целостность БД
+    "balanced": SQLiteProfile(
+        journal_mode="wal",
+        synchronous="normal",
+        mmap_size=256 * 2**20,
+        cache_size=-64000,
+        busy_timeout=5000,
+        temp_store="memory",
+        foreign_keys=1,
+        pool_size=10,
+        max_overflow=20,
+    ),
+    # WAL с синхронизацией каждого коммита
+    "durable": SQLiteProfile(
+        journal_mode="wal",
+        synchronous="full",
+        mmap_size=256 * 2**20,
+        cache_size=-64000,
+        busy_timeout=10000,
+        temp_store="memory",
+        foreign_keys=1,
+        pool_size=10,
+        max_overflow=20,
+    ),
+}
+
+# PRAGMA synchronous и temp_store при чтении возвращают номер значения
+ENUM_PRAGMAS: dict[str, tuple[str, ...]] = {
+    "synchronous": ("off", "normal", "full", "extra"),
+    "temp_store": ("default", "file", "memory"),
+}
+
+
+def get_profile(name: str) -> SQLiteProfile:
+    try:
+        return PROFILES[name]
+    except KeyError:
+        raise ValueError(
+            f"Неизвестный профиль SQLite '{name}', доступны: {', '.join(PROFILES)}"
+        ) from None
+
+
+def apply_profile(engine: AsyncEngine, profile: SQLiteProfile, read_only: bool = False) -> None:
+    """Выполняет PRAGMA профиля на каждом новом соединении пула"""
+    pragmas: dict[str, Any] = profile.pragmas()
+    if read_only:
+        pragmas["query_only"] = 1
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def set_pragmas(dbapi_connection, connection_record) -> None:
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name} = {value}")
+        cursor.close()
+
+
+def use_immediate_transactions(engine: AsyncEngine) -> None:
+    """Транзакции движка начинаются с BEGIN IMMEDIATE.
+
+    Блокировка записи берётся в начале транзакции, а не при первой записи,
+    и драйвер больше не управляет транзакциями сам, поэтому SAVEPOINT работают корректно.
+    """
+
+    @event.listens_for(engine.sync_engine, "connect")
+    def disable_driver_transactions(dbapi_connection, connection_record) -> None:
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine.sync_engine, "begin")
+    def begin_immediate(connection) -> None:
+        connection.exec_driver_sql("BEGIN IMMEDIATE")
+
+
+async def check_profile(engine: AsyncEngine, profile: SQLiteProfile) -> dict[str, Any]:
+    """Читает действующие значения PRAGMA и предупреждает о расхождениях с профилем"""
+    async with engine.connect() as connection:
+        effective: dict[str, Any] = {
+            "sqlite_version": await connection.scalar(text("SELECT sqlite_version()"))
+        }
+        for name in profile.pragmas():
+            effective[name] = await connection.scalar(text(f"PRAGMA {name}"))
+
+    for name, expected in profile.pragmas().items():
+        actual: Any = effective[name]
+        if name in ENUM_PRAGMAS and isinstance(actual, int):
+            actual = effective[name] = ENUM_PRAGMAS[name][actual]
+        if str(actual).lower() != str(expected).lower():
+            logger.warning(f"PRAGMA {name}: ожидалось {expected}, действует {actual}")
+
+    effective["pool_size"] = profile.pool_size
+    effective["max_overflow"] = profile.max_overflow
+    logger.info(f"Настройки SQLite: {effective}")
+    return effective
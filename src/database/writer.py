@@ -0,0 +1,140 @@
+import asyncio
+import time
+from logging import Logger
+from typing import Any, Awaitable, Callable, TypeVar
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import WRITER_MAX_BATCH
+from src.database.hooks import discard_callbacks, pending_callbacks
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+T = TypeVar("T")
+WriteJob = Callable[[AsyncSession], Awaitable[T]]
+
+
+class DatabaseWriter:
+    """Единственная задача процесса, выполняющая запись в БД.
+
+    Операции записи ставятся в очередь и выполняются по одной. Всё, что накопилось
+    в очереди, пока шёл предыдущий коммит, выполняется в одной транзакции (group commit):
+    каждая операция - в своём SAVEPOINT, поэтому ошибка одной не откатывает остальные.
+    Вызывающий получает результат операции только после коммита транзакции.
+    """
+
+    def __init__(self, max_batch: int = WRITER_MAX_BATCH) -> None:
+        self.max_batch: int = max_batch
+        self.session_factory: async_sessionmaker[AsyncSession] | None = None
+
+        self._queue: asyncio.Queue[tuple[WriteJob[Any], asyncio.Future[Any]]] | None = None
+        self._task: asyncio.Task[None] | None = None
+
+        self.jobs: int = 0
+        self.failed_jobs: int = 0
+        self.commits: int = 0
+        self.max_batch_seen: int = 0
+        self.commit_time_total: float = 0.0
+
+    def bind(self, session_factory: async_sessionmaker[AsyncSession]) -> None:
+        self.session_factory = session_factory
+
+    async def start(self) -> None:
+        if self.session_factory is None:
+            raise RuntimeError("DatabaseWriter не привязан к БД")
+
+        self._queue = asyncio.Queue()
+        self._task = asyncio.create_task(self._write_loop())
+        logger.info("Задача записи в БД запущена")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+
+        # Операции, уже принятые в очередь, выполняются до остановки
+        await self._queue.join()
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+        logger.info("Задача записи в БД остановлена")
+
+    async def submit(self, job: WriteJob[T]) -> T:
+        """Выполняет job(session) в транзакции записи и возвращает результат после коммита"""
+        if self._task is None:
+            raise RuntimeError("Задача записи в БД не запущена")
+
+        future: asyncio.Future[T] = asyncio.get_running_loop().create_future()
+        await self._queue.put((job, future))
+        return await future
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "queued": self._queue.qsize() if self._queue is not None else 0,
+            "jobs": self.jobs,
+            "failed_jobs": self.failed_jobs,
+            "commits": self.commits,
+            "avg_batch": round(self.jobs / self.commits, 2) if self.commits else 0,
+            "max_batch": self.max_batch_seen,
+            "avg_commit_seconds": (
+                round(self.commit_time_total / self.commits, 4) if self.commits else 0
+            ),
+        }
+
+    async def _write_loop(self) -> None:
+        while True:
+            batch: list[tuple[WriteJob[Any], asyncio.Future[Any]]] = [await self._queue.get()]
+            while len(batch) < self.max_batch and not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                await self._write_batch(batch)
+            except Exception as e:
+                logger.error(f"Ошибка транзакции записи ({len(batch)} операций): {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    async def _write_batch(self, batch: list[tuple[WriteJob[Any], asyncio.Future[Any]]]) -> None:
+        outcomes: list[tuple[asyncio.Future[Any], Any, BaseException | None]] = []
+        started: float = time.perf_counter()
+
+        async with self.session_factory() as session:
+            for job, future in batch:
+                # Вызывающий перестал ждать до начала записи
+                if future.cancelled():
+                    continue
+
+                keep: int = pending_callbacks(session)
+                try:
+                    async with session.begin_nested():
+                        result: Any = await job(session)
+                    outcomes.append((future, result, None))
+                except Exception as e:
+                    discard_callbacks(session, keep)
+                    outcomes.append((future, None, e))
+
+            await session.commit()
+
+        self.commits += 1
+        self.jobs += len(outcomes)
+        self.max_batch_seen = max(self.max_batch_seen, len(outcomes))
+        self.commit_time_total += time.perf_counter() - started
+
+        for future, result, error in outcomes:
+            if future.done():
+                continue
+            if error is None:
+                future.set_result(result)
+            else:
+                self.failed_jobs += 1
+                future.set_exception(error)
+
+
+database_writer = DatabaseWriter()
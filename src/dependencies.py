@@ -1,18 +1,36 @@
 from typing import Any, AsyncGenerator
 
-import aiohttp
 from fastapi import Depends
 from sqlalchemy import Engine
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
 
+from src.cache.geocoding import geocoding_cache
+from src.config import SQLITE_PROFILE
+from src.database.maintenance import DatabaseMaintenance
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
-from src.database.session import create_db_engine, get_session_factory
+from src.database.session import (
+    create_db_engine,
+    create_maintenance_engine,
+    create_writer_engine,
+    get_session_factory,
+)
+from src.database.sqlite import get_profile
+from src.database.writer import DatabaseWriter, database_writer
 from src.mappers.city import CityMapper
 from src.mappers.weather import WeatherMapper
+from src.upstream.client import UpstreamClient
 
-engine: Engine = create_db_engine()
+db_profile = get_profile(SQLITE_PROFILE)
+# Запросы API читают через пул только для чтения, вся запись идёт через database_writer
+engine: Engine = create_db_engine(db_profile)
 SessionLocal: AsyncSession = get_session_factory(engine)
+write_engine: Engine = create_writer_engine(db_profile)
+db_maintenance = DatabaseMaintenance(create_maintenance_engine(db_profile), db_profile)
+http_client = UpstreamClient()
+
+database_writer.bind(get_session_factory(write_engine))
+geocoding_cache.bind(SessionLocal, database_writer)
 
 
 async def get_db_session() -> AsyncGenerator[AsyncSession, Any]:
@@ -25,9 +43,16 @@ async def get_db_session() -> AsyncGenerator[AsyncSession, Any]:
             raise
 
 
-async def get_http_session() -> AsyncGenerator[aiohttp.ClientSession, Any]:
-    async with aiohttp.ClientSession() as session:
-        yield session
+def get_db_session_factory() -> async_sessionmaker[AsyncSession]:
+    return SessionLocal
+
+
+def get_db_writer() -> DatabaseWriter:
+    return database_writer
+
+
+def get_http_client() -> UpstreamClient:
+    return http_client
 
 
 def get_weather_mapper() -> WeatherMapper:
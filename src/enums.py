@@ -5,4 +5,23 @@ class WeatherFilters(Enum):
     PRECIPITATION = "precipitation"
     PRESSURE = "pressure_msl"
     WIND_SPEED = "wind_speed"
-    HUMIDITY = "humidity"
\ No newline at end of file
+    HUMIDITY = "humidity"
+
+
+class UpstreamPriority(Enum):
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+
+class SortOrder(Enum):
+    ASC = "asc"
+    DESC = "desc"
+
+
+class CityImportStatus(Enum):
+    CREATED = "created"
+    EXISTS = "exists"
+    DUPLICATE = "duplicate"
+    INVALID = "invalid"
+    NOT_FOUND = "not_found"
+    FAILED = "failed"
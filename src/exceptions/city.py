@@ -1,5 +1,15 @@
+from src.exceptions.http import APIException
+
+
 class CityNotFoundError(Exception):
     def __init__(self, city_name: str):
         super().__init__(
             f"Город '{city_name}' не найден"
         )
+
+
+class CityImportError(APIException):
+    """Файл импорта городов не может быть обработан целиком"""
+
+    def __init__(self, status_code: int, message: str):
+        super().__init__(status_code, detail=message)
@@ -0,0 +1,119 @@
+import math
+import struct
+import sys
+from datetime import datetime, timedelta, timezone
+from typing import Any
+
+from src.cache.memory import deep_size
+
+# Open-Meteo отдаёт значения не точнее двух знаков после запятой,
+# округление убирает погрешность хранения во float32
+VALUE_DECIMALS = 2
+VALUE_SIZE: int = struct.calcsize("<f")
+
+
+class PackedForecast:
+    """Почасовой прогноз в компактном виде.
+
+    Значения всех переменных хранятся подряд в одном буфере float32
+    (переменная за переменной, по часу на значение), время - смещением первого часа
+    в секундах UTC, остальные поля ответа API - в meta. Отдельное значение читается
+    по смещению без разбора всего прогноза.
+    """
+
+    __slots__ = ("variables", "values", "start_time", "meta", "hours", "_index", "_size")
+
+    def __init__(
+        self,
+        variables: tuple[str, ...],
+        values: bytes,
+        start_time: int,
+        meta: dict[str, Any],
+    ) -> None:
+        self.variables: tuple[str, ...] = variables
+        self.values: bytes = values
+        self.start_time: int = start_time
+        self.meta: dict[str, Any] = meta
+        self.hours: int = len(values) // VALUE_SIZE // len(variables) if variables else 0
+        self._index: dict[str, int] = {name: i for i, name in enumerate(variables)}
+        self._size: int | None = None
+
+    @classmethod
+    def from_payload(cls, payload: dict[str, Any]) -> "PackedForecast":
+        hourly: dict[str, list[Any]] = payload["hourly"]
+        times: list[str] = hourly["time"]
+        variables: tuple[str, ...] = tuple(name for name in hourly if name != "time")
+
+        flat: list[float] = [
+            math.nan if value is None else value
+            for name in variables
+            for value in hourly[name]
+        ]
+        offset: int = payload.get("utc_offset_seconds", 0)
+        start_time: int = (
+            int(datetime.fromisoformat(times[0]).replace(tzinfo=timezone.utc).timestamp())
+            - offset
+            if times
+            else 0
+        )
+
+        return cls(
+            variables=variables,
+            values=struct.pack(f"<{len(flat)}f", *flat),
+            start_time=start_time,
+            meta={key: value for key, value in payload.items() if key != "hourly"},
+        )
+
+    def value(self, variable: str, hour: int) -> float | None:
+        if not 0 <= hour < self.hours:
+            raise IndexError(f"Час {hour} вне диапазона прогноза (0-{self.hours - 1})")
+
+        (value,) = struct.unpack_from(
+            "<f", self.values, (self._index[variable] * self.hours + hour) * VALUE_SIZE
+        )
+        return None if math.isnan(value) else round(value, VALUE_DECIMALS)
+
+    def series(self, variable: str, start: int = 0, stop: int | None = None) -> list[float | None]:
+        stop = self.hours if stop is None else min(stop, self.hours)
+        count: int = max(stop - start, 0)
+        offset: int = (self._index[variable] * self.hours + start) * VALUE_SIZE
+        return [
+            None if math.isnan(value) else round(value, VALUE_DECIMALS)
+            for value in struct.unpack_from(f"<{count}f", self.values, offset)
+        ]
+
+    def to_payload(self) -> dict[str, Any]:
+        """Восстанавливает ответ API в исходном формате"""
+        local_start: datetime = datetime.fromtimestamp(
+            self.start_time + self.meta.get("utc_offset_seconds", 0), timezone.utc
+        ).replace(tzinfo=None)
+        hourly: dict[str, list[Any]] = {
+            "time": [
+                (local_start + timedelta(hours=hour)).isoformat(timespec="minutes")
+                for hour in range(self.hours)
+            ]
+        }
+        for variable in self.variables:
+            hourly[variable] = self.series(variable)
+
+        return {**self.meta, "hourly": hourly}
+
+    def columns(self) -> dict[str, Any]:
+        """Значения колонок таблицы weather_data"""
+        return {
+            "variables": ",".join(self.variables),
+            "hourly": self.values,
+            "start_time": self.start_time,
+            "meta": self.meta,
+        }
+
+    def __sizeof__(self) -> int:
+        # Прогноз не изменяется после создания: обход meta выполняется один раз
+        if self._size is None:
+            self._size = (
+                object.__sizeof__(self)
+                + sys.getsizeof(self.values)
+                + deep_size(self.variables)
+                + deep_size(self.meta)
+            )
+        return self._size
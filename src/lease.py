@@ -0,0 +1,90 @@
+import os
+import socket
+from datetime import datetime, timedelta
+from logging import Logger
+from typing import TypeVar
+from uuid import uuid4
+
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import REFRESH_LEASE_TTL_SECONDS
+from src.database.repositories.lease import LeaseRepository
+from src.database.writer import DatabaseWriter, WriteJob
+from src.exceptions.repository import RepositoryError
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+T = TypeVar("T")
+
+
+class Lease:
+    """Аренда с ограниченным сроком в таблице leases, общая для всех процессов с одной БД.
+
+    Владелец должен продлевать аренду чаще, чем раз в ttl секунд. Если владелец
+    остановился или завис, после истечения срока аренду получает другой процесс.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        writer: DatabaseWriter,
+        ttl: float = REFRESH_LEASE_TTL_SECONDS,
+    ) -> None:
+        self.name: str = name
+        self.writer: DatabaseWriter = writer
+        self.ttl: float = ttl
+        self.owner: str = f"{socket.gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self.held: bool = False
+
+    async def renew(self) -> bool:
+        """Захватывает или продлевает аренду, возвращает, владеет ли ей процесс"""
+        try:
+            held: bool = await self.writer.submit(self._acquire)
+        except (RepositoryError, SQLAlchemyError) as e:
+            logger.warning(f"Не удалось продлить аренду '{self.name}': {e}")
+            held = False
+
+        self._set_held(held)
+        return held
+
+    async def submit(self, job: WriteJob[T]) -> T | None:
+        """Выполняет job через DatabaseWriter в одной транзакции с продлением аренды.
+
+        Если аренда уже перешла к другому процессу, job не выполняется и возвращается None:
+        запись, разрешённая только владельцу, не может перезаписать результаты нового владельца.
+        """
+
+        async def guarded(session: AsyncSession) -> tuple[bool, T | None]:
+            if not await self._acquire(session):
+                return False, None
+            return True, await job(session)
+
+        held, result = await self.writer.submit(guarded)
+        self._set_held(held)
+        return result
+
+    async def _acquire(self, session: AsyncSession) -> bool:
+        expires_at: datetime = datetime.now() + timedelta(seconds=self.ttl)
+        return await LeaseRepository(session).acquire(self.name, self.owner, expires_at)
+
+    def _set_held(self, held: bool) -> None:
+        if held != self.held:
+            logger.info(
+                f"Процесс {self.owner} {'получил' if held else 'потерял'} аренду '{self.name}'"
+            )
+        self.held = held
+
+    async def release(self) -> None:
+        if not self.held:
+            return
+
+        try:
+            await self.writer.submit(
+                lambda session: LeaseRepository(session).release(self.name, self.owner)
+            )
+            logger.info(f"Процесс {self.owner} освободил аренду '{self.name}'")
+        except (RepositoryError, SQLAlchemyError) as e:
+            logger.warning(f"Не удалось освободить аренду '{self.name}': {e}")
+        self.held = False
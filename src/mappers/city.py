@@ -4,12 +4,16 @@ from typing import Any
 
 class CityMapper:
     def to_response_model(self, dto: dict[str, Any]) -> CityDataResponse:
-        return CityDataResponse(
-            id=dto["id"],
-            name=dto["name"],
-            latitude=dto["latitude"],
-            longitude=dto["longitude"]
-        )
+        return CityDataResponse(**self.to_response_content(dto))
+
+    def to_response_content(self, dto: dict[str, Any]) -> dict[str, Any]:
+        """Тело CityDataResponse без создания модели"""
+        return {
+            "id": dto["id"],
+            "name": dto["name"],
+            "latitude": dto["latitude"],
+            "longitude": dto["longitude"]
+        }
 
 
     def to_dto(self, model: CityModel) -> dict[str, Any]:
@@ -2,6 +2,7 @@ from typing import Any
 
 from src.database.models.weather import WeatherDataModel
 from src.enums import WeatherFilters
+from src.forecast_codec import PackedForecast
 from src.schemas.responses.weather import (
     WeatherDataResponse,
     WeatherWithFiltersResponse,
@@ -17,29 +18,74 @@ class WeatherMapper:
         WeatherFilters.PRECIPITATION: "precipitation",
     }
 
+    # Поля WeatherWithFiltersResponse: невыбранные показатели отдаются как null
+    OPTIONAL_FIELDS: tuple[str, ...] = tuple(WeatherWithFiltersResponse.model_fields)
+
     def to_response_model(
-        self, data: dict[str, Any], timestamp: int
+        self, data: PackedForecast, timestamp: int
     ) -> WeatherDataResponse:
-        return WeatherDataResponse(
-            temperature=data["hourly"]["temperature_2m"][timestamp],
-            wind_speed=data["hourly"]["wind_speed_10m"][timestamp],
-            pressure_msl=data["hourly"]["pressure_msl"][timestamp],
-        )
+        return WeatherDataResponse(**self.to_response_content(data, timestamp))
 
-    def to_optional_response_model(
-        self, data: dict[str, Any], timestamp: int, filters: list[WeatherFilters]
-    ) -> WeatherWithFiltersResponse:
-        result = {}
+    def to_response_content(self, data: PackedForecast, timestamp: int) -> dict[str, float | None]:
+        """Тело WeatherDataResponse без создания модели: данные уже проверены при сохранении"""
+        return {
+            "temperature": data.value("temperature_2m", timestamp),
+            "wind_speed": data.value("wind_speed_10m", timestamp),
+            "pressure_msl": data.value("pressure_msl", timestamp),
+        }
+
+    def to_optional_response_content(
+        self, data: PackedForecast, timestamp: int, filters: list[WeatherFilters]
+    ) -> dict[str, float | None]:
+        """Тело WeatherWithFiltersResponse без создания модели"""
+        result: dict[str, float | None] = dict.fromkeys(self.OPTIONAL_FIELDS)
 
         for f in filters:
             key = self.FILTERS_MAPPING[f]
-            result[f.value] = data["hourly"][key][timestamp]
+            result[f.value] = data.value(key, timestamp)
+
+        return result
 
-        return WeatherWithFiltersResponse(**result)
+    def to_range_response_content(
+        self,
+        data: PackedForecast,
+        start_hour: int,
+        end_hour: int,
+        filters: list[WeatherFilters] | None = None,
+    ) -> dict[str, Any]:
+        """Тело WeatherRangeResponse: срезы хранимых массивов, без объекта на каждый час"""
+        filters = filters or [WeatherFilters.TEMPERATURE, WeatherFilters.WIND_SPEED, WeatherFilters.PRESSURE]
+        return {
+            "start_hour": start_hour,
+            "end_hour": end_hour,
+            "series": {
+                f.value: data.series(self.FILTERS_MAPPING[f], start_hour, end_hour + 1)
+                for f in filters
+            },
+        }
+
+    def to_hour_rows(self, city_id: int, data: PackedForecast) -> list[dict[str, Any]]:
+        """Строки таблицы weather_hours: по одной на каждый час прогноза"""
+        series: dict[str, list[float | None]] = {
+            f.value: data.series(key) for f, key in self.FILTERS_MAPPING.items()
+        }
+        return [
+            {
+                "city_id": city_id,
+                "hour": hour,
+                **{name: values[hour] for name, values in series.items()},
+            }
+            for hour in range(data.hours)
+        ]
 
     def to_dto(self, model: WeatherDataModel) -> dict[str, Any]:
         return {
             "city_id": model.city_id,
-            "data": model.data,
+            "data": PackedForecast(
+                variables=tuple(model.variables.split(",")),
+                values=model.hourly,
+                start_time=model.start_time,
+                meta=model.meta,
+            ),
             "updated_at": model.updated_at,
         }
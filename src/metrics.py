@@ -0,0 +1,207 @@
+"""Метрики процесса в текстовом формате Prometheus.
+
+Запись метрики - увеличение числа в словаре по кортежу значений меток, без блокировок
+(весь код процесса выполняется в одном цикле событий). Счётчики, которые уже ведут
+кэши и другие компоненты, не дублируются: они читаются сборщиками в момент запроса /metrics.
+"""
+import time
+from bisect import bisect_left
+from typing import Any, Callable, Iterable
+
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+# Границы корзин гистограмм длительности, секунды
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+
+Sample = tuple[dict[str, str], float]
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple[str, ...], values: tuple[Any, ...], le: str | None = None) -> str:
+    pairs: list[str] = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if le is not None:
+        pairs.append(f'le="{le}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _number(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    def __init__(self, name: str, description: str, labels: tuple[str, ...] = ()) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: tuple[str, ...] = labels
+        self._values: dict[tuple[Any, ...], float] = {}
+
+    def inc(self, *labels: Any, amount: float = 1) -> None:
+        self._values[labels] = self._values.get(labels, 0) + amount
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} counter"
+        for labels, value in self._values.items():
+            yield f"{self.name}{_labels(self.labels, labels)} {_number(value)}"
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> None:
+        self.name: str = name
+        self.description: str = description
+        self.labels: tuple[str, ...] = labels
+        self.buckets: tuple[float, ...] = buckets
+        # По меткам: [число значений в каждой корзине (последняя - +Inf), сумма]
+        self._values: dict[tuple[Any, ...], list[Any]] = {}
+
+    def observe(self, value: float, *labels: Any) -> None:
+        entry: list[Any] | None = self._values.get(labels)
+        if entry is None:
+            entry = self._values[labels] = [[0] * (len(self.buckets) + 1), 0.0]
+        # Накопительные суммы по корзинам считаются только при выдаче метрик
+        entry[0][bisect_left(self.buckets, value)] += 1
+        entry[1] += value
+
+    def render(self) -> Iterable[str]:
+        yield f"# HELP {self.name} {self.description}"
+        yield f"# TYPE {self.name} histogram"
+        for labels, (counts, total) in self._values.items():
+            cumulative: int = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket{_labels(self.labels, labels, str(bound))} {cumulative}"
+            cumulative += counts[-1]
+            yield f"{self.name}_bucket{_labels(self.labels, labels, '+Inf')} {cumulative}"
+            yield f"{self.name}_sum{_labels(self.labels, labels)} {_number(total)}"
+            yield f"{self.name}_count{_labels(self.labels, labels)} {cumulative}"
+
+
+class MetricsRegistry:
+    def __init__(self) -> None:
+        self._metrics: dict[str, Counter | Histogram] = {}
+        self._collectors: list[tuple[str, str, str, Callable[[], Iterable[Sample]]]] = []
+
+    def counter(self, name: str, description: str, labels: tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, description, labels))
+
+    def histogram(
+        self,
+        name: str,
+        description: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, description, labels, buckets))
+
+    def collector(
+        self, name: str, description: str, kind: str, collect: Callable[[], Iterable[Sample]]
+    ) -> None:
+        """Метрика, значения которой вычисляются при запросе: collect возвращает пары (метки, значение)"""
+        self._collectors.append((name, description, kind, collect))
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in self._metrics.values():
+            lines.extend(metric.render())
+        for name, description, kind, collect in self._collectors:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in collect():
+                lines.append(f"{name}{_labels(tuple(labels), tuple(labels.values()))} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def _register(self, metric: Counter | Histogram) -> Any:
+        if metric.name in self._metrics:
+            raise ValueError(f"Метрика {metric.name} уже зарегистрирована")
+        self._metrics[metric.name] = metric
+        return metric
+
+
+metrics = MetricsRegistry()
+
+http_request_duration = metrics.histogram(
+    "http_request_duration_seconds",
+    "Длительность обработки HTTP-запроса",
+    ("method", "route", "status"),
+)
+upstream_request_duration = metrics.histogram(
+    "upstream_request_duration_seconds",
+    "Длительность запроса к внешнему API",
+    ("host", "outcome"),
+)
+upstream_retries = metrics.counter(
+    "upstream_retries_total", "Повторы запросов к внешнему API после сетевой ошибки", ("host",)
+)
+db_query_duration = metrics.histogram(
+    "db_query_duration_seconds", "Длительность SQL-запроса", ("engine", "operation")
+)
+refresh_cycle_duration = metrics.histogram(
+    "weather_refresh_cycle_duration_seconds",
+    "Длительность такта фонового обновления погоды, в котором были города к обновлению",
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+refresh_cities = metrics.counter(
+    "weather_refresh_cities_total", "Города, обработанные фоновым обновлением погоды", ("outcome",)
+)
+city_service_upstream = metrics.counter(
+    "city_service_upstream_total",
+    "Запросы погоды по городу, для которых пришлось обратиться к внешнему API",
+    ("reason",),
+)
+
+
+class MetricsMiddleware:
+    """ASGI-middleware: длительность запросов по шаблону маршрута, методу и статусу.
+
+    Шаблон маршрута (например, /cities/{city_name}) вместо пути запроса
+    не даёт числу рядов метрики расти с числом разных URL.
+    """
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app: ASGIApp = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started: float = time.perf_counter()
+        status: int = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            route = scope.get("route")
+            http_request_duration.observe(
+                time.perf_counter() - started,
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+            )
+
+
+def count_retries(host: str, before_sleep: Callable[[Any], None]) -> Callable[[Any], None]:
+    """before_sleep для tenacity, дополнительно считающий повторы запросов к host"""
+
+    def record(retry_state: Any) -> None:
+        upstream_retries.inc(host)
+        before_sleep(retry_state)
+
+    return record
@@ -0,0 +1,138 @@
+import heapq
+import math
+import random
+import time
+from datetime import datetime
+
+from src.config import (
+    ACCESS_HALF_LIFE_SECONDS,
+    REFRESH_JITTER,
+    REFRESH_MAX_INTERVAL_SECONDS,
+    REFRESH_MIN_INTERVAL_SECONDS,
+    REFRESH_RETRY_SECONDS,
+    REFRESH_TICK_SECONDS,
+)
+
+
+class AccessTracker:
+    """Популярность городов: число обращений с экспоненциальным затуханием"""
+
+    def __init__(self, half_life: float = ACCESS_HALF_LIFE_SECONDS) -> None:
+        self.decay: float = math.log(2) / half_life
+        self._scores: dict[int, tuple[float, float]] = {}
+
+    def record(self, city_id: int) -> None:
+        now: float = time.time()
+        self._scores[city_id] = (self.score(city_id, now) + 1, now)
+
+    def score(self, city_id: int, now: float | None = None) -> float:
+        score, recorded_at = self._scores.get(city_id, (0.0, 0.0))
+        if not score:
+            return 0.0
+        return score * math.exp(-self.decay * ((now or time.time()) - recorded_at))
+
+    def forget(self, city_id: int) -> None:
+        self._scores.pop(city_id, None)
+
+
+class RefreshScheduler:
+    """Очередь обновления городов, упорядоченная по сроку следующего обновления.
+
+    Интервал обновления города сокращается с ростом числа обращений к нему, а срок
+    смещается на случайную долю интервала, чтобы города не обновлялись одной волной.
+    """
+
+    def __init__(
+        self,
+        tracker: AccessTracker,
+        min_interval: float = REFRESH_MIN_INTERVAL_SECONDS,
+        max_interval: float = REFRESH_MAX_INTERVAL_SECONDS,
+        retry_interval: float = REFRESH_RETRY_SECONDS,
+        tick: float = REFRESH_TICK_SECONDS,
+        jitter: float = REFRESH_JITTER,
+    ) -> None:
+        self.tracker: AccessTracker = tracker
+        self.min_interval: float = min_interval
+        self.max_interval: float = max_interval
+        self.retry_interval: float = retry_interval
+        self.tick: float = tick
+        self.jitter: float = jitter
+
+        self._queue: list[tuple[float, int]] = []
+        self._deadlines: dict[int, float] = {}
+
+    @property
+    def city_ids(self) -> set[int]:
+        return set(self._deadlines)
+
+    def interval(self, city_id: int) -> float:
+        score: float = self.tracker.score(city_id)
+        return min(self.max_interval, max(self.min_interval, self.max_interval / (1 + score)))
+
+    def sync(self, updated_at: dict[int, datetime | None]) -> None:
+        """Приводит очередь к актуальному списку городов.
+
+        Срок обновления нового города считается от времени последнего обновления
+        его данных в БД, поэтому после перезапуска свежие данные не запрашиваются повторно.
+        """
+        for city_id in self.city_ids - set(updated_at):
+            del self._deadlines[city_id]
+            self.tracker.forget(city_id)
+
+        for city_id, last_update in updated_at.items():
+            if city_id in self._deadlines:
+                continue
+            if last_update is None:
+                self._schedule(city_id, time.time())
+            else:
+                self._schedule(city_id, last_update.timestamp() + self._jittered(self.interval(city_id)))
+
+    def due(self, limit: int | None = None) -> list[int]:
+        """Города, срок обновления которых наступил.
+
+        По умолчанию за один такт выдаётся не больше городов, чем нужно для равномерного
+        обновления всех городов за минимальный интервал.
+        """
+        if limit is None:
+            limit = max(1, math.ceil(len(self._deadlines) * self.tick / self.min_interval))
+
+        now: float = time.time()
+        result: list[int] = []
+        while self._queue and len(result) < limit and self._queue[0][0] <= now:
+            deadline, city_id = heapq.heappop(self._queue)
+            # Устаревшие записи очереди (город удалён или перепланирован) пропускаются
+            if self._deadlines.get(city_id) == deadline:
+                result.append(city_id)
+        return result
+
+    def reschedule(self, city_id: int, succeeded: bool = True) -> None:
+        if city_id not in self._deadlines:
+            return
+
+        interval: float = self.interval(city_id) if succeeded else self.retry_interval
+        self._schedule(city_id, time.time() + self._jittered(interval))
+
+    def next_refresh(self, city_id: int) -> float | None:
+        return self._deadlines.get(city_id)
+
+    def clear(self) -> None:
+        self._queue.clear()
+        self._deadlines.clear()
+
+    def stats(self) -> dict[str, int]:
+        now: float = time.time()
+        return {
+            "cities": len(self._deadlines),
+            "overdue": sum(1 for deadline in self._deadlines.values() if deadline <= now),
+        }
+
+    def _schedule(self, city_id: int, deadline: float) -> None:
+        self._deadlines[city_id] = deadline
+        heapq.heappush(self._queue, (deadline, city_id))
+
+    def _jittered(self, interval: float) -> float:
+        return interval * (1 + random.uniform(-self.jitter, self.jitter))
+
+
+access_tracker = AccessTracker()
+refresh_scheduler = RefreshScheduler(access_tracker)
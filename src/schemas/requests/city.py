@@ -1,6 +1,19 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 
 class NewCityRequest(BaseModel):
     name: str
     latitude: float = Field(ge=-90, le=90, description="Широта")
-    longitude: float = Field(ge=-180, le=180, description="Долгота")
\ No newline at end of file
+    longitude: float = Field(ge=-180, le=180, description="Долгота")
+
+class CityImportRow(BaseModel):
+    """Строка файла импорта: без координат город ищется через геокодирование"""
+
+    name: str = Field(min_length=1, max_length=255)
+    latitude: float | None = Field(default=None, ge=-90, le=90)
+    longitude: float | None = Field(default=None, ge=-180, le=180)
+
+    @model_validator(mode="after")
+    def check_coordinates(self) -> "CityImportRow":
+        if (self.latitude is None) != (self.longitude is None):
+            raise ValueError("Координаты указываются парой: latitude и longitude")
+        return self
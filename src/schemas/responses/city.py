@@ -1,9 +1,27 @@
 from pydantic import BaseModel, ConfigDict
 
+from src.enums import CityImportStatus
+
+
 class CityDataResponse(BaseModel):
     id: int
     name: str
     latitude: float
     longitude: float
 
-    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class CityImportRowResponse(BaseModel):
+    row: int
+    name: str | None
+    status: CityImportStatus
+    id: int | None = None
+    weather: bool = False
+    detail: str | None = None
+
+
+class CityImportResponse(BaseModel):
+    created: int
+    existing: int
+    failed: int
+    rows: list[CityImportRowResponse]
@@ -2,9 +2,10 @@ from pydantic import BaseModel, ConfigDict
 
 
 class WeatherDataResponse(BaseModel):
-    temperature: float
-    wind_speed: float
-    pressure_msl: float
+    # None - значения за этот час нет в прогнозе Open-Meteo
+    temperature: float | None
+    wind_speed: float | None
+    pressure_msl: float | None
 
     model_config = ConfigDict(from_attributes=True)
 
@@ -15,3 +16,26 @@ class WeatherWithFiltersResponse(BaseModel):
     pressure_msl: float | None = None
     humidity: float | None = None
     precipitation: float | None = None
+
+
+class CityWeatherValueResponse(BaseModel):
+    id: int
+    name: str
+    value: float
+
+
+class CityWeatherBatchItem(BaseModel):
+    weather: WeatherDataResponse | WeatherWithFiltersResponse | None = None
+    error: str | None = None
+
+
+class WeatherBatchResponse(BaseModel):
+    hour: int
+    results: dict[str, CityWeatherBatchItem]
+
+
+class WeatherRangeResponse(BaseModel):
+    start_hour: int
+    end_hour: int
+    # Значения по часам от start_hour до end_hour включительно для каждого показателя
+    series: dict[str, list[float | None]]
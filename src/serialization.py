@@ -0,0 +1,32 @@
+"""Сериализация ответов горячих эндпоинтов.
+
+Обработчики возвращают готовые словари в форме схем ответа, а JSONBytesResponse
+кодирует их сразу в байты, минуя повторную проверку pydantic и общий кодировщик
+FastAPI. Схема ответа в OpenAPI по-прежнему берётся из аннотации обработчика.
+"""
+import json
+from typing import Any
+
+from fastapi import Response
+
+try:
+    import orjson
+except ImportError:  # необязательная зависимость: pip install .[speedups]
+    orjson = None
+
+
+def dumps(content: Any) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(content)
+    return json.dumps(content, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode()
+
+
+class JSONBytesResponse(Response):
+    """JSON-ответ из словаря или из уже сериализованных байтов"""
+
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, bytes):
+            return content
+        return dumps(content)
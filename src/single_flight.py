@@ -0,0 +1,53 @@
+import asyncio
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _LeaderCancelled(Exception):
+    """Запрос-лидер отменён до получения результата"""
+
+
+class SingleFlight:
+    """Объединение одновременных одинаковых операций.
+
+    Первый вызов с ключом (лидер) выполняет операцию, остальные вызовы с тем же
+    ключом ждут его результата или исключения. Отмена ожидающего не затрагивает
+    остальных, а при отмене лидера один из ожидающих становится новым лидером.
+    """
+
+    def __init__(self) -> None:
+        self._calls: dict[Hashable, asyncio.Future] = {}
+        self.leaders: int = 0
+        self.followers: int = 0
+
+    async def do(self, key: Hashable, operation: Callable[[], Awaitable[T]]) -> T:
+        while (future := self._calls.get(key)) is not None:
+            self.followers += 1
+            try:
+                return await asyncio.shield(future)
+            except _LeaderCancelled:
+                continue
+
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        self.leaders += 1
+        try:
+            result: T = await operation()
+        except asyncio.CancelledError:
+            future.set_exception(_LeaderCancelled())
+            raise
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+            # Помечаем исключение полученным, даже если ожидающих не было
+            if future.done():
+                future.exception()
+
+    def stats(self) -> dict[str, int]:
+        return {"in_flight": len(self._calls), "leaders": self.leaders, "followers": self.followers}
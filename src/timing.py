@@ -0,0 +1,117 @@
+"""Разбивка времени обработки запроса по этапам.
+
+Этапы отмечаются через span() и складываются в список текущего запроса,
+хранящийся в ContextVar: вне запроса (фоновые задачи) и при выключенной
+разбивке span() ничего не записывает.
+"""
+import json
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from logging import Logger
+from typing import Iterator
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import REQUEST_TIMING_SLOW_SECONDS
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+# Длительность этапов текущего запроса: имя этапа -> [суммарное время, число вызовов]
+_spans: ContextVar[dict[str, list[float]] | None] = ContextVar("request_spans", default=None)
+
+
+def record(name: str, duration: float) -> None:
+    spans: dict[str, list[float]] | None = _spans.get()
+    if spans is None:
+        return
+
+    entry: list[float] | None = spans.get(name)
+    if entry is None:
+        spans[name] = [duration, 1]
+    else:
+        entry[0] += duration
+        entry[1] += 1
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    if _spans.get() is None:
+        yield
+        return
+
+    started: float = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+class ServerTimingMiddleware:
+    """ASGI-middleware: заголовок Server-Timing с этапами запроса и журнал медленных запросов.
+
+    Этапы могут быть вложенными (например, forecast внутри city), поэтому их сумма
+    не обязана совпадать с total.
+    """
+
+    def __init__(self, app: ASGIApp, slow_seconds: float = REQUEST_TIMING_SLOW_SECONDS) -> None:
+        self.app: ASGIApp = app
+        self.slow_seconds: float = slow_seconds
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        spans: dict[str, list[float]] = {}
+        token = _spans.set(spans)
+        started: float = time.perf_counter()
+        status: int = 500
+
+        async def send_with_timing(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                headers = MutableHeaders(scope=message)
+                headers.append(
+                    "Server-Timing", self._header(spans, time.perf_counter() - started)
+                )
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            _spans.reset(token)
+            elapsed: float = time.perf_counter() - started
+            if elapsed >= self.slow_seconds:
+                self._log_slow(scope, status, elapsed, spans)
+
+    @staticmethod
+    def _header(spans: dict[str, list[float]], total: float) -> str:
+        entries: list[str] = [
+            f"{name};dur={duration * 1000:.2f}" for name, (duration, _) in spans.items()
+        ]
+        entries.append(f"total;dur={total * 1000:.2f}")
+        return ", ".join(entries)
+
+    @staticmethod
+    def _log_slow(scope: Scope, status: int, elapsed: float, spans: dict[str, list[float]]) -> None:
+        route = scope.get("route")
+        entry: dict[str, object] = {
+            "method": scope["method"],
+            "path": scope["path"],
+            "query": scope["query_string"].decode("latin-1"),
+            "route": route.path if route is not None else None,
+            "status": status,
+            "total_ms": round(elapsed * 1000, 2),
+            "spans": {
+                name: {"ms": round(duration * 1000, 2), "count": int(count)}
+                for name, (duration, count) in spans.items()
+            },
+        }
+        logger.warning(
+            f"Медленный запрос: {json.dumps(entry, ensure_ascii=False)}",
+            extra={"request_timing": entry},
+        )
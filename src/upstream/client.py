@@ -0,0 +1,125 @@
+import time
+from logging import Logger
+from types import SimpleNamespace
+from typing import Any
+
+import aiohttp
+
+from src.config import (
+    FORECAST_POOL_SIZE,
+    GEOCODING_POOL_SIZE,
+    UPSTREAM_DNS_CACHE_SECONDS,
+    UPSTREAM_KEEPALIVE_SECONDS,
+    UPSTREAM_TIMEOUT_SECONDS,
+)
+from src.logging import get_logger
+from src.metrics import upstream_request_duration
+from src.timing import record
+
+logger: Logger = get_logger(__name__)
+
+
+class UpstreamClient:
+    """Долгоживущие HTTP-сессии к Open-Meteo с отдельным пулом соединений на каждый хост"""
+
+    def __init__(
+        self,
+        forecast_pool_size: int = FORECAST_POOL_SIZE,
+        geocoding_pool_size: int = GEOCODING_POOL_SIZE,
+    ) -> None:
+        self.pool_sizes: dict[str, int] = {
+            "forecast": forecast_pool_size,
+            "geocoding": geocoding_pool_size,
+        }
+        self._sessions: dict[str, aiohttp.ClientSession] = {}
+        self._stats: dict[str, dict[str, int]] = {
+            name: {
+                "requests": 0,
+                "connections_created": 0,
+                "connections_reused": 0,
+                "dns_cache_hits": 0,
+                "dns_cache_misses": 0,
+            }
+            for name in self.pool_sizes
+        }
+
+    @property
+    def forecast(self) -> aiohttp.ClientSession:
+        return self._sessions["forecast"]
+
+    @property
+    def geocoding(self) -> aiohttp.ClientSession:
+        return self._sessions["geocoding"]
+
+    async def start(self) -> None:
+        for name, pool_size in self.pool_sizes.items():
+            self._sessions[name] = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(
+                    limit=pool_size,
+                    limit_per_host=pool_size,
+                    keepalive_timeout=UPSTREAM_KEEPALIVE_SECONDS,
+                    use_dns_cache=True,
+                    ttl_dns_cache=UPSTREAM_DNS_CACHE_SECONDS,
+                ),
+                timeout=aiohttp.ClientTimeout(total=UPSTREAM_TIMEOUT_SECONDS),
+                trace_configs=[self._trace_config(name)],
+            )
+        logger.info(f"HTTP-клиент запущен, размеры пулов соединений: {self.pool_sizes}")
+
+    async def close(self) -> None:
+        for session in self._sessions.values():
+            await session.close()
+        self._sessions.clear()
+        logger.info("HTTP-клиент остановлен")
+
+    def stats(self) -> dict[str, Any]:
+        result: dict[str, Any] = {}
+        for name, stats in self._stats.items():
+            connections: int = stats["connections_created"] + stats["connections_reused"]
+            result[name] = {
+                **stats,
+                "pool_size": self.pool_sizes[name],
+                "reuse_ratio": round(stats["connections_reused"] / connections, 4)
+                if connections
+                else 0.0,
+            }
+        return result
+
+    def _trace_config(self, name: str) -> aiohttp.TraceConfig:
+        stats: dict[str, int] = self._stats[name]
+
+        def counter(key: str):
+            async def increment(
+                session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+            ) -> None:
+                stats[key] += 1
+
+            return increment
+
+        async def request_started(
+            session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+        ) -> None:
+            stats["requests"] += 1
+            context.started = time.perf_counter()
+
+        async def request_finished(
+            session: aiohttp.ClientSession, context: SimpleNamespace, params: Any
+        ) -> None:
+            # Исход - класс статуса ответа или тип исключения
+            if isinstance(params, aiohttp.TraceRequestEndParams):
+                outcome: str = f"{params.response.status // 100}xx"
+            else:
+                outcome = type(params.exception).__name__
+            duration: float = time.perf_counter() - context.started
+            upstream_request_duration.observe(duration, params.url.host, outcome)
+            record("upstream", duration)
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_request_start.append(request_started)
+        trace_config.on_request_end.append(request_finished)
+        trace_config.on_request_exception.append(request_finished)
+        trace_config.on_connection_create_end.append(counter("connections_created"))
+        trace_config.on_connection_reuseconn.append(counter("connections_reused"))
+        trace_config.on_dns_cache_hit.append(counter("dns_cache_hits"))
+        trace_config.on_dns_cache_miss.append(counter("dns_cache_misses"))
+        return trace_config
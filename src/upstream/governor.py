@@ -0,0 +1,146 @@
+import asyncio
+import heapq
+import itertools
+import time
+from contextlib import asynccontextmanager
+from logging import Logger
+from typing import Any, AsyncIterator
+
+from src.config import (
+    UPSTREAM_BURST,
+    UPSTREAM_MAX_IN_FLIGHT_PER_HOST,
+    UPSTREAM_RATE_PER_SECOND,
+)
+from src.enums import UpstreamPriority
+from src.logging import get_logger
+
+logger: Logger = get_logger(__name__)
+
+
+class UpstreamGovernor:
+    """Общий для процесса ограничитель запросов к внешним API.
+
+    Токен-бакет ограничивает частоту запросов, семафор на хост - число
+    одновременных запросов, а очередь с приоритетами пропускает
+    пользовательские запросы раньше фонового обновления кэша.
+    """
+
+    def __init__(
+        self,
+        rate: float = UPSTREAM_RATE_PER_SECOND,
+        burst: int = UPSTREAM_BURST,
+        max_in_flight_per_host: int = UPSTREAM_MAX_IN_FLIGHT_PER_HOST,
+    ) -> None:
+        self.rate: float = rate
+        self.burst: int = burst
+        self.max_in_flight_per_host: int = max_in_flight_per_host
+
+        self._tokens: float = float(burst)
+        self._refilled_at: float = time.monotonic()
+        self._sequence = itertools.count()
+        self._waiters: list[tuple[int, int, str, asyncio.Future[None]]] = []
+        self._in_flight: dict[str, int] = {}
+        self._timer: asyncio.TimerHandle | None = None
+
+        self._wait_stats: dict[UpstreamPriority, dict[str, float]] = {
+            priority: {"count": 0, "total": 0.0, "max": 0.0}
+            for priority in UpstreamPriority
+        }
+
+    @asynccontextmanager
+    async def acquire(
+        self, host: str, priority: UpstreamPriority = UpstreamPriority.INTERACTIVE
+    ) -> AsyncIterator[None]:
+        started: float = time.monotonic()
+        waiter: asyncio.Future[None] = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority.value, next(self._sequence), host, waiter))
+        self._dispatch()
+
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            # Слот мог быть выдан до отмены - его нужно вернуть
+            if waiter.done() and not waiter.cancelled():
+                self._release(host)
+            raise
+
+        self._record_wait(priority, time.monotonic() - started)
+        try:
+            yield
+        finally:
+            self._release(host)
+
+    def stats(self) -> dict[str, Any]:
+        queued: dict[str, int] = {priority.name.lower(): 0 for priority in UpstreamPriority}
+        for priority, _, _, waiter in self._waiters:
+            if not waiter.done():
+                queued[UpstreamPriority(priority).name.lower()] += 1
+
+        return {
+            "queue_depth": queued,
+            "in_flight": dict(self._in_flight),
+            "tokens": round(self._tokens, 2),
+            "wait_seconds": {
+                priority.name.lower(): {
+                    "count": int(stats["count"]),
+                    "avg": round(stats["total"] / stats["count"], 4) if stats["count"] else 0.0,
+                    "max": round(stats["max"], 4),
+                }
+                for priority, stats in self._wait_stats.items()
+            },
+        }
+
+    def _refill(self) -> None:
+        now: float = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._refilled_at) * self.rate)
+        self._refilled_at = now
+
+    def _dispatch(self) -> None:
+        self._refill()
+
+        # Запросы к хосту, у которого исчерпан лимит одновременных запросов,
+        # не должны блокировать очередь для остальных хостов
+        blocked: list[tuple[int, int, str, asyncio.Future[None]]] = []
+        while self._waiters and self._tokens >= 1:
+            item = heapq.heappop(self._waiters)
+            _, _, host, waiter = item
+            if waiter.done():
+                continue
+            if self._in_flight.get(host, 0) >= self.max_in_flight_per_host:
+                blocked.append(item)
+                continue
+
+            self._tokens -= 1
+            self._in_flight[host] = self._in_flight.get(host, 0) + 1
+            waiter.set_result(None)
+
+        for item in blocked:
+            heapq.heappush(self._waiters, item)
+
+        if self._waiters and self._tokens < 1 and self._timer is None:
+            delay: float = (1 - self._tokens) / self.rate
+            self._timer = asyncio.get_running_loop().call_later(delay, self._on_timer)
+
+    def _on_timer(self) -> None:
+        self._timer = None
+        self._dispatch()
+
+    def _release(self, host: str) -> None:
+        self._in_flight[host] -= 1
+        if not self._in_flight[host]:
+            del self._in_flight[host]
+        self._dispatch()
+
+    def _record_wait(self, priority: UpstreamPriority, waited: float) -> None:
+        stats: dict[str, float] = self._wait_stats[priority]
+        stats["count"] += 1
+        stats["total"] += waited
+        stats["max"] = max(stats["max"], waited)
+
+        if waited > 1:
+            logger.warning(
+                f"Запрос к внешнему API ({priority.name}) ожидал в очереди {waited:.2f} c"
+            )
+
+
+upstream_governor = UpstreamGovernor()
@@ -1,70 +1,127 @@
 from logging import Logger
 from typing import Any
 
-import aiohttp
+from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
+from src.database.writer import DatabaseWriter, database_writer
 from src.exceptions.city import CityNotFoundError
 from src.exceptions.weather import WeatherNotFoundError
+from src.forecast_codec import PackedForecast
+from src.metrics import city_service_upstream
+from src.single_flight import SingleFlight
+from src.timing import span
+from src.upstream.client import UpstreamClient
 from src.use_cases.fetch_coordinates import FetchCityCoordinates
 from src.use_cases.fetch_weather_data import FetchWeatherData
 
 from src.logging import get_logger
 logger: Logger = get_logger(__name__)
 
+# Одновременные промахи по одному городу и запросы погоды по одним координатам
+# выполняются один раз, остальные запросы ждут результата
+city_flights = SingleFlight()
+weather_flights = SingleFlight()
+
+
 class CityService:
     def __init__(
-        self, weather_repo: WeatherRepository, city_repo: CityRepository
+        self,
+        weather_repo: WeatherRepository,
+        city_repo: CityRepository,
+        writer: DatabaseWriter = database_writer,
     ) -> None:
         self.weather_repo: WeatherRepository = weather_repo
         self.city_repo: CityRepository = city_repo
+        self.writer: DatabaseWriter = writer
 
     async def __call__(
         self,
         city_name: str,
-        session: aiohttp.ClientSession,
+        http_client: UpstreamClient,
         latitude: float | None = None,
         longitude: float | None = None,
-    ) -> tuple[dict[str, Any], dict[str, Any]]:
+    ) -> tuple[dict[str, Any], PackedForecast]:
         try:
-            city: dict[str, Any] = await self.city_repo._get(city_name)
+            with span("city_lookup"):
+                city: dict[str, Any] = await self.city_repo._get(city_name)
+        except CityNotFoundError:
+            logger.info(f"Город {city_name} не найден в БД")
+            city_service_upstream.inc("city_not_found")
+            return await city_flights.do(
+                ("city", self.city_repo.directory.normalize(city_name)),
+                lambda: self._create_city(city_name, http_client, latitude, longitude),
+            )
 
-            latitude, longitude = city["latitude"], city["longitude"]
-            try:
-                city_weather_data: dict[str, Any] = await self.weather_repo.get(
-                    city["id"]
-                )
+        try:
+            with span("weather_lookup"):
+                city_weather_data: dict[str, Any] = await self.weather_repo.get(city["id"])
 
-                return city, city_weather_data["data"]
-            except WeatherNotFoundError:
-                logger.info(f"Данные о погоде для города {city_name} не найдены в БД")
-                city_weather_data = await FetchWeatherData()(
-                    latitude, longitude, session
-                )
+            return city, city_weather_data["data"]
+        except WeatherNotFoundError:
+            logger.info(f"Данные о погоде для города {city_name} не найдены в БД")
+            city_service_upstream.inc("weather_not_found")
+            return await city_flights.do(
+                ("weather", city["id"]),
+                lambda: self._restore_weather(city, http_client),
+            )
+
+    async def _restore_weather(
+        self, city: dict[str, Any], http_client: UpstreamClient
+    ) -> tuple[dict[str, Any], PackedForecast]:
+        city_weather_data: PackedForecast = await self._fetch_weather(
+            city["latitude"], city["longitude"], http_client
+        )
 
-                await self.weather_repo.save(
+        with span("write"):
+            await self.writer.submit(
+                lambda session: self.weather_repo.with_session(session).save(
                     {"city_id": city["id"], "data": city_weather_data}
                 )
+            )
 
-                return city, city_weather_data
+        return city, city_weather_data
 
-        except CityNotFoundError:
-            logger.info(f"Город {city_name} не найден в БД")
-            if latitude is None or longitude is None:
+    async def _create_city(
+        self,
+        city_name: str,
+        http_client: UpstreamClient,
+        latitude: float | None,
+        longitude: float | None,
+    ) -> tuple[dict[str, Any], PackedForecast]:
+        if latitude is None or longitude is None:
+            with span("geocoding"):
                 coordinates: dict[str, float] = await FetchCityCoordinates()(
-                    city_name, session
+                    city_name, http_client.geocoding
                 )
-                latitude, longitude = coordinates["latitude"], coordinates["longitude"]
+            latitude, longitude = coordinates["latitude"], coordinates["longitude"]
 
-            
-            new_city: dict[str, Any] = await self.city_repo.save(
+        # Прогноз запрашивается до записи, чтобы не держать транзакцию во время запроса к API
+        city_weather_data: PackedForecast = await self._fetch_weather(
+            latitude, longitude, http_client
+        )
+
+        async def save_city(session: AsyncSession) -> dict[str, Any]:
+            new_city: dict[str, Any] = await self.city_repo.with_session(session).save(
                 {"name": city_name, "latitude": latitude, "longitude": longitude}
             )
-
-            city_weather_data = await FetchWeatherData()(latitude, longitude, session)
-            await self.weather_repo.save(
+            await self.weather_repo.with_session(session).save(
                 {"city_id": new_city["id"], "data": city_weather_data}
             )
+            return new_city
+
+        with span("write"):
+            new_city: dict[str, Any] = await self.writer.submit(save_city)
 
-            return new_city, city_weather_data
+        return new_city, city_weather_data
+
+    async def _fetch_weather(
+        self, latitude: float, longitude: float, http_client: UpstreamClient
+    ) -> PackedForecast:
+        # Включает ожидание очереди к API и повторы после сетевых ошибок
+        with span("forecast"):
+            return await weather_flights.do(
+                (latitude, longitude),
+                lambda: FetchWeatherData()(latitude, longitude, http_client.forecast),
+            )
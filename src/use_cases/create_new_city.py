@@ -1,12 +1,11 @@
 from typing import Any
 
-import aiohttp
-
 from src.schemas.responses.city import CityDataResponse
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
 from src.use_cases.city_service import CityService
 from src.mappers.city import CityMapper
+from src.upstream.client import UpstreamClient
 
 class GetOrCreateNewCity:
     def __init__(
@@ -21,10 +20,10 @@ class GetOrCreateNewCity:
         city_name: str,
         latitude: float,
         longitude: float,
-        session: aiohttp.ClientSession,
+        http_client: UpstreamClient,
     )  -> CityDataResponse:
         city, _ = await CityService(self.weather_repo, self.city_repo)(
-            city_name, session, latitude=latitude, longitude=longitude
+            city_name, http_client, latitude=latitude, longitude=longitude
         )
 
         return self.mapper.to_response_model(city)
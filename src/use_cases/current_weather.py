@@ -1,10 +1,8 @@
 from datetime import datetime
-from typing import Any
-
-import aiohttp
-
+from src.forecast_codec import PackedForecast
 from src.mappers.weather import WeatherMapper
 from src.schemas.responses.weather import WeatherDataResponse
+from src.upstream.client import UpstreamClient
 from src.use_cases.fetch_weather_data import FetchWeatherData
 
 
@@ -13,8 +11,10 @@ class CurrentCityWeather:
         self.mapper: WeatherMapper = mapper
 
     async def __call__(
-        self, latitude: float, longitude: float, session: aiohttp.ClientSession
+        self, latitude: float, longitude: float, http_client: UpstreamClient
     ) -> WeatherDataResponse:
-        data: dict[str, Any] = await FetchWeatherData()(latitude, longitude, session)
+        data: PackedForecast = await FetchWeatherData()(
+            latitude, longitude, http_client.forecast
+        )
         timestamp: int = datetime.now().hour
         return self.mapper.to_response_model(data, timestamp)
@@ -1,5 +1,6 @@
 import asyncio
 import logging
+from urllib.parse import urlsplit
 
 import aiohttp
 from tenacity import (
@@ -10,6 +11,10 @@ from tenacity import (
     wait_exponential,
 )
 
+from src.cache.geocoding import GeocodingCache, geocoding_cache
+from src.config import OPEN_METEO_GEOCODING_URL
+from src.enums import UpstreamPriority
+from src.exceptions.city import CityNotFoundError
 from src.exceptions.weather import (
     WeatherAPIConnectionError,
     WeatherAPIError,
@@ -17,12 +22,22 @@ from src.exceptions.weather import (
     WeatherServiceError,
 )
 from src.logging import get_logger
+from src.metrics import count_retries
+from src.upstream.governor import upstream_governor
 
 logger: logging.Logger = get_logger(__name__)
 
 
 class FetchCityCoordinates:
-    GEO_URL = "https://geocoding-api.open-meteo.com/v1/search"
+    GEO_URL = OPEN_METEO_GEOCODING_URL
+
+    def __init__(
+        self,
+        priority: UpstreamPriority = UpstreamPriority.INTERACTIVE,
+        cache: GeocodingCache = geocoding_cache,
+    ) -> None:
+        self.priority: UpstreamPriority = priority
+        self.cache: GeocodingCache = cache
 
     @retry(
         stop=stop_after_attempt(3),
@@ -30,21 +45,42 @@ class FetchCityCoordinates:
         retry=retry_if_exception_type(
             (aiohttp.ClientConnectionError, asyncio.TimeoutError)
         ),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
+        before_sleep=count_retries(
+            urlsplit(GEO_URL).hostname, before_sleep_log(logger, logging.WARNING)
+        ),
         reraise=True,
     )
     async def fetch_coordinates(self, session: aiohttp.ClientSession, params: dict):
-        async with session.get(self.GEO_URL, params=params) as response:
-            return await response.json()
+        async with upstream_governor.acquire(urlsplit(self.GEO_URL).hostname, self.priority):
+            async with session.get(self.GEO_URL, params=params) as response:
+                # Без проверки статуса ответ об ошибке (429, 5xx) без results
+                # попал бы в кэш как "город не найден"
+                response.raise_for_status()
+                return await response.json()
 
     async def __call__(
         self, city_name: str, session: aiohttp.ClientSession
     ) -> dict[str, float]:
+        query: str = self.cache.normalize(city_name)
+        cached, city_coordinates = await self.cache.lookup(query)
+        if cached:
+            if city_coordinates is None:
+                logger.info(f"Город {city_name} ранее не был найден API, ответ взят из кэша")
+                raise CityNotFoundError(city_name)
+
+            logger.info(f"Координаты города {city_name} взяты из кэша геокодирования")
+            return city_coordinates
+
         params = {"name": city_name, "count": 1, "language": "ru"}
         try:
             logger.info(f"Запрос координат города {city_name} по GEO_URL")
             data = await self.fetch_coordinates(session, params)
 
+            if not data.get("results"):
+                logger.info(f"API не нашёл город {city_name}")
+                await self.cache.store(query, None)
+                raise CityNotFoundError(city_name)
+
             latitude = data["results"][0]["latitude"]
             longitude = data["results"][0]["longitude"]
 
@@ -52,12 +88,15 @@ class FetchCityCoordinates:
                 f"Координаты города {city_name} успешно извлечены из полученных API-данных"
             )
 
-            city_coordinates: dict[str, float] = {
+            city_coordinates = {
                 "latitude": latitude,
                 "longitude": longitude,
             }
+            await self.cache.store(query, city_coordinates)
 
             return city_coordinates
+        except CityNotFoundError:
+            raise
         except aiohttp.ClientConnectionError as e:
             logger.error(
                 f"Ошибка при попытке установки соединения с API для получения координат города {city_name}: {e}"
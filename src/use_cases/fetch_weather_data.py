@@ -1,5 +1,6 @@
 import asyncio
 from typing import Any
+from urllib.parse import urlsplit
 
 import aiohttp
 import logging
@@ -11,18 +12,32 @@ from tenacity import (
     before_sleep_log
 ) 
 
+from src.cache.forecast import ForecastCache, forecast_cache
+from src.config import OPEN_METEO_FORECAST_URL, WEATHER_BATCH_CONCURRENCY, WEATHER_BATCH_SIZE
+from src.enums import UpstreamPriority
 from src.exceptions.weather import (
     WeatherAPIConnectionError,
     WeatherAPIError,
     WeatherAPITimeoutError,
     WeatherServiceError,
 )
+from src.forecast_codec import PackedForecast
 from src.logging import get_logger
+from src.metrics import count_retries
+from src.upstream.governor import upstream_governor
 logger: logging.Logger = get_logger(__name__)
 
 
 class FetchWeatherData:
-    URL = "https://api.open-meteo.com/v1/forecast"
+    URL = OPEN_METEO_FORECAST_URL
+
+    def __init__(
+        self,
+        priority: UpstreamPriority = UpstreamPriority.INTERACTIVE,
+        cache: ForecastCache = forecast_cache,
+    ) -> None:
+        self.priority: UpstreamPriority = priority
+        self.cache: ForecastCache = cache
 
     @retry(
         stop=stop_after_attempt(3),
@@ -30,24 +45,23 @@ class FetchWeatherData:
         retry=retry_if_exception_type(
             (aiohttp.ClientConnectionError, asyncio.TimeoutError)
         ),
-        before_sleep=before_sleep_log(logger, logging.WARNING),
+        before_sleep=count_retries(urlsplit(URL).hostname, before_sleep_log(logger, logging.WARNING)),
         reraise=True
     )
     async def fetch_data(self, session: aiohttp.ClientSession, params: dict) -> dict:
-        async with session.get(
-            self.URL, params=params, timeout=aiohttp.ClientTimeout(total=10)
-        ) as response:
-            response.raise_for_status()
-            logger.info(f"Статус запроса к API Open Meteo: {response.status}")
+        async with upstream_governor.acquire(urlsplit(self.URL).hostname, self.priority):
+            async with session.get(
+                self.URL, params=params, timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+                response.raise_for_status()
+                logger.info(f"Статус запроса к API Open Meteo: {response.status}")
 
-            data = await response.json()
-        
-            return data
+                data = await response.json()
 
-    async def __call__(
-        self, latitude: float, longitude: float, session: aiohttp.ClientSession
-    ) -> dict[str, Any]:
-        params: dict[str, Any] = {
+                return data
+
+    def _params(self, latitude: float | str, longitude: float | str) -> dict[str, Any]:
+        return {
             "latitude": latitude,
             "longitude": longitude,
             "current_weather": "true",
@@ -55,17 +69,34 @@ class FetchWeatherData:
             "forecast_days": "1",
             "timezone": "auto",
         }
+
+    async def __call__(
+        self, latitude: float, longitude: float, session: aiohttp.ClientSession
+    ) -> PackedForecast:
+        # Прогноз запрашивается для центра ячейки кэша, чтобы его можно было отдать всем точкам ячейки
+        latitude, longitude = self.cache.snap(latitude, longitude)
+        params: dict[str, Any] = self._params(latitude, longitude)
+        cache_key = self.cache.key(latitude, longitude, params)
+        cached: PackedForecast | None = self.cache.get(cache_key)
+        if cached is not None:
+            logger.info(
+                f"Данные по координатам latitude={latitude}, longitude={longitude} взяты из кэша"
+            )
+            return cached
+
         try:
             logger.info(
                 f"Запрос погоды по координатам: latitude={latitude}, longitude={longitude}"
             )
             data = await self.fetch_data(session, params)
+            forecast = PackedForecast.from_payload(data)
 
             logger.info(
                 f"Данные по координатам latitude={latitude}, longitude={longitude} получены"
             )
+            self.cache.put(cache_key, forecast)
 
-            return data
+            return forecast
         
         except aiohttp.ClientResponseError as e:
             logger.error(
@@ -89,3 +120,111 @@ class FetchWeatherData:
                 exc_info=True,
             )
             raise WeatherServiceError(str(e))
+
+    async def fetch_many(
+        self,
+        coordinates: list[tuple[float, float]],
+        session: aiohttp.ClientSession,
+        batch_size: int = WEATHER_BATCH_SIZE,
+        concurrency: int = WEATHER_BATCH_CONCURRENCY,
+    ) -> list[PackedForecast | Exception]:
+        """Пакетный запрос: координаты упаковываются в один запрос на batch_size точек.
+
+        Результат идёт в порядке входных координат, вместо данных неудачных точек
+        возвращается исключение (аналогично asyncio.gather(return_exceptions=True)).
+        Точки из одной ячейки кэша запрашиваются один раз, для центра ячейки.
+        """
+        coordinates = [self.cache.snap(latitude, longitude) for latitude, longitude in coordinates]
+        results: list[PackedForecast | Exception] = [None] * len(coordinates)
+        cache_keys: list = [
+            self.cache.key(latitude, longitude, self._params(latitude, longitude))
+            for latitude, longitude in coordinates
+        ]
+
+        missing: list[int] = []
+        # Индекс первой точки каждой ячейки, которой нет в кэше
+        first: dict[Any, int] = {}
+        for i, cache_key in enumerate(cache_keys):
+            results[i] = self.cache.get(cache_key)
+            if results[i] is None and cache_key not in first:
+                first[cache_key] = i
+                missing.append(i)
+
+        if len(missing) < len(coordinates):
+            logger.info(
+                f"Запрашиваются данные для {len(missing)} ячеек из {len(coordinates)} точек, "
+                f"остальные взяты из кэша или совпадают по ячейке"
+            )
+
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def run(indexes: list[int]) -> None:
+            async with semaphore:
+                await self._fetch_chunk(coordinates, indexes, session, results)
+
+        await asyncio.gather(
+            *[
+                run(missing[start : start + batch_size])
+                for start in range(0, len(missing), batch_size)
+            ]
+        )
+
+        for i in missing:
+            if not isinstance(results[i], Exception):
+                self.cache.put(cache_keys[i], results[i])
+        for i, cache_key in enumerate(cache_keys):
+            if results[i] is None:
+                results[i] = results[first[cache_key]]
+
+        return results
+
+    async def _fetch_chunk(
+        self,
+        coordinates: list[tuple[float, float]],
+        indexes: list[int],
+        session: aiohttp.ClientSession,
+        results: list[PackedForecast | Exception],
+    ) -> None:
+        params: dict[str, Any] = self._params(
+            ",".join(str(coordinates[i][0]) for i in indexes),
+            ",".join(str(coordinates[i][1]) for i in indexes),
+        )
+        try:
+            logger.info(f"Пакетный запрос погоды для {len(indexes)} точек")
+            data = await self.fetch_data(session, params)
+
+            # Для одной точки API возвращает объект, для нескольких - список объектов
+            payloads: list[dict[str, Any]] = data if isinstance(data, list) else [data]
+            if len(payloads) != len(indexes):
+                raise WeatherServiceError(
+                    f"API вернул {len(payloads)} прогнозов вместо {len(indexes)}"
+                )
+            forecasts: list[PackedForecast] = [
+                PackedForecast.from_payload(payload) for payload in payloads
+            ]
+        except aiohttp.ClientResponseError as e:
+            # Ошибку 4xx может вызвать одна точка пакета: делим пакет пополам,
+            # чтобы изолировать её и получить данные для остальных
+            if len(indexes) > 1 and 400 <= e.status < 500 and e.status != 429:
+                logger.warning(
+                    f"Пакет из {len(indexes)} точек отклонён API ({e.status}), пакет делится"
+                )
+                middle: int = len(indexes) // 2
+                await self._fetch_chunk(coordinates, indexes[:middle], session, results)
+                await self._fetch_chunk(coordinates, indexes[middle:], session, results)
+                return
+
+            logger.error(f"Ошибка пакетного запроса погоды: {e.status} {e.message}")
+            for i in indexes:
+                results[i] = e
+            return
+        except Exception as e:
+            # Сетевые ошибки и таймауты уже повторены в fetch_data,
+            # дробление пакета лишь умножит число запросов
+            logger.error(f"Ошибка пакетного запроса погоды для {len(indexes)} точек: {e}")
+            for i in indexes:
+                results[i] = e
+            return
+
+        for i, forecast in zip(indexes, forecasts):
+            results[i] = forecast
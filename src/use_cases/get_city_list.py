@@ -1,14 +1,42 @@
+import hashlib
 from typing import Any
-from src.schemas.responses.city import CityDataResponse
+from src.cache.responses import ResponseVersion, make_etag
 from src.database.repositories.cities import CityRepository
 from src.mappers.city import CityMapper
+from src.serialization import dumps
 
 class GetCityList:
     def __init__(self, city_repo: CityRepository, mapper: CityMapper) -> None:
         self.repo: CityRepository = city_repo
         self.mapper: CityMapper = mapper
 
-    async def __call__(self, ) -> list[CityDataResponse]:
+    async def __call__(self, ) -> tuple[bytes, ResponseVersion]:
+        """Весь список, сериализованный в JSON, и его версия.
+
+        Справочник хранит байты и ETag до изменения списка, пока он в памяти, БД не запрашивается.
+        ETag считается по содержимому: справочники разных процессов независимы.
+        """
         cities: list[dict[str, Any]] = await self.repo.all()
 
-        return [self.mapper.to_response_model(city) for city in cities]
\ No newline at end of file
+        response: tuple[bytes, ResponseVersion] | None = self.repo.directory.listing_response(
+            self._encode
+        )
+        if response is not None:
+            return response
+
+        return self._encode(cities)
+
+    async def page(self, after_id: int, limit: int) -> tuple[list[dict[str, Any]], int | None]:
+        """Страница списка и курсор следующей страницы (None, если страница последняя)"""
+        cities: list[dict[str, Any]] = await self.repo.page(after_id, limit + 1)
+        next_cursor: int | None = cities[limit - 1]["id"] if len(cities) > limit else None
+
+        return self._build(cities[:limit]), next_cursor
+
+    def _build(self, cities: list[dict[str, Any]]) -> list[dict[str, Any]]:
+        return [self.mapper.to_response_content(city) for city in cities]
+
+    def _encode(self, cities: list[dict[str, Any]]) -> tuple[bytes, ResponseVersion]:
+        body: bytes = dumps(self._build(cities))
+        # Список может измениться в любой момент, поэтому клиент проверяет его при каждом запросе
+        return body, ResponseVersion(etag=make_etag("cities", hashlib.blake2b(body).hexdigest()))
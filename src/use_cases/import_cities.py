@@ -0,0 +1,237 @@
+import asyncio
+import csv
+import json
+from datetime import datetime
+from logging import Logger
+from typing import Any
+
+from fastapi import status
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.cache.weather_snapshot import weather_snapshot
+from src.config import CITY_IMPORT_GEOCODING_CONCURRENCY, CITY_IMPORT_MAX_ROWS
+from src.database.hooks import on_commit
+from src.database.repositories.cities import CityRepository
+from src.database.repositories.weather_data import WeatherRepository
+from src.database.writer import DatabaseWriter, database_writer
+from src.enums import CityImportStatus, UpstreamPriority
+from src.exceptions.city import CityImportError, CityNotFoundError
+from src.exceptions.http import APIException
+from src.forecast_codec import PackedForecast
+from src.logging import get_logger
+from src.schemas.requests.city import CityImportRow
+from src.schemas.responses.city import CityImportResponse, CityImportRowResponse
+from src.upstream.client import UpstreamClient
+from src.use_cases.fetch_coordinates import FetchCityCoordinates
+from src.use_cases.fetch_weather_data import FetchWeatherData
+
+logger: Logger = get_logger(__name__)
+
+CONTENT_TYPES: tuple[str, ...] = ("text/csv", "application/x-ndjson")
+
+
+class ImportCities:
+    """Массовое добавление городов из CSV (name,latitude,longitude) или NDJSON.
+
+    Существующие имена отсеиваются одним запросом, координаты ищутся параллельно
+    с ограничением числа запросов, прогнозы запрашиваются пакетами, а города
+    и погода для них записываются одной операцией DatabaseWriter.
+    """
+
+    def __init__(
+        self,
+        city_repo: CityRepository,
+        weather_repo: WeatherRepository,
+        writer: DatabaseWriter = database_writer,
+        max_rows: int = CITY_IMPORT_MAX_ROWS,
+        geocoding_concurrency: int = CITY_IMPORT_GEOCODING_CONCURRENCY,
+    ) -> None:
+        self.city_repo: CityRepository = city_repo
+        self.weather_repo: WeatherRepository = weather_repo
+        self.writer: DatabaseWriter = writer
+        self.max_rows: int = max_rows
+        self.geocoding_concurrency: int = geocoding_concurrency
+        # Импорт не должен вытеснять запросы пользователей к внешним API
+        self.fetch_coordinates = FetchCityCoordinates(priority=UpstreamPriority.BACKGROUND)
+        self.fetch_weather = FetchWeatherData(priority=UpstreamPriority.BACKGROUND)
+
+    async def __call__(
+        self, body: bytes, content_type: str, http_client: UpstreamClient
+    ) -> CityImportResponse:
+        records: list[dict[str, Any] | str] = self._parse(body, content_type)
+        logger.info(f"Импорт {len(records)} городов")
+
+        outcomes: dict[int, CityImportRowResponse] = {}
+        rows: dict[int, CityImportRow] = {}
+        seen: set[str] = set()
+        for number, record in enumerate(records, 1):
+            if isinstance(record, str):
+                outcomes[number] = self._outcome(number, None, CityImportStatus.INVALID, detail=record)
+                continue
+            try:
+                row: CityImportRow = CityImportRow.model_validate(record)
+            except ValidationError as e:
+                outcomes[number] = self._outcome(
+                    number,
+                    record.get("name"),
+                    CityImportStatus.INVALID,
+                    detail="; ".join(error["msg"] for error in e.errors()),
+                )
+                continue
+
+            row.name = self.city_repo.directory.normalize(row.name)
+            if row.name in seen:
+                outcomes[number] = self._outcome(number, row.name, CityImportStatus.DUPLICATE)
+                continue
+            seen.add(row.name)
+            rows[number] = row
+
+        existing: set[str] = await self.city_repo.existing_names(list(seen))
+        for number, row in list(rows.items()):
+            if row.name in existing:
+                outcomes[number] = self._outcome(number, row.name, CityImportStatus.EXISTS)
+                del rows[number]
+
+        await self._geocode(rows, outcomes, http_client)
+
+        numbers: list[int] = list(rows)
+        forecasts: list[PackedForecast | Exception] = await self.fetch_weather.fetch_many(
+            [(rows[number].latitude, rows[number].longitude) for number in numbers],
+            http_client.forecast,
+        )
+        forecast_by_name: dict[str, PackedForecast] = {
+            rows[number].name: forecast
+            for number, forecast in zip(numbers, forecasts)
+            if not isinstance(forecast, Exception)
+        }
+
+        created: dict[str, dict[str, Any]] = {}
+        if rows:
+            created = await self.writer.submit(
+                lambda session: self._save(session, list(rows.values()), forecast_by_name)
+            )
+
+        for number, row in rows.items():
+            city: dict[str, Any] | None = created.get(row.name)
+            if city is None:
+                # Город добавлен другим запросом между проверкой и записью
+                outcomes[number] = self._outcome(number, row.name, CityImportStatus.EXISTS)
+            else:
+                outcomes[number] = self._outcome(
+                    number,
+                    row.name,
+                    CityImportStatus.CREATED,
+                    id=city["id"],
+                    weather=row.name in forecast_by_name,
+                )
+
+        result: list[CityImportRowResponse] = [outcomes[number] for number in sorted(outcomes)]
+        response = CityImportResponse(
+            created=sum(1 for item in result if item.status is CityImportStatus.CREATED),
+            existing=sum(1 for item in result if item.status is CityImportStatus.EXISTS),
+            failed=sum(
+                1
+                for item in result
+                if item.status not in (CityImportStatus.CREATED, CityImportStatus.EXISTS)
+            ),
+            rows=result,
+        )
+        logger.info(
+            f"Импорт завершён: добавлено {response.created}, уже были {response.existing}, "
+            f"ошибок {response.failed}"
+        )
+        return response
+
+    def _parse(self, body: bytes, content_type: str) -> list[dict[str, Any] | str]:
+        """Записи файла; вместо записи, которую не удалось разобрать, - текст ошибки"""
+        media_type: str = content_type.split(";")[0].strip().lower()
+        if media_type not in CONTENT_TYPES:
+            raise CityImportError(
+                status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                f"Поддерживаются форматы: {', '.join(CONTENT_TYPES)}",
+            )
+
+        try:
+            text: str = body.decode("utf-8-sig")
+        except UnicodeDecodeError as e:
+            raise CityImportError(status.HTTP_400_BAD_REQUEST, f"Файл не в кодировке UTF-8: {e}")
+
+        records: list[dict[str, Any] | str] = []
+        if media_type == "text/csv":
+            for record in csv.DictReader(text.splitlines()):
+                records.append({key: value or None for key, value in record.items() if key})
+        else:
+            for line in text.splitlines():
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError as e:
+                    records.append(f"Некорректный JSON: {e}")
+                    continue
+                records.append(record if isinstance(record, dict) else "Строка должна быть объектом JSON")
+
+        if len(records) > self.max_rows:
+            raise CityImportError(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                f"Файл содержит {len(records)} строк, допускается не больше {self.max_rows}",
+            )
+        return records
+
+    async def _geocode(
+        self,
+        rows: dict[int, CityImportRow],
+        outcomes: dict[int, CityImportRowResponse],
+        http_client: UpstreamClient,
+    ) -> None:
+        semaphore = asyncio.Semaphore(self.geocoding_concurrency)
+
+        async def locate(number: int, row: CityImportRow) -> None:
+            try:
+                async with semaphore:
+                    coordinates: dict[str, float] = await self.fetch_coordinates(
+                        row.name, http_client.geocoding
+                    )
+                row.latitude, row.longitude = coordinates["latitude"], coordinates["longitude"]
+            except CityNotFoundError as e:
+                outcomes[number] = self._outcome(number, row.name, CityImportStatus.NOT_FOUND, detail=str(e))
+            except APIException as e:
+                outcomes[number] = self._outcome(number, row.name, CityImportStatus.FAILED, detail=e.detail)
+
+        await asyncio.gather(
+            *[locate(number, row) for number, row in rows.items() if row.latitude is None]
+        )
+        for number in outcomes:
+            rows.pop(number, None)
+
+    async def _save(
+        self,
+        session: AsyncSession,
+        rows: list[CityImportRow],
+        forecasts: dict[str, PackedForecast],
+    ) -> dict[str, dict[str, Any]]:
+        created: list[dict[str, Any]] = await self.city_repo.with_session(session).insert_many(
+            [row.model_dump() for row in rows]
+        )
+
+        updated_at: datetime = datetime.now()
+        payloads: dict[int, PackedForecast] = {
+            city["id"]: forecasts[city["name"]] for city in created if city["name"] in forecasts
+        }
+        await self.weather_repo.with_session(session).bulk_upsert(payloads, updated_at)
+        on_commit(
+            session,
+            lambda: weather_snapshot.publish(
+                {city_id: (data, updated_at) for city_id, data in payloads.items()}
+            ),
+        )
+        return {city["name"]: city for city in created}
+
+    @staticmethod
+    def _outcome(
+        number: int, name: Any, outcome: CityImportStatus, **fields: Any
+    ) -> CityImportRowResponse:
+        return CityImportRowResponse(
+            row=number, name=None if name is None else str(name), status=outcome, **fields
+        )
@@ -0,0 +1,25 @@
+from typing import Any
+
+from src.database.repositories.weather_data import WeatherRepository
+from src.enums import SortOrder, WeatherFilters
+from src.schemas.responses.weather import CityWeatherValueResponse
+
+
+class SearchCitiesByWeather:
+    def __init__(self, weather_repo: WeatherRepository) -> None:
+        self.weather_repo: WeatherRepository = weather_repo
+
+    async def __call__(
+        self,
+        hour: int,
+        variable: WeatherFilters,
+        min_value: float | None,
+        max_value: float | None,
+        order: SortOrder,
+        limit: int,
+    ) -> list[CityWeatherValueResponse]:
+        rows: list[dict[str, Any]] = await self.weather_repo.search(
+            hour, variable, min_value, max_value, order, limit
+        )
+
+        return [CityWeatherValueResponse(**row) for row in rows]
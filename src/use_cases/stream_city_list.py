@@ -0,0 +1,37 @@
+from typing import AsyncIterator
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import CITY_STREAM_BATCH_SIZE
+from src.database.repositories.cities import CityRepository
+from src.mappers.city import CityMapper
+from src.serialization import dumps
+
+
+class StreamCityList:
+    """Список городов в формате NDJSON: по объекту JSON на строку.
+
+    Строки пишутся в ответ порциями по мере чтения с курсора БД, поэтому расход
+    памяти не зависит от числа городов. Ответ отправляется уже после выхода из
+    обработчика, поэтому выдача открывает собственную сессию.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        mapper: CityMapper,
+        batch_size: int = CITY_STREAM_BATCH_SIZE,
+    ) -> None:
+        self.session_factory: async_sessionmaker[AsyncSession] = session_factory
+        self.mapper: CityMapper = mapper
+        self.batch_size: int = batch_size
+
+    async def __call__(self, after_id: int = 0) -> AsyncIterator[bytes]:
+        async with self.session_factory() as session:
+            repo = CityRepository(session, self.mapper)
+            async for rows in repo.stream(after_id, self.batch_size):
+                yield b"".join(
+                    dumps({"id": city_id, "name": name, "latitude": latitude, "longitude": longitude})
+                    + b"\n"
+                    for city_id, name, latitude, longitude in rows
+                )
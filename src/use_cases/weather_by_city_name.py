@@ -1,39 +1,130 @@
-import aiohttp
+from datetime import datetime
+from typing import Any, Hashable
 
+from src.cache.responses import ResponseCache, ResponseVersion, make_etag, matches, response_cache
+from src.cache.weather_snapshot import WeatherSnapshotEntry
 from src.database.repositories.cities import CityRepository
 from src.database.repositories.weather_data import WeatherRepository
 from src.enums import WeatherFilters
+from src.forecast_codec import PackedForecast
 from src.mappers.weather import WeatherMapper
-from src.schemas.responses.weather import (
-    WeatherDataResponse,
-    WeatherWithFiltersResponse,
-)
+from src.scheduler import RefreshScheduler, access_tracker, refresh_scheduler
+from src.serialization import dumps
+from src.timing import span
+from src.upstream.client import UpstreamClient
 from src.use_cases.city_service import CityService
 
 
 class CityWithWeather:
+    """Погода в городе в конкретный час.
+
+    Версия ответа - время обновления данных города в снимке: по ней строится ETag,
+    а тело ответа кодируется один раз на версию и берётся из ResponseCache.
+    """
+
     def __init__(
         self,
         weather_repo: WeatherRepository,
         city_repo: CityRepository,
         mapper: WeatherMapper,
+        cache: ResponseCache = response_cache,
+        scheduler: RefreshScheduler = refresh_scheduler,
     ) -> None:
         self.city_repo: CityRepository = city_repo
         self.weather_repo: WeatherRepository = weather_repo
         self.mapper: WeatherMapper = mapper
+        self.cache: ResponseCache = cache
+        self.scheduler: RefreshScheduler = scheduler
+
+    def not_modified(
+        self,
+        city_name: str,
+        timestamp: int,
+        filters: list[WeatherFilters] | None,
+        if_none_match: str | None,
+    ) -> ResponseVersion | None:
+        """Версия ответа, если копия клиента актуальна.
+
+        Проверка идёт только по справочнику и снимку в памяти: без обращения к БД
+        и построения ответа. None - копия устарела или данных в памяти нет.
+        """
+        if not if_none_match:
+            return None
+
+        city: dict[str, Any] | None = self.city_repo.directory.get(
+            self.city_repo.directory.normalize(city_name)
+        )
+        if city is None:
+            return None
+        entry: WeatherSnapshotEntry | None = self.weather_repo.snapshot.peek(city["id"])
+        if entry is None:
+            return None
+
+        version: ResponseVersion = self._version(city["id"], entry.updated_at, timestamp, filters)
+        if not matches(if_none_match, version.etag):
+            return None
+
+        access_tracker.record(city["id"])
+        return version
 
     async def __call__(
         self,
         city_name: str,
         timestamp: int,
-        session: aiohttp.ClientSession,
+        http_client: UpstreamClient,
         filters: list[WeatherFilters] | None = None,
-    ) -> WeatherDataResponse | WeatherWithFiltersResponse:
-        _, weather_data = await CityService(self.weather_repo, self.city_repo)(
-            city_name, session
+    ) -> tuple[bytes, ResponseVersion | None]:
+        city, weather_data = await CityService(self.weather_repo, self.city_repo)(
+            city_name, http_client
         )
+        access_tracker.record(city["id"])
 
+        entry: WeatherSnapshotEntry | None = self.weather_repo.snapshot.peek(city["id"])
+        if entry is None or entry.data is not weather_data:
+            # Данные получены не из снимка (только что записаны): версия неизвестна
+            with span("render"):
+                return dumps(self._content(weather_data, timestamp, filters)), None
+
+        key: Hashable = self._key(city["id"], timestamp, filters)
+        body: bytes | None = self.cache.get(key, entry.updated_at)
+        if body is None:
+            with span("render"):
+                body = dumps(self._content(weather_data, timestamp, filters))
+            self.cache.put(key, entry.updated_at, body)
+
+        return body, self._version(city["id"], entry.updated_at, timestamp, filters)
+
+    def _content(
+        self, data: PackedForecast, timestamp: int, filters: list[WeatherFilters] | None
+    ) -> dict[str, Any]:
         if filters is None:
-            return self.mapper.to_response_model(weather_data, timestamp)
+            return self.mapper.to_response_content(data, timestamp)
+
+        return self.mapper.to_optional_response_content(data, timestamp, filters)
+
+    @staticmethod
+    def _key(city_id: int, timestamp: int, filters: list[WeatherFilters] | None) -> Hashable:
+        # Порядок полей ответа с фильтрами не зависит от порядка фильтров в запросе
+        return (
+            city_id,
+            timestamp,
+            None if filters is None else tuple(sorted({f.value for f in filters})),
+        )
 
-        return self.mapper.to_optional_response_model(weather_data, timestamp, filters)
\ No newline at end of file
+    def _version(
+        self,
+        city_id: int,
+        updated_at: datetime,
+        timestamp: int,
+        filters: list[WeatherFilters] | None,
+    ) -> ResponseVersion:
+        # Срок следующего обновления знает только процесс, который обновляет погоду,
+        # остальные оценивают его по времени последнего обновления
+        expires_at: float | None = self.scheduler.next_refresh(city_id)
+        if expires_at is None:
+            expires_at = updated_at.timestamp() + self.scheduler.interval(city_id)
+
+        return ResponseVersion(
+            etag=make_etag(self._key(city_id, timestamp, filters), updated_at.timestamp()),
+            expires_at=expires_at,
+        )
@@ -0,0 +1,113 @@
+import asyncio
+from logging import Logger
+from typing import Any
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import WEATHER_BATCH_MISS_CONCURRENCY
+from src.database.repositories.cities import CityRepository
+from src.database.repositories.weather_data import WeatherRepository
+from src.enums import WeatherFilters
+from src.exceptions.city import CityNotFoundError
+from src.exceptions.http import APIException
+from src.exceptions.repository import RepositoryError, RepositorySaveError
+from src.forecast_codec import PackedForecast
+from src.logging import get_logger
+from src.mappers.weather import WeatherMapper
+from src.scheduler import access_tracker
+from src.timing import span
+from src.upstream.client import UpstreamClient
+from src.use_cases.city_service import CityService
+
+logger: Logger = get_logger(__name__)
+
+
+class CitiesWithWeather:
+    """Погода для списка городов в один час.
+
+    Города и данные о погоде читаются из справочника и снимка, недостающие - одним
+    запросом с IN на таблицу. Города, которых нет в БД или для которых нет данных,
+    обрабатываются как в GET /weather/ параллельно, каждый в своей сессии.
+    """
+
+    def __init__(
+        self,
+        weather_repo: WeatherRepository,
+        city_repo: CityRepository,
+        mapper: WeatherMapper,
+        session_factory: async_sessionmaker[AsyncSession],
+        concurrency: int = WEATHER_BATCH_MISS_CONCURRENCY,
+    ) -> None:
+        self.weather_repo: WeatherRepository = weather_repo
+        self.city_repo: CityRepository = city_repo
+        self.mapper: WeatherMapper = mapper
+        self.session_factory: async_sessionmaker[AsyncSession] = session_factory
+        self.concurrency: int = concurrency
+
+    async def __call__(
+        self,
+        city_names: list[str],
+        timestamp: int,
+        http_client: UpstreamClient,
+        filters: list[WeatherFilters] | None = None,
+    ) -> dict[str, Any]:
+        normalized: dict[str, str] = {
+            name: self.city_repo.directory.normalize(name) for name in city_names
+        }
+
+        cities: dict[str, dict[str, Any]] = await self.city_repo.get_many(list(normalized.values()))
+        weather: dict[int, dict[str, Any]] = await self.weather_repo.get_many(
+            [city["id"] for city in cities.values()]
+        )
+
+        forecasts: dict[str, PackedForecast] = {}
+        misses: list[str] = []
+        for name in set(normalized.values()):
+            city: dict[str, Any] | None = cities.get(name)
+            if city is not None and city["id"] in weather:
+                forecasts[name] = weather[city["id"]]["data"]
+                access_tracker.record(city["id"])
+            else:
+                misses.append(name)
+
+        logger.info(
+            f"Пакетный запрос погоды для {len(normalized)} городов: "
+            f"{len(forecasts)} найдено в БД, {len(misses)} промахов"
+        )
+
+        errors: dict[str, str] = {}
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fill(name: str) -> None:
+            try:
+                async with semaphore, self.session_factory() as session:
+                    city, forecasts[name] = await CityService(
+                        self.weather_repo.with_session(session),
+                        self.city_repo.with_session(session),
+                    )(name, http_client)
+                access_tracker.record(city["id"])
+            except (CityNotFoundError, RepositoryError, RepositorySaveError) as e:
+                errors[name] = str(e)
+            except APIException as e:
+                errors[name] = e.detail
+
+        await asyncio.gather(*[fill(name) for name in misses])
+
+        # Тело WeatherBatchResponse собирается из словарей, без моделей на каждый город
+        results: dict[str, dict[str, Any]] = {}
+        with span("render"):
+            for requested, name in normalized.items():
+                if name in errors:
+                    results[requested] = {"weather": None, "error": errors[name]}
+                    continue
+                try:
+                    results[requested] = {
+                        "weather": self.mapper.to_response_content(forecasts[name], timestamp)
+                        if filters is None
+                        else self.mapper.to_optional_response_content(forecasts[name], timestamp, filters),
+                        "error": None,
+                    }
+                except (IndexError, ValueError) as e:
+                    results[requested] = {"weather": None, "error": str(e)}
+
+        return {"hour": timestamp, "results": results}
@@ -0,0 +1,47 @@
+from typing import Any
+
+from fastapi import status
+
+from src.database.repositories.cities import CityRepository
+from src.database.repositories.weather_data import WeatherRepository
+from src.enums import WeatherFilters
+from src.exceptions.http import APIException
+from src.mappers.weather import WeatherMapper
+from src.scheduler import access_tracker
+from src.timing import span
+from src.upstream.client import UpstreamClient
+from src.use_cases.city_service import CityService
+
+
+class CityWeatherRange:
+    def __init__(
+        self,
+        weather_repo: WeatherRepository,
+        city_repo: CityRepository,
+        mapper: WeatherMapper,
+    ) -> None:
+        self.city_repo: CityRepository = city_repo
+        self.weather_repo: WeatherRepository = weather_repo
+        self.mapper: WeatherMapper = mapper
+
+    async def __call__(
+        self,
+        city_name: str,
+        start_hour: int,
+        end_hour: int,
+        http_client: UpstreamClient,
+        filters: list[WeatherFilters] | None = None,
+    ) -> dict[str, Any]:
+        if start_hour > end_hour:
+            raise APIException(
+                status.HTTP_422_UNPROCESSABLE_ENTITY,
+                f"Начальный час {start_hour} больше конечного {end_hour}",
+            )
+
+        city, weather_data = await CityService(self.weather_repo, self.city_repo)(
+            city_name, http_client
+        )
+        access_tracker.record(city["id"])
+
+        with span("render"):
+            return self.mapper.to_range_response_content(weather_data, start_hour, end_hour, filters)